@@ -0,0 +1,128 @@
+# Backend/AnswerCache.py
+# Answer cache for general (ChatBot) queries. Repeated questions ("who wrote hamlet",
+# "Who wrote Hamlet?") are answered from Data/answer_cache.json in milliseconds instead
+# of a Groq round trip. Keys are normalized query text; near-duplicates can also match
+# through character-shingle Jaccard similarity, but only when both keys have the same
+# content words in the same order (numbers and names included: "100 grams" never
+# answers "500 grams", "austria" never answers "australia"). Queries whose answer depends on the
+# clock or on the previous turns ("what time is it", "tell me more about it") are never
+# cached. Hits/misses/skips are counted in Backend/Metrics as answer_cache.*.
+import re
+import threading
+from pathlib import Path
+
+from . import Metrics
+from .Cache import PersistentLRU
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "Data"
+DATA_DIR.mkdir(exist_ok=True)
+CACHE_PATH = DATA_DIR / "answer_cache.json"
+
+MAX_ENTRIES = 512
+TTL_SECONDS = 7 * 24 * 3600
+SIMILARITY_THRESHOLD = 0.85     # shingle Jaccard for a near-duplicate hit; None = exact keys only
+SHINGLE_SIZE = 3
+ENABLED = True
+
+# Words that make an answer go stale or depend on the conversation so far
+_TIME_SENSITIVE = re.compile(
+    r"\b(time|date|day|today|tonight|tomorrow|yesterday|now|currently|current|latest|recent|recently|"
+    r"news|weather|temperature|forecast|score|price|stock|this (week|month|year)|next (week|month|year)|"
+    r"last (week|month|year)|remind|reminder|ago)\b"
+)
+_CONTEXTUAL = re.compile(
+    r"\b(it|its|that|this|those|these|he|she|him|her|his|they|them|their|again|more|else|above|previous|"
+    r"last one|you said|my|me|i|i'm|we|our)\b"
+)
+_FILLER = re.compile(r"^(?:(?:hey|hi|ok|okay|so|please|can you|could you|would you|tell me|do you know)\b\s*)+")
+_PUNCT = re.compile(r"[^\w\s']")
+# words a near-duplicate may add, drop or change; every other word must match exactly
+_FUNCTION_WORDS = {"a", "an", "the", "is", "are", "was", "were", "be", "of", "in", "on", "at", "to", "for",
+                   "by", "with", "from", "about", "and", "or", "do", "does", "did", "please", "there"}
+
+_cache = None
+_cache_lock = threading.Lock()
+_shingles = {}                  # key -> frozenset of shingles (rebuilt lazily from the cache)
+
+
+def normalize(query: str) -> str:
+    """Lower-case, drop punctuation, collapse whitespace and strip leading filler words."""
+    text = _PUNCT.sub(" ", query.lower())
+    text = " ".join(text.split())
+    return _FILLER.sub("", text).strip()
+
+
+def cacheable(key: str) -> bool:
+    return bool(key) and not _TIME_SENSITIVE.search(key) and not _CONTEXTUAL.search(key)
+
+
+def _shingle(text: str) -> frozenset:
+    text = f" {text} "
+    return frozenset(text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1)))
+
+
+def get_cache() -> PersistentLRU:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PersistentLRU(CACHE_PATH, maxsize=MAX_ENTRIES, ttl=TTL_SECONDS)
+        return _cache
+
+
+def _content(key: str) -> tuple:
+    return tuple(w for w in key.split() if w not in _FUNCTION_WORDS)
+
+
+def _similar(cache, key):
+    """Closest cached key by shingle Jaccard, if it clears SIMILARITY_THRESHOLD and has the
+    same content words as key."""
+    query = _shingle(key)
+    content = _content(key)
+    best, best_score = None, SIMILARITY_THRESHOLD
+    for other in cache.keys():
+        if _content(other) != content:
+            continue
+        shingles = _shingles.get(other)
+        if shingles is None:
+            shingles = _shingles[other] = _shingle(other)
+        score = len(query & shingles) / len(query | shingles)
+        if score >= best_score:
+            best, best_score = other, score
+    return best
+
+
+def lookup(query: str) -> str | None:
+    """Cached answer for query, or None (miss, or a query that must not be cached)."""
+    if not ENABLED:
+        return None
+    key = normalize(query)
+    if not cacheable(key):
+        Metrics.incr("answer_cache.skip")
+        return None
+    cache = get_cache()
+    answer = cache.get(key)
+    if answer is None and SIMILARITY_THRESHOLD is not None:
+        match = _similar(cache, key)
+        if match is not None:
+            answer = cache.get(match)
+    Metrics.incr("answer_cache.hit" if answer is not None else "answer_cache.miss")
+    return answer
+
+
+def store(query: str, answer: str):
+    if not ENABLED or not answer.strip():
+        return
+    key = normalize(query)
+    if cacheable(key):
+        cache = get_cache()
+        cache.set(key, answer)
+        _shingles[key] = _shingle(key)
+        if len(_shingles) > 2 * MAX_ENTRIES:        # forget shingles of evicted keys
+            live = set(cache.keys())
+            for stale in [k for k in _shingles if k not in live]:
+                del _shingles[stale]
+
+
+def clear():
+    get_cache().clear()
+    _shingles.clear()
@@ -1,11 +1,10 @@
 # Import required libraries.
 from AppOpener import close, open as appopen
 from webbrowser import open as webopen
-from pywhatkit import search, playonyt
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup
 from rich import print
-from groq import Groq
+from Backend.GroqClient import get_client
 from pathlib import Path
 import webbrowser
 import subprocess
@@ -25,6 +24,9 @@ import winsound
 from time import sleep
 
 
+from Backend.Tracing import traced, AUTOMATION
+
+
 STOPWATCH_START = None
 
 
@@ -56,8 +58,8 @@ classes = ["zCubwf", "hgKElc", "LTKOO sY7ric", "Z0LcW", "gsrt vk_bk FzvWSb YwPhn
 useragent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebkit/537.36 (KHTML, Like Gecko) Chrome/100.0.4896.75 Safari/537.36'
 
 
-# Groq client
-client = Groq(api_key=GroqAPIKey)
+# Groq client (shared, pooled)
+client = get_client()
 
 
 # Predefined responses 
@@ -74,6 +76,7 @@ SystemChatBot = [{"role": "system", "content": f"Hello, I am {os.environ.get('Us
 
 # Google search
 def GoogleSearch(Topic):
+    from pywhatkit import search   # imported on first use: pywhatkit probes the network at import time
     search(Topic)
     return True
 
@@ -126,6 +129,7 @@ def YouTubeSearch(Topic):
 
 # Play YouTube
 def PlayYoutube(query):
+    from pywhatkit import playonyt
     playonyt(query)
     return True
 
@@ -904,6 +908,7 @@ async def TranslateAndExecute(commands: list[str]):
 
 
 # Automation
+@traced(AUTOMATION)
 async def Automation(commands: list[str]):
     async for result in TranslateAndExecute(commands):
         pass
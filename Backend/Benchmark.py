@@ -0,0 +1,172 @@
+# Backend/Benchmark.py
+# Offline end-to-end benchmark: replays a corpus of voice/typed queries through Main's
+# scheduler and HandleRequest (the same dispatch path the app uses) with every network
+# service and side effect replaced by Backend/Fakes.py. Runs without Qt, a microphone,
+# Chrome or network access and reports throughput plus per-stage latency.
+#
+#   python Main.py --benchmark [--corpus Data/BenchmarkQueries.jsonl] [--workers 2]
+#                              [--repeat 1] [--latency brave=0.2,groq_ttft=0.1] [--out report.json]
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CORPUS = PROJECT_ROOT / "Data" / "BenchmarkQueries.jsonl"
+
+
+def load_corpus(path) -> list[dict]:
+    """JSONL of {"text"|"query"|"title", "source": "voice"|"typed", "decision": [...]}; plain lines are typed queries."""
+    items = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            row = json.loads(line)
+            text = row.get("text") or row.get("query") or row.get("title") or ""
+            item = {"text": text, "source": row.get("source", "typed"), "decision": row.get("decision")}
+        else:
+            item = {"text": line, "source": "typed", "decision": None}
+        if item["decision"] and "exit" in item["decision"]:
+            print(f"[benchmark] skipping exit request: {item['text']!r}")
+            continue
+        if item["text"]:
+            items.append(item)
+    return items
+
+
+def install_fakes(latency, workdir: Path, decisions: dict):
+    """Import the real pipeline headless and swap every external dependency for a fake."""
+    # clients are constructed at import time and refuse to start without a key
+    for key in ("GroqAPIKey", "CohereAPIKey", "BraveAPIKey"):
+        os.environ.setdefault(key, "offline-benchmark")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    from Backend import Fakes, Tracing, RLPolicy, ConversationStore, Metrics, AnswerCache, IntentClassifier, VectorMemory, RateLimit, SearchCache
+    import Backend.Chatbot as Chatbot
+    import Backend.RealtimeSearchEngine as Realtime
+    import Backend.Model as Model
+    import Backend.TextToSpeech as TTS
+    import Backend.GroqClient as GroqClient
+
+    # keep the user's Data/ untouched
+    ConversationStore.set_store(ConversationStore.ConversationStore(workdir / "ChatLog.jsonl"))
+    RLPolicy.POLICY_PATH = workdir / "rl_policy.json"
+    RLPolicy.METRICS_PATH = workdir / "metrics.csv"
+    Tracing.LATENCY_PATH = workdir / "latency.csv"
+    Tracing.CHROME_TRACE_PATH = workdir / "trace.json"
+    Metrics.COUNTERS_PATH = workdir / "counters.json"
+    AnswerCache.CACHE_PATH = workdir / "answer_cache.json"
+    IntentClassifier.DECISION_LOG_PATH = workdir / "decisions.jsonl"
+    Model.DECISION_CACHE_PATH = workdir / "decision_cache.json"
+    VectorMemory.VECTORS_PATH = workdir / "memory_vectors.f32"
+    VectorMemory.TURNS_PATH = workdir / "memory_turns.jsonl"
+    RateLimit.STATE_PATH = workdir / "ratelimit_brave.json"
+    SearchCache.CACHE_PATH = workdir / "search_cache.json"
+    TTS.DATA_DIR = workdir
+
+    groq = Fakes.FakeGroq(latency)
+    cohere = Fakes.FakeCohere(latency, decisions)
+    brave = Fakes.FakeBrave(latency, exceptions=Realtime.requests.exceptions)
+    Chatbot.client = groq                    # rolling summary (blocking)
+    GroqClient._client = groq                # anything else asking get_client() gets the fake too
+    GroqClient._async_client = groq.aio      # ChatBotAsync / RealtimeSearchEngineAsync
+    Model.co = cohere
+    Realtime.requests = brave
+    TTS._EDGE_TTS_AVAILABLE = True
+    TTS._edge_tts_to_file = Fakes.make_fake_edge_tts(latency)
+    TTS.SPEECH_MP3_FILE = str(workdir / "speech.mp3")
+    TTS.SPEECH_WAV_FILE = str(workdir / "speech.wav")
+    TTS._init_mixer = TTS._release_mixer = lambda: None
+    TTS._play_file = Fakes.make_fake_playback(latency)
+
+    import Main
+    Main.policy = RLPolicy.RLPolicy()
+    Main.Automation = Fakes.make_fake_automation(latency)
+    Main.GenerateImages = Fakes.make_fake_image_generation(latency)
+    Main.session_started = True           # measure steady-state turns, not the greeting
+    return Main, {"groq": groq, "cohere": cohere, "brave": brave}
+
+
+def run_benchmark(corpus, latency, workers: int = 2, repeat: int = 1) -> dict:
+    from Backend import Tracing
+    from Backend.Scheduler import RequestScheduler
+    from Frontend.Helpers import QueryModifier
+
+    workdir = Path(tempfile.mkdtemp(prefix="ash-benchmark-"))
+    # recorded decisions are looked up by the exact message FirstLayerDMM receives
+    decisions = {QueryModifier(item["text"]): item["decision"] for item in corpus if item["decision"]}
+    Main, fakes = install_fakes(latency, workdir, decisions)
+
+    timings = []
+
+    def dispatch(request):
+        started = time.perf_counter()
+        Main.HandleRequest(request)
+        timings.append({
+            "source": request.source,
+            "queued_s": started - request.meta["submitted"],
+            "service_s": time.perf_counter() - started,
+            "total_s": time.perf_counter() - request.meta["submitted"],
+        })
+
+    scheduler = RequestScheduler(dispatch, maxsize=max(1, len(corpus)), workers=workers).start()
+    start = time.perf_counter()
+    requests = []
+    for _ in range(repeat):
+        for item in corpus:
+            meta = {"submitted": time.perf_counter()}
+            requests.append(scheduler.submit(item["source"], item["text"], meta=meta))
+    for request in requests:
+        if request is not None:
+            request.done.wait()
+    wall = time.perf_counter() - start
+
+    from Backend import Metrics
+    totals = sorted(t["total_s"] for t in timings)
+    return {
+        "requests": len(timings),
+        "workers": workers,
+        "wall_s": wall,
+        "throughput_rps": len(timings) / wall if wall else 0.0,
+        "end_to_end_ms": {q: Tracing._percentile(totals, q) * 1000.0 for q in (50, 95, 99)},
+        "stages_ms": Tracing.stage_percentiles(),
+        "calls": {name: fake.calls for name, fake in fakes.items()},
+        "counters": Metrics.snapshot()["counters"],
+        "latency": dict(latency),
+        "workdir": str(workdir),
+    }
+
+
+def print_report(report: dict):
+    e2e = report["end_to_end_ms"]
+    print(f"\n=== Offline benchmark: {report['requests']} requests, {report['workers']} workers, {report['wall_s']:.2f} s ===")
+    print(f"throughput   {report['throughput_rps']:.2f} req/s")
+    print(f"end-to-end   p50 {e2e[50]:.0f} ms   p95 {e2e[95]:.0f} ms   p99 {e2e[99]:.0f} ms")
+    print(f"fake calls   " + ", ".join(f"{k}={v}" for k, v in report["calls"].items()))
+    if report["counters"]:
+        print(f"counters     " + ", ".join(f"{k}={v}" for k, v in sorted(report["counters"].items())))
+    print(f"\n{'stage':<20} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for stage, p in sorted(report["stages_ms"].items()):
+        print(f"{stage:<20} {p['count']:>6} {p['p50']:>9.1f} {p['p95']:>9.1f} {p['p99']:>9.1f} {p['max']:>9.1f}")
+
+
+def main(argv=None) -> int:
+    from Backend.Fakes import Latency
+    parser = argparse.ArgumentParser(prog="Main.py --benchmark", description="Offline end-to-end benchmark")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--latency", default="", help="fake service latencies, e.g. brave=0.2,groq_ttft=0.1")
+    parser.add_argument("--out", default="", help="also write the report as JSON")
+    args = parser.parse_args([a for a in (argv if argv is not None else sys.argv[1:]) if a != "--benchmark"])
+
+    report = run_benchmark(load_corpus(args.corpus), Latency.parse(args.latency), args.workers, args.repeat)
+    print_report(report)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
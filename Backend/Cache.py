@@ -0,0 +1,137 @@
+# Backend/Cache.py
+# Small persistent LRU with optional TTL, shared by the answer, decision and search
+# caches. Entries live in an OrderedDict (most recently used last) and are saved to a
+# JSON file under Data/ at most every `save_interval` seconds and at exit. A `version`
+# string (e.g. a hash of the prompt that produced the values) invalidates the whole
+# file when it changes.
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class PersistentLRU:
+    def __init__(self, path: Path, maxsize: int = 512, ttl: float | None = None,
+                 version: str = "", save_interval: float = 2.0, max_bytes: int | None = None):
+        self.path = Path(path)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = version
+        self.save_interval = save_interval
+        self.max_bytes = max_bytes          # optional cap on the saved file size
+        self._lock = threading.RLock()
+        self._data = OrderedDict()          # key -> [value, created_at, ttl]
+        self._dirty = False
+        self._last_save = 0.0
+        self._timer = None
+        self._load()
+        atexit.register(self.save)
+
+    def _load(self):
+        try:
+            saved = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(saved, dict) or saved.get("version") != self.version:
+            return                          # written for another prompt/config: start empty
+        now = time.time()
+        for key, value, created, ttl in saved.get("entries", []):
+            if ttl is None or now - created < ttl:
+                self._data[key] = [value, created, ttl]
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    # --- mapping API ---
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if entry[2] is not None and time.time() - entry[1] >= entry[2]:
+                del self._data[key]
+                self._dirty = True
+                return default
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl: float | None = ...):
+        """Store value; ttl overrides the cache default for this entry (None = never expires)."""
+        with self._lock:
+            self._data[key] = [value, time.time(), self.ttl if ttl is ... else ttl]
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            self._dirty = True
+        self._schedule_save()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._dirty = True
+        self._schedule_save()
+        return default if entry is None else entry[0]
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._data.keys())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._dirty = True
+        self.save()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    # --- persistence ---
+    def _schedule_save(self):
+        with self._lock:
+            if self._timer is not None:
+                return
+            delay = max(0.0, self.save_interval - (time.time() - self._last_save))
+            self._timer = threading.Timer(delay, self.save)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def save(self):
+        with self._lock:
+            self._timer = None
+            if not self._dirty:
+                return
+            entries = [[k, v[0], v[1], v[2]] for k, v in self._data.items()]
+            self._dirty = False
+            self._last_save = time.time()
+        payload = json.dumps({"version": self.version, "entries": entries}, ensure_ascii=False)
+        if self.max_bytes is not None:
+            # drop least recently used entries until the file fits
+            dropped = []
+            while len(payload.encode("utf-8")) > self.max_bytes and entries:
+                cut = max(1, len(entries) // 10)
+                dropped += entries[:cut]
+                entries = entries[cut:]
+                payload = json.dumps({"version": self.version, "entries": entries}, ensure_ascii=False)
+            if dropped:
+                # forget only what was dropped from the snapshot; keys set() since then stay
+                with self._lock:
+                    for key, _, stored, _ in dropped:
+                        entry = self._data.get(key)
+                        if entry is not None and entry[1] == stored:
+                            del self._data[key]
+        try:
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[cache] could not save {self.path.name}: {e}")
+
+
+_MISSING = object()
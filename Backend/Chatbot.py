@@ -1,10 +1,16 @@
-from groq import Groq              # Importing the Groq library to use its API.
-from json import load, dump        # Importing functions to read and write JSON files.
 import datetime                    # Importing the datetime module for real-time date and time information.
 from dotenv import load_dotenv     # ✅ CHANGED: Import load_dotenv instead of dotenv_values
 from pathlib import Path           # Added for robust file path handling
 import os                          # ✅ ADDED: Import os for environment variable access
 from .Config import Username, Assistantname
+from .Tracing import span, StreamStats, GROQ_COMPLETION
+from .GroqClient import get_client, get_async_client, call, run_sync, stream_tokens  # shared pooled Groq clients (keep-alive)
+from .ConversationStore import get_store  # append-only chat log (Data/ChatLog.jsonl)
+from . import AnswerCache                 # normalized-query answer cache (Data/answer_cache.json)
+from . import Metrics
+from .ContextWindow import pack, RollingSummary, summary_prompt, prompt_tokens, SUMMARY_ENABLED
+from .Resilience import retry_call_async, is_retryable, ProviderUnavailable
+from . import VectorMemory                # relevant past turns (Data/memory_vectors.f32)
 
 # ✅ FIX FILE PATHS - ONLY ADDITION TO YOUR CODE
 BASE_DIR = Path(__file__).parent.parent
@@ -14,8 +20,6 @@ DATA_DIR.mkdir(exist_ok=True)
 def get_data_file(filename):
     return DATA_DIR / filename
 
-CHAT_LOG_FILE = get_data_file("ChatLog.json")
-
 # ✅ FIXED: Load environment variables from absolute path
 load_dotenv(BASE_DIR / ".env")
 
@@ -24,8 +28,8 @@ Username = os.getenv("Username")            # ✅ CHANGED: Use os.getenv instead
 Assistantname = os.getenv("Assistantname") # ✅ CHANGED: Use os.getenv instead of env_vars.get
 GroqAPIKey = os.getenv("GroqAPIKey")        # ✅ CHANGED: Use os.getenv instead of env_vars.get
 
-# Initialize the Groq client using the provided API key.
-client = Groq(api_key=GroqAPIKey)
+# Shared Groq client (one keep-alive connection pool for the whole app).
+client = get_client()
 
 # --- RL knob (safe default matching current behavior) ---
 TEMPERATURE = 0.7
@@ -37,9 +41,6 @@ def set_temperature(t: float):
         TEMPERATURE = 0.7
 # --- END RL knob ---
 
-# Initialize an empty list to store chat messages.
-messages = []
-
 # Define a system message that provides context to the AI chatbot about its role and behavior.
 System = f"""Hello, I am {Username}, You are a very accurate and advanced AI chatbot named {Assistantname} which also has real-time up-to-date information from the internet.
 *** Do not tell time until I ask, do not talk too much, just answer the question.***
@@ -52,14 +53,25 @@ SystemChatBot = [
     {"role": "system", "content": System}
 ]
 
-# Attempt to load the chat log from a JSON file.
-try:
-    with open(CHAT_LOG_FILE, "r") as f:  # ✅ FIXED PATH
-        messages = load(f)         # Load existing messages from the chat log.
-except FileNotFoundError:
-    # If the file doesn't exist, create an empty JSON file to store chat logs.
-    with open(CHAT_LOG_FILE, "w") as f:  # ✅ FIXED PATH
-        dump([], f)
+# Said when Groq is unreachable (breaker open or retries exhausted) and nothing is cached.
+FALLBACK_ANSWER = "Sorry, I can't reach my language service right now. Please try again in a moment."
+
+# --- ADDED: token-budgeted context window ---
+# Only the newest turns that fit ContextWindow.HISTORY_BUDGET are sent. With
+# ChatRollingSummary=1 in .env the older turns are folded into a short summary in the
+# background (one extra non-streaming call, never on the request path).
+def _summarize(previous, dropped):
+    completion = client.chat.completions.create(
+        model="llama-3.1-8b-instant",
+        messages=summary_prompt(previous, dropped),
+        max_tokens=300,
+        temperature=0.3,
+        stream=False
+    )
+    return completion.choices[0].message.content or ""
+
+rolling_summary = RollingSummary(_summarize) if SUMMARY_ENABLED else None
+# --- END context window ---
 
 # Function to get real-time date and time information.
 def RealtimeInformation():
@@ -85,55 +97,109 @@ def AnswerModifier(Answer):
     modified_answer = '\n'.join(non_empty_lines)              # Join the cleaned lines back together.
     return modified_answer
 
+def _conversation(Query):
+    """(messages, conversation, prompt tokens) for Query: system prompt, real-time info,
+    rolling summary, recalled turns and the recent window ending with the query."""
+    # Recent history comes from the store's in-memory tail (no file read per turn),
+    # trimmed to the newest turns that fit the token budget. With the vector memory on,
+    # only a short recent window is sent and older turns are recalled by relevance.
+    messages, dropped = pack(get_store().recent(), VectorMemory.RECENT_BUDGET if VectorMemory.ENABLED else None)
+    summary = []
+    if rolling_summary is not None:
+        rolling_summary.update(dropped)
+        summary = rolling_summary.message()
+    recalled = VectorMemory.recall(Query, exclude=messages)
+
+    # Append the user's query to the messages list.
+    messages.append({"role": "user", "content": f"{Query}"})
+
+    # Include system instructions, real-time info, the rolling summary, recalled turns and recent history.
+    conversation = SystemChatBot + [{"role": "system", "content": RealtimeInformation()}] + summary + recalled + messages
+    tokens = prompt_tokens(conversation)
+    Metrics.incr("chatbot.requests")
+    Metrics.incr("chatbot.prompt_tokens", tokens)
+    Metrics.set_gauge("chatbot.prompt_tokens_last", tokens)
+    return messages, conversation, tokens
+
 # Main chatbot function to handle user queries.
-def ChatBot(Query):
-    """ This function sends the user's query to the chatbot and returns the AI's response. """
+async def ChatBotAsync(Query, on_token=None, before_save=None):
+    """ Async ChatBot on the pooled AsyncGroq client; returns the AI's response.
+    on_token (plain or async) is called with every streamed chunk as it arrives.
+    before_save() runs just before the turn is written to the chat log (speculative runs
+    block there until they are committed or cancelled). Time to first token and tokens/s
+    are recorded on the groq_completion span and as chatbot.ttft_ms_last /
+    chatbot.tokens_per_s_last. """
+
+    # Repeated, context-free questions are answered from the cache without calling Groq.
+    cached = AnswerCache.lookup(Query)
+    if cached is not None:
+        await call(on_token, cached)
+        await call(before_save)
+        get_store().extend([{"role": "user", "content": f"{Query}"}, {"role": "assistant", "content": cached}])
+        VectorMemory.remember(Query, cached)
+        return AnswerModifier(Answer=cached)
+
+    messages, conversation, tokens = _conversation(Query)
+    streamed = []                               # chunks already handed to on_token
+
+    async def _complete():
+        # Make a request to the Groq API for a response (span covers the whole stream).
+        with span(GROQ_COMPLETION, caller="ChatBot", prompt_tokens=tokens) as timing:
+            stats = StreamStats("chatbot")
+            completion = await get_async_client().chat.completions.create(
+                model="llama-3.1-8b-instant",        # Specify the AI model to use.
+                messages=conversation,
+                max_tokens=1024,                # Limit the maximum tokens in the response.
+                temperature=TEMPERATURE,        # ← RL-controlled, default unchanged
+                top_p=1,                        # Use nucleus sampling to control diversity.
+                stream=True,                    # Enable streaming response.
+                stop=None                       # Allow the model to determine when to stop.
+            )
+
+            # Process the streamed response chunks.
+            async for chunk in completion:
+                if chunk.choices[0].delta.content:               # Check if there's content in the current chunk.
+                    streamed.append(chunk.choices[0].delta.content)
+                    stats.token(chunk.choices[0].delta.content)
+                    await call(on_token, chunk.choices[0].delta.content)  # Hand the chunk to the next stage (display/speech).
+            timing.args.update(stats.finish())
+        return "".join(streamed)
 
     try:
-        # Load the existing chat log from the JSON file.  
-        with open(CHAT_LOG_FILE, "r") as f:  # ✅ FIXED PATH
-            messages = load(f)
-
-        # Append the user's query to the messages list.
-        messages.append({"role": "user", "content": f"{Query}"})
-
-        # Make a request to the Groq API for a response.
-        completion = client.chat.completions.create(
-            model="llama-3.1-8b-instant",        # Specify the AI model to use.
-            messages=SystemChatBot + [{"role": "system", "content": RealtimeInformation()}] + messages, # Include system instructions, real-time info, and chat history.
-            max_tokens=1024,                # Limit the maximum tokens in the response.
-            temperature=TEMPERATURE,        # ← RL-controlled, default unchanged
-            top_p=1,                        # Use nucleus sampling to control diversity.
-            stream=True,                    # Enable streaming response.
-            stop=None                       # Allow the model to determine when to stop.
-        )
-
-        Answer = ""                         # Initialize an empty string to store the AI's response.
-
-        # Process the streamed response chunks.
-        for chunk in completion:
-            if chunk.choices[0].delta.content:               # Check if there's content in the current chunk.
-                Answer += chunk.choices[0].delta.content      # Append the content to the answer.
-
-        Answer = Answer.replace("</s>", "")                  # Clean up any unwanted tokens from the response.
-
-        # Append the chatbot's response to the messages list.
-        messages.append({"role": "assistant", "content": Answer})
-
-        # Save the updated chat log to the JSON file.
-        with open(CHAT_LOG_FILE, "w") as f:  # ✅ FIXED PATH
-            dump(messages, f, indent=4)
-
-        # Return the formatted response.
-        return AnswerModifier(Answer=Answer)
-    
-    except Exception as e:
-        # Handle errors by printing the exception and resetting the chat log.
+        # Bounded, jittered retries behind the Groq breaker; a stream that already spoke is not restarted.
+        Answer = await retry_call_async(_complete, "groq", retryable=lambda e: not streamed and is_retryable(e))
+    except ProviderUnavailable as e:
         print(f"Error: {e}")
-        with open(CHAT_LOG_FILE, "w") as f:  # ✅ FIXED PATH
-            dump([], f, indent=4)
-        return ChatBot(Query)                      # Retry the query
-    
+        if not streamed:
+            # Fail fast with a local answer; nothing is written to the chat log or the cache.
+            Metrics.incr("fallback.chatbot")
+            await call(on_token, FALLBACK_ANSWER)
+            return FALLBACK_ANSWER
+        Answer = "".join(streamed)              # keep the part the user already heard
+
+    Answer = Answer.replace("</s>", "")                  # Clean up any unwanted tokens from the response.
+
+    # Append just this turn to the chat log.
+    await call(before_save)
+    get_store().extend(messages[-1:] + [{"role": "assistant", "content": Answer}])
+    AnswerCache.store(Query, Answer)
+    VectorMemory.remember(Query, Answer)
+
+    # Return the formatted response.
+    return AnswerModifier(Answer=Answer)
+
+def ChatBotStream(Query, before_save=None):
+    """ChatBotAsync as an async iterator of response chunks: `async for t in ChatBotStream(q)`."""
+    return stream_tokens(lambda on_token: ChatBotAsync(Query, on_token, before_save))
+
+def ChatBot(Query, on_token=None, before_save=None):
+    """ This function sends the user's query to the chatbot and returns the AI's response.
+    If on_token is given it is called with every streamed chunk as it arrives.
+    before_save() runs just before the turn is written to the chat log (speculative runs
+    block there until they are committed or cancelled). Blocking wrapper around
+    ChatBotAsync; both callbacks run in the calling thread. """
+    return run_sync(lambda on_token, before_save: ChatBotAsync(Query, on_token, before_save), on_token, before_save)
+
 # Main program entry point.
 if __name__ == "__main__":
     while True:
@@ -0,0 +1,128 @@
+# Backend/ContextWindow.py
+# Token-budgeted chat context for ChatBot. Instead of sending every stored message, the
+# most recent turns are packed newest-first until HISTORY_BUDGET tokens are used, so the
+# prompt (and the Groq prefill time) stops growing with the conversation. Optionally the
+# turns that fall out of the window are folded into a rolling summary by a background
+# thread; the summary (Data/ChatSummary.json) is sent as one short system message.
+import json
+import os
+import threading
+from pathlib import Path
+
+from .Tokens import count_tokens, count_message_tokens, MESSAGE_OVERHEAD
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "Data"
+DATA_DIR.mkdir(exist_ok=True)
+SUMMARY_PATH = DATA_DIR / "ChatSummary.json"
+
+HISTORY_BUDGET = int(os.getenv("ChatHistoryTokens", "2000"))   # tokens of recent turns per request
+SUMMARY_ENABLED = os.getenv("ChatRollingSummary", "").strip().lower() in ("1", "true", "yes")
+SUMMARY_MAX_WORDS = 120
+FOLD_BATCH_TOKENS = 1500         # at most this much dropped history per summarizer call
+
+
+def pack(messages: list[dict], budget: int = None) -> tuple[list[dict], list[dict]]:
+    """(window, dropped): the newest messages that fit in budget tokens, and the older rest.
+    The window never starts with an assistant reply cut off from its question."""
+    budget = HISTORY_BUDGET if budget is None else budget
+    used, start = 0, len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        cost = count_tokens(messages[i]["content"]) + MESSAGE_OVERHEAD
+        if used + cost > budget:
+            break
+        used += cost
+        start = i
+    while start < len(messages) and messages[start]["role"] == "assistant":
+        start += 1
+    return messages[start:], messages[:start]
+
+
+class RollingSummary:
+    """Background summary of the turns that no longer fit in the context window."""
+
+    def __init__(self, summarize, path: Path = SUMMARY_PATH):
+        self.summarize = summarize    # summarize(previous_summary, messages) -> str
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._running = False
+        self.text, self._last = "", None
+        try:
+            saved = json.loads(self.path.read_text(encoding="utf-8"))
+            self.text, self._last = saved.get("summary", ""), saved.get("last")
+        except (OSError, ValueError):
+            pass
+
+    def message(self) -> list[dict]:
+        """The summary as a system message (empty list while there is none)."""
+        with self._lock:
+            text = self.text
+        if not text:
+            return []
+        return [{"role": "system", "content": f"Summary of the earlier conversation: {text}"}]
+
+    def update(self, dropped: list[dict]):
+        """Fold dropped messages not yet in the summary, on a background thread."""
+        if not dropped:
+            return
+        with self._lock:
+            if self._running:
+                return
+            pending = self._unfolded(dropped)
+            if not pending:
+                return
+            self._running = True
+        threading.Thread(target=self._fold, args=(pending,), daemon=True, name="chat-summary").start()
+
+    def _unfolded(self, dropped):
+        start = 0
+        for i in range(len(dropped) - 1, -1, -1):
+            if [dropped[i]["role"], dropped[i]["content"]] == self._last:
+                start = i + 1
+                break
+        batch, used = [], 0
+        for m in dropped[start:]:
+            used += count_tokens(m["content"]) + MESSAGE_OVERHEAD
+            if batch and used > FOLD_BATCH_TOKENS:
+                break
+            batch.append(m)
+        return batch
+
+    def _fold(self, messages):
+        try:
+            text = self.summarize(self.text, messages).strip()
+            if text:
+                with self._lock:
+                    self.text = text
+                    self._last = [messages[-1]["role"], messages[-1]["content"]]
+                    payload = {"summary": self.text, "last": self._last}
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"[context] summary update failed: {e}")
+        finally:
+            with self._lock:
+                self._running = False
+
+    def clear(self):
+        with self._lock:
+            self.text, self._last = "", None
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+def summary_prompt(previous: str, messages: list[dict]) -> list[dict]:
+    """Chat messages asking a model to extend previous with messages."""
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    return [
+        {"role": "system", "content": f"You maintain a running summary of a conversation between a user and "
+                                      f"an assistant. Keep facts, names, preferences and open questions. "
+                                      f"Reply with the updated summary only, at most {SUMMARY_MAX_WORDS} words."},
+        {"role": "user", "content": f"Current summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"},
+    ]
+
+
+def prompt_tokens(messages: list[dict]) -> int:
+    return count_message_tokens(messages)
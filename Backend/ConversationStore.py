@@ -0,0 +1,192 @@
+# Backend/ConversationStore.py
+# Append-only conversation log (Data/ChatLog.jsonl, one {"role", "content"} message per
+# line). Replaces the read-everything / rewrite-everything Data/ChatLog.json pattern:
+# a turn is one appended line, recent history is served from an in-memory tail, and a
+# single writer thread owns the file so ChatBot and RealtimeSearchEngine never race.
+import atexit
+import json
+import os
+import queue
+import threading
+from collections import deque
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "Data"
+DATA_DIR.mkdir(exist_ok=True)
+STORE_PATH = DATA_DIR / "ChatLog.jsonl"
+LEGACY_JSON_PATH = DATA_DIR / "ChatLog.json"   # imported once, then left untouched
+
+TAIL_SIZE = 200          # messages kept in memory (ChatBot context, first transcript pages)
+_READ_BLOCK = 64 * 1024
+
+
+def _parse(line: bytes):
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return None                      # a torn last line after a crash is skipped, not fatal
+    if isinstance(message, dict) and "role" in message and "content" in message:
+        return {"role": message["role"], "content": message["content"]}
+    return None
+
+
+class ConversationStore:
+    """Append-only message log with an in-memory tail and a single background writer."""
+
+    def __init__(self, path: Path = STORE_PATH, tail_size: int = TAIL_SIZE, legacy_json: Path | None = None):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._tail = deque(maxlen=tail_size)
+        self._pending = queue.Queue()
+        self._window_offset = 0          # byte offset where the tail loaded at startup begins
+        if legacy_json is not None and not self.path.exists():
+            import_chat_log_json(legacy_json, self.path)
+        self.path.touch(exist_ok=True)
+        self._load()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True, name="conversation-writer")
+        self._writer.start()
+        atexit.register(self.flush)
+
+    # --- startup: only the tail window is read, so opening does not depend on history size ---
+    def _load(self):
+        size = self.path.stat().st_size
+        messages, self._window_offset = self._read_before(size, self._tail.maxlen)
+        self._tail.extend(messages)
+
+    def _read_before(self, offset: int, n: int):
+        """Up to n messages that end before byte offset, and the offset where they start."""
+        with open(self.path, "rb") as f:
+            position, data = offset, b""
+            while position > 0 and data.count(b"\n") <= n:
+                step = min(_READ_BLOCK, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        lines = data.split(b"\n")
+        if position > 0:
+            position += len(lines[0]) + 1    # first line of the window may be cut: leave it for the next page
+            lines = lines[1:]
+        if lines and not lines[-1].strip():
+            lines.pop()                      # text after the last newline (normally empty)
+        while len(lines) > n:
+            position += len(lines[0]) + 1
+            lines = lines[1:]
+        messages = [m for m in (_parse(line) for line in lines if line.strip()) if m is not None]
+        return messages, position
+
+    # --- writes ---
+    def append(self, role: str, content: str):
+        self.extend([{"role": role, "content": content}])
+
+    def extend(self, messages: list[dict]):
+        """Append messages; visible to readers immediately, persisted by the writer thread."""
+        messages = [{"role": m["role"], "content": m["content"]} for m in messages]
+        with self._lock:
+            self._tail.extend(messages)
+        self._pending.put(messages)
+
+    def _write_loop(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                batch = [self._pending.get()]
+                while True:                      # coalesce whatever else is queued
+                    try:
+                        batch.append(self._pending.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    for messages in batch:
+                        if messages is None:     # clear() marker
+                            f.truncate(0)
+                            continue
+                        for message in messages:
+                            f.write(json.dumps(message, ensure_ascii=False) + "\n")
+                    f.flush()
+                except Exception as e:
+                    print(f"[conversation] write failed: {e}")
+                finally:
+                    for _ in batch:
+                        self._pending.task_done()
+
+    def flush(self):
+        """Block until every appended message is on disk."""
+        self._pending.join()
+
+    def clear(self):
+        with self._lock:
+            self._tail.clear()
+            self._window_offset = 0
+        self._pending.put(None)
+
+    # --- reads (never touch the file) ---
+    def recent(self, n: int | None = None) -> list[dict]:
+        with self._lock:
+            messages = list(self._tail)
+        return messages if n is None else messages[-n:] if n > 0 else []
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return not self._tail and self._window_offset == 0
+
+    # --- paging older history (for the transcript) ---
+    @property
+    def window_offset(self) -> int:
+        """Cursor for history older than the startup tail (pass to older())."""
+        return self._window_offset
+
+    def older(self, offset: int, n: int):
+        """Page backwards through the file: (messages before offset, new cursor). Cursor 0 = start."""
+        if offset <= 0:
+            return [], 0
+        return self._read_before(offset, n)
+
+    def iter_all(self):
+        """Every stored message, oldest first (reads the file; for exports/tools, not per turn)."""
+        self.flush()
+        with open(self.path, "rb") as f:
+            for line in f:
+                message = _parse(line)
+                if message is not None:
+                    yield message
+
+
+def import_chat_log_json(json_path: Path = LEGACY_JSON_PATH, store_path: Path = STORE_PATH) -> int:
+    """Convert the old ChatLog.json list into JSONL. Returns the number of imported messages."""
+    json_path, store_path = Path(json_path), Path(store_path)
+    try:
+        messages = json.loads(json_path.read_text(encoding="utf-8") or "[]")
+    except (OSError, ValueError):
+        messages = []
+    tmp = store_path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for message in messages:
+            if isinstance(message, dict) and "role" in message and "content" in message:
+                f.write(json.dumps({"role": message["role"], "content": message["content"]}, ensure_ascii=False) + "\n")
+    os.replace(tmp, store_path)
+    return len(messages)
+
+
+# Process-wide store, created on first use (set_store() swaps it, e.g. for the benchmark)
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ConversationStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ConversationStore(STORE_PATH, legacy_json=LEGACY_JSON_PATH)
+        return _store
+
+
+def set_store(store: ConversationStore):
+    global _store
+    with _store_lock:
+        _store = store
+
+
+if __name__ == "__main__":
+    # python -m Backend.ConversationStore [ChatLog.json]  -> (re)import into Data/ChatLog.jsonl
+    import sys
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else LEGACY_JSON_PATH
+    print(f"Imported {import_chat_log_json(source, STORE_PATH)} messages from {source} into {STORE_PATH}")
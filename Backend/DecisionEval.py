@@ -0,0 +1,167 @@
+# Backend/DecisionEval.py
+# Offline accuracy/latency evaluation of the routing layer (local fast path + Cohere
+# FirstLayerDMM). Runs a labelled corpus through FirstLayerDMM_batch and reports exact
+# task-list accuracy, route accuracy with a general/realtime/task/exit confusion matrix
+# and latency percentiles (overall, fast path, Cohere). By default Cohere is replaced by
+# the stand-in from Backend/Fakes.py replaying the corpus labels, so it runs without
+# network access; offline accuracy then measures the local fast path (and parsing), not
+# the Cohere classifier. Use --live for classifier accuracy.
+#
+#   python -m Backend.DecisionEval [--corpus Data/DecisionCorpus.jsonl] [--live] [--no-fast-path]
+#                                  [--concurrency 4] [--prompt full|compact] [--latency cohere=0.3]
+#                                  [--out report.json]
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CORPUS = PROJECT_ROOT / "Data" / "DecisionCorpus.jsonl"
+
+ROUTES = ("task", "realtime", "general", "exit", "none")
+# the same precedence ExecuteDecision uses: any action wins, then realtime, then general
+TASK_PREFIXES = ("open", "close", "play", "system", "content", "google search", "youtube search",
+                 "generate image", "reminder")
+
+
+def load_corpus(path) -> list[dict]:
+    """JSONL of {"text", "decision": [...]}; rows without a decision are skipped."""
+    items = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        row = json.loads(line)
+        if row.get("text") and row.get("decision"):
+            items.append({"text": row["text"], "decision": list(row["decision"])})
+    return items
+
+
+def route(decision: list[str]) -> str:
+    if any(t.startswith(TASK_PREFIXES) for t in decision):
+        return "task"
+    if any(t.startswith("realtime") for t in decision):
+        return "realtime"
+    if any(t.startswith("general") for t in decision):
+        return "general"
+    if "exit" in decision:
+        return "exit"
+    return "none"
+
+
+def normalize_task(task: str) -> str:
+    return " ".join(re.sub(r"[.?!]+$", "", task.lower().strip()).split())
+
+
+def evaluate(corpus, concurrency: int = 4, fast_path: bool = True, live: bool = False, latency=None,
+             prompt_variant: str | None = None) -> dict:
+    os.environ.setdefault("CohereAPIKey", "offline-eval")
+    from Backend import IntentClassifier, Fakes, Tracing, Metrics
+    import Backend.Model as Model
+
+    Model.DECISION_CACHE_ENABLED = False          # measure the classifier, not the cache
+    if prompt_variant:
+        Model.PROMPT_VARIANT = prompt_variant
+    IntentClassifier.ENABLED = fast_path
+    IntentClassifier.DECISION_LOG_PATH = Path(tempfile.mkdtemp(prefix="ash-eval-")) / "decisions.jsonl"
+    if not live:
+        # replay the hand labels: the rule-based fake_decision uses guess_branch, so scoring
+        # it would measure the local heuristics against themselves
+        Model.co = Fakes.FakeCohere(latency or Fakes.Latency(), {item["text"]: item["decision"] for item in corpus})
+
+    prompts = [item["text"] for item in corpus]
+    local = [fast_path and IntentClassifier.classify(p) is not None for p in prompts]
+    timings = []
+    calls_before = Metrics.get("first_layer_dmm.cohere_calls")
+    tokens_before = Metrics.get("first_layer_dmm.prompt_tokens")
+    predictions = Model.FirstLayerDMM_batch(prompts, concurrency, timings)
+    cohere_calls = Metrics.get("first_layer_dmm.cohere_calls") - calls_before
+    prompt_tokens = Metrics.get("first_layer_dmm.prompt_tokens") - tokens_before
+
+    confusion = {gold: {pred: 0 for pred in ROUTES} for gold in ROUTES}
+    exact, routed, mismatches = 0, 0, []
+    for item, predicted in zip(corpus, predictions):
+        gold_route, pred_route = route(item["decision"]), route(predicted)
+        confusion[gold_route][pred_route] += 1
+        routed += gold_route == pred_route
+        same = [normalize_task(t) for t in item["decision"]] == [normalize_task(t) for t in predicted]
+        exact += same
+        if not same:
+            mismatches.append({"text": item["text"], "expected": item["decision"], "got": predicted})
+
+    def percentiles(values):
+        values = sorted(values)
+        return {q: Tracing._percentile(values, q) * 1000.0 for q in (50, 95, 99)}
+
+    n = len(corpus)
+    return {
+        "n": n,
+        "mode": "live" if live else "offline",
+        "fast_path": fast_path,
+        "concurrency": concurrency,
+        "prompt_variant": Model.PROMPT_VARIANT,
+        "cohere_calls": cohere_calls,
+        "prompt_tokens_per_call": prompt_tokens / cohere_calls if cohere_calls else 0.0,
+        "exact_accuracy": exact / n if n else 0.0,
+        "route_accuracy": routed / n if n else 0.0,
+        "fast_path_rate": sum(local) / n if n else 0.0,
+        "confusion": confusion,
+        "latency_ms": {
+            "all": percentiles(timings),
+            "fast_path": percentiles([t for t, l in zip(timings, local) if l]),
+            "cohere": percentiles([t for t, l in zip(timings, local) if not l]),
+        },
+        "mismatches": mismatches,
+        "note": "" if live else "offline: Cohere replays the corpus labels, so accuracy covers only the "
+                                "local fast path, not the classifier (use --live)",
+    }
+
+
+def print_report(report: dict):
+    print(f"\n=== Decision eval: {report['n']} utterances, {report['mode']}, "
+          f"fast path {'on' if report['fast_path'] else 'off'}, concurrency {report['concurrency']} ===")
+    print(f"exact task match  {report['exact_accuracy']:.1%}")
+    print(f"route accuracy    {report['route_accuracy']:.1%}")
+    print(f"fast path rate    {report['fast_path_rate']:.1%}")
+    if report["note"]:
+        print(f"note              {report['note']}")
+    print(f"prompt            {report['prompt_variant']}, ~{report['prompt_tokens_per_call']:.0f} tokens per Cohere call "
+          f"({report['cohere_calls']} calls)")
+    for name, p in report["latency_ms"].items():
+        print(f"latency {name:<10} p50 {p[50]:8.1f} ms   p95 {p[95]:8.1f} ms   p99 {p[99]:8.1f} ms")
+    routes = [r for r in ROUTES if any(report["confusion"][r].values()) or any(report["confusion"][g][r] for g in ROUTES)]
+    print("\nconfusion (rows = expected, columns = predicted)")
+    print(f"{'':<10}" + "".join(f"{r:>10}" for r in routes))
+    for gold in routes:
+        print(f"{gold:<10}" + "".join(f"{report['confusion'][gold][pred]:>10}" for pred in routes))
+    if report["mismatches"]:
+        print(f"\nmismatches ({len(report['mismatches'])}):")
+        for m in report["mismatches"][:15]:
+            print(f"  {m['text']!r}\n    expected {m['expected']}\n    got      {m['got']}")
+
+
+def main(argv=None) -> int:
+    from Backend.Fakes import Latency
+    parser = argparse.ArgumentParser(prog="python -m Backend.DecisionEval", description="Routing accuracy/latency evaluation")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--live", action="store_true", help="call the real Cohere API instead of the offline stand-in")
+    parser.add_argument("--no-fast-path", action="store_true", help="send everything to the classifier model")
+    parser.add_argument("--prompt", choices=("full", "compact"), default=None, help="decision prompt variant (default: PROMPT_VARIANT)")
+    parser.add_argument("--latency", default="", help="offline stand-in latencies, e.g. cohere=0.3,cohere_token=0.01")
+    parser.add_argument("--out", default="", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = evaluate(load_corpus(args.corpus), args.concurrency, not args.no_fast_path, args.live,
+                      Latency.parse(args.latency), args.prompt)
+    print_report(report)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
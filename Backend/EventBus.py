@@ -0,0 +1,101 @@
+# Backend/EventBus.py
+# In-process publish/subscribe channel shared by the backend threads and the GUI.
+# Replaces the old Frontend/Files/*.data polling handshake: state lives in memory,
+# subscribers are called on publish and waiters wake up immediately.
+import threading
+from collections import defaultdict
+
+# Topics (values are plain strings, same protocol the .data files used)
+MIC = "mic"                  # "True" / "False"
+STATUS = "status"            # assistant status line, e.g. "Listening..."
+RESPONSES = "responses"      # text shown on the chat screen
+RESPONSE_PARTIAL = "response_partial"  # in-progress answer, replaced until the final RESPONSES arrives
+TYPED_INPUT = "typed_input"  # text submitted from the GUI input box
+CANCEL = "cancel"            # stop the request(s) currently being answered
+HISTORY_REQUEST = "history_request"  # GUI scrolled to the top: send an older transcript page
+HISTORY = "history"          # older transcript page to prepend ("" = nothing older)
+
+
+class EventBus:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._latest = {}
+        self._subscribers = defaultdict(list)
+
+    def publish(self, topic: str, value):
+        """Store the latest value, notify subscribers, then wake any waiters."""
+        with self._cond:
+            self._latest[topic] = value
+            callbacks = list(self._subscribers[topic])
+        for callback in callbacks:
+            try:
+                callback(value)
+            except Exception as e:
+                print(f"[bus] subscriber error on '{topic}': {e}")
+        with self._cond:
+            self._cond.notify_all()
+
+    def subscribe(self, topic: str, callback):
+        """Call callback(value) on every publish to topic. Returns an unsubscribe function."""
+        with self._cond:
+            self._subscribers[topic].append(callback)
+
+        def unsubscribe():
+            with self._cond:
+                if callback in self._subscribers[topic]:
+                    self._subscribers[topic].remove(callback)
+        return unsubscribe
+
+    def latest(self, topic: str, default=None):
+        with self._cond:
+            return self._latest.get(topic, default)
+
+    def wait_until(self, predicate, timeout: float | None = None) -> bool:
+        """Block until predicate() is true (re-checked after every publish) or timeout expires."""
+        with self._cond:
+            return self._cond.wait_for(predicate, timeout=timeout)
+
+
+# Global instance
+bus = EventBus()
+bus.publish(MIC, "False")
+bus.publish(STATUS, "")
+bus.publish(RESPONSES, "")
+
+
+# --- Thin shims keeping the old Frontend/GUI function names ---
+def SetMicrophoneStatus(Command):
+    bus.publish(MIC, Command)
+
+
+def GetMicrophoneStatus():
+    return bus.latest(MIC, "False")
+
+
+def SetAssistantStatus(Status):
+    bus.publish(STATUS, Status)
+
+
+def GetAssistantStatus():
+    return bus.latest(STATUS, "")
+
+
+def ShowTextToScreen(Text, partial=False):
+    # partial=True updates the answer that is still streaming instead of adding a new message
+    bus.publish(RESPONSE_PARTIAL if partial else RESPONSES, Text)
+
+
+def SubmitTypedInput(Text):
+    bus.publish(TYPED_INPUT, Text)
+
+
+def CancelRequests():
+    bus.publish(CANCEL, True)
+
+
+def RequestOlderHistory():
+    bus.publish(HISTORY_REQUEST, True)
+
+
+def ShowOlderHistory(Text):
+    bus.publish(HISTORY, Text)
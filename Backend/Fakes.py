@@ -0,0 +1,238 @@
+# Backend/Fakes.py
+# Offline stand-ins for the network services (Groq, Cohere, Brave, edge-tts, Pollinations)
+# and the local side effects (pygame playback, Automation) with configurable latency.
+# They mimic exactly the parts of each client API the backends use, so the real
+# pipeline code runs unchanged on a machine with no network, audio device or display.
+import asyncio
+import re
+import time
+from types import SimpleNamespace
+
+from Backend.Speculation import guess_branch
+from Backend.Tokens import count_tokens, count_message_tokens
+from Backend.Tracing import traced, PLAYBACK, AUTOMATION, IMAGE_GENERATION
+
+# Seconds. Override any of them with Latency(**overrides) or "--latency key=value,...".
+DEFAULT_LATENCY = {
+    "cohere": 0.6,        # FirstLayerDMM classification (time to first event)
+    "cohere_token": 0.02, # per streamed classifier word
+    "cohere_prefill": 0.1, # extra time to first event per 1000 prompt tokens (preamble + history)
+    "groq_ttft": 0.3,     # time to first token
+    "groq_token": 0.01,   # per streamed token
+    "brave": 0.4,         # one web search
+    "tts": 0.25,          # one edge-tts synthesis
+    "playback": 0.3,      # one played audio file
+    "automation": 0.2,    # one Automation() call
+    "image": 2.0,         # one image generation (Pollinations downloads)
+}
+
+_TASK_PREFIXES = ("open ", "close ", "play ", "system ", "content ", "google search ", "youtube search ", "reminder ")
+
+
+class Latency(dict):
+    def __init__(self, **overrides):
+        super().__init__(DEFAULT_LATENCY)
+        for key, value in overrides.items():
+            if key not in DEFAULT_LATENCY:
+                raise KeyError(f"unknown latency '{key}' (known: {', '.join(DEFAULT_LATENCY)})")
+            self[key] = float(value)
+
+    @classmethod
+    def parse(cls, spec: str | None):
+        """'brave=0.2,groq_ttft=0.1' -> Latency"""
+        overrides = {}
+        for part in (spec or "").split(","):
+            if "=" in part:
+                key, value = part.split("=", 1)
+                overrides[key.strip()] = value.strip()
+        return cls(**overrides)
+
+
+def fake_decision(query: str) -> list[str]:
+    """What FirstLayerDMM would plausibly answer, from the same local rules speculation uses."""
+    decision = []
+    for part in re.split(r"\s+and\s+", query.strip().rstrip(".?!")):
+        text = part.strip().lower()
+        if not text:
+            continue
+        if text.startswith(("generate image", "create image")):
+            decision.append("generate image " + text.split("image", 1)[1].strip())
+        elif text.startswith(_TASK_PREFIXES):
+            decision.append(text)
+        else:
+            decision.append(f"{guess_branch(text) or 'general'} {text}")
+    return decision or [f"general {query}"]
+
+
+def _answer_for(prompt: str, tokens: int) -> list[str]:
+    topic = " ".join(prompt.split()[:8]) or "that"
+    sentence = f"Here is an offline benchmark answer about {topic}. "
+    words = (sentence * (tokens // max(1, len(sentence.split())) + 1)).split(" ")[:tokens]
+    return [w + " " for w in words if w]
+
+
+# --- Groq ------------------------------------------------------------------------
+class FakeGroq:
+    """client.chat.completions.create(..., stream=True|False) with TTFT + per-token latency.
+    .aio is the AsyncGroq twin (await create(...), `async for` over the stream); both
+    count towards .calls."""
+
+    def __init__(self, latency: Latency, tokens: int = 40):
+        self.latency = latency
+        self.tokens = tokens
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.aio = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self._create_async)))
+
+    def _tokens(self, messages, kwargs):
+        self.calls += 1
+        prompt = next((m["content"] for m in reversed(messages or []) if m.get("role") == "user"), "")
+        return _answer_for(prompt, min(self.tokens, kwargs.get("max_tokens") or self.tokens))
+
+    def _create(self, model=None, messages=None, stream=False, **kwargs):
+        tokens = self._tokens(messages, kwargs)
+        if not stream:
+            time.sleep(self.latency["groq_ttft"] + self.latency["groq_token"] * len(tokens))
+            message = SimpleNamespace(content="".join(tokens).strip(), role="assistant")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return self._stream(tokens)
+
+    def _stream(self, tokens):
+        time.sleep(self.latency["groq_ttft"])
+        for token in tokens:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+            time.sleep(self.latency["groq_token"])
+
+    async def _create_async(self, model=None, messages=None, stream=False, **kwargs):
+        tokens = self._tokens(messages, kwargs)
+        if not stream:
+            await asyncio.sleep(self.latency["groq_ttft"] + self.latency["groq_token"] * len(tokens))
+            message = SimpleNamespace(content="".join(tokens).strip(), role="assistant")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return self._stream_async(tokens)
+
+    async def _stream_async(self, tokens):
+        await asyncio.sleep(self.latency["groq_ttft"])
+        for token in tokens:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+            await asyncio.sleep(self.latency["groq_token"])
+
+
+# --- Cohere ----------------------------------------------------------------------
+class FakeCohere:
+    """co.chat_stream(...) yielding text-generation events with a rule-based decision.
+
+    decisions maps a message to the exact decision to return (e.g. from a recorded corpus).
+    """
+
+    def __init__(self, latency: Latency, decisions: dict | None = None):
+        self.latency = latency
+        self.decisions = decisions or {}
+        self.calls = 0
+
+    def chat_stream(self, message="", preamble="", chat_history=None, **kwargs):
+        self.calls += 1
+        decision = self.decisions.get(message) or fake_decision(message)
+        prompt_tokens = count_tokens(preamble) + count_message_tokens(chat_history or [], key="message")
+        return self._stream(", ".join(decision), prompt_tokens)
+
+    def _stream(self, text, prompt_tokens=0):
+        # the real stream spends most of its time before the first event (prefill grows with the prompt)
+        time.sleep(self.latency["cohere"] + self.latency["cohere_prefill"] * prompt_tokens / 1000.0)
+        for piece in re.findall(r"\S+\s*", text):
+            yield SimpleNamespace(event_type="text-generation", text=piece)
+            time.sleep(self.latency["cohere_token"])
+        yield SimpleNamespace(event_type="stream-end", text="")
+
+
+# --- Brave -----------------------------------------------------------------------
+class FakeResponse:
+    def __init__(self, payload, status_code=200, headers=None):
+        self._payload = payload
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+        self.content = b""
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+_SNIPPETS = [
+    "Offline search snippet {i} about {query}, with the facts a reader wants.",
+    "Latest figures on {query} collected by an offline desk.",
+    "Explainer {i}: background, timeline and key people behind {query}.",
+    "Reader questions about {query} answered in brief.",
+    "Analysis of {query} from regional correspondents.",
+]
+_BOILERPLATE = (" Accept cookies to continue reading this page. Sign up for our newsletter and follow us"
+                " on social media for more stories like this one, updated every hour by our editors.")
+
+
+class FakeBrave:
+    """Drop-in for the `requests` module as used by BraveSearch (get + exceptions)."""
+
+    def __init__(self, latency: Latency, exceptions=None):
+        self.latency = latency
+        self.exceptions = exceptions
+        self.calls = 0
+
+    def get(self, url, headers=None, params=None, timeout=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency["brave"])
+        params = params or {}
+        query = params.get("q", "")
+        count = int(params.get("count", 5))
+        # like real results: differently worded pages, boilerplate in some snippets and the
+        # first story syndicated again as news
+        web = [
+            {"title": f"{query} - result {i}", "url": f"https://example.com/{i}",
+             "description": _SNIPPETS[(i - 1) % len(_SNIPPETS)].format(query=query, i=i)
+                            + (_BOILERPLATE if i % 2 else "")}
+            for i in range(1, count + 1)
+        ]
+        news = [{"title": f"{query} news", "url": "https://news.example.com/1",
+                 "description": _SNIPPETS[0].format(query=query, i=1)}]
+        return FakeResponse({"web": {"results": web}, "news": {"results": news}})
+
+
+# --- edge-tts / pygame -------------------------------------------------------------
+def make_fake_edge_tts(latency: Latency):
+    async def _edge_tts_to_file(text, out_mp3, tone):
+        await asyncio.sleep(latency["tts"])
+        with open(out_mp3, "wb") as f:
+            f.write(b"ID3" + b"\0" * 64)
+    return _edge_tts_to_file
+
+
+def make_fake_playback(latency: Latency):
+    @traced(PLAYBACK)
+    def _play_file(path, func=lambda r=None: True):
+        deadline = time.perf_counter() + latency["playback"]
+        while time.perf_counter() < deadline:
+            if func() == False:
+                return False
+            time.sleep(min(0.02, max(0.0, deadline - time.perf_counter())))
+        return True
+    return _play_file
+
+
+# --- Automation / Pollinations -------------------------------------------------------
+def make_fake_automation(latency: Latency):
+    @traced(AUTOMATION)
+    async def Automation(commands):
+        await asyncio.sleep(latency["automation"] * max(1, len(commands)))
+        return True
+    return Automation
+
+
+def make_fake_image_generation(latency: Latency):
+    @traced(IMAGE_GENERATION)
+    def GenerateImages(prompt, request):
+        # stands in for the ImageGeneration.py subprocess and its Pollinations downloads
+        time.sleep(latency["image"])
+    return GenerateImages
@@ -0,0 +1,204 @@
+# Backend/GroqClient.py
+# One shared Groq client for Chatbot, RealtimeSearchEngine and Automation. All of them
+# used to build their own Groq(api_key=...) (and so their own connection pool) at
+# import time; now they share one httpx pool with keep-alive, so after the first call
+# every turn reuses an open TLS connection. warm_up() opens that connection in the
+# background at startup. get_async_client() is the AsyncGroq twin for asyncio callers
+# (one per event loop). The SDK's own retries are off (max_retries=0):
+# Resilience.retry_call owns retrying.
+#
+# The async backends (ChatBotAsync, RealtimeSearchEngineAsync) keep their blocking
+# wrappers through run_sync(), which runs the coroutine on one shared "groq-async" loop
+# while on_token/before_save still run in the calling thread; stream_tokens() turns such a
+# coroutine into an async iterator of tokens.
+#
+# Metrics: groq.requests, groq.connections_new, groq.connections_reused.
+import asyncio
+import concurrent.futures
+import inspect
+import os
+import queue
+import threading
+import weakref
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+from groq import Groq, AsyncGroq
+
+from . import Metrics
+from .Tracing import current_trace, activate
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(PROJECT_ROOT / ".env")
+
+BASE_URL = "https://api.groq.com"
+LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8, keepalive_expiry=300.0)
+TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+_lock = threading.Lock()
+_http = None
+_client = None
+_async_client = None                              # pins one client for every loop (benchmark fake)
+_async_clients = weakref.WeakKeyDictionary()      # event loop -> AsyncGroq
+_loop = None
+
+
+# --- connection reuse accounting (httpcore "trace" request extension) ---
+def _count(new_connection: bool):
+    Metrics.incr("groq.requests")
+    Metrics.incr("groq.connections_new" if new_connection else "groq.connections_reused")
+
+
+def _on_request(request: httpx.Request):
+    state = {"connected": False}
+
+    def trace(event: str, info: dict):
+        if event.startswith("connection.connect_tcp.complete"):
+            state["connected"] = True
+
+    request.extensions["trace"] = trace
+    request.extensions["groq_state"] = state
+
+
+def _on_response(response: httpx.Response):
+    _count(response.request.extensions.get("groq_state", {}).get("connected", False))
+
+
+async def _on_request_async(request: httpx.Request):
+    state = {"connected": False}
+
+    async def trace(event: str, info: dict):
+        if event.startswith("connection.connect_tcp.complete"):
+            state["connected"] = True
+
+    request.extensions["trace"] = trace
+    request.extensions["groq_state"] = state
+
+
+async def _on_response_async(response: httpx.Response):
+    _on_response(response)
+
+
+# --- factories ---
+def get_client() -> Groq:
+    """The process-wide Groq client (created on first use)."""
+    global _client, _http
+    with _lock:
+        if _client is None:
+            _http = httpx.Client(
+                limits=LIMITS, timeout=TIMEOUT,
+                event_hooks={"request": [_on_request], "response": [_on_response]},
+            )
+            _client = Groq(api_key=os.getenv("GroqAPIKey"), http_client=_http, max_retries=0)
+        return _client
+
+
+def get_async_client() -> AsyncGroq:
+    """The AsyncGroq client of the running event loop (an httpx async pool belongs to one loop)."""
+    if _async_client is not None:
+        return _async_client
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            http = httpx.AsyncClient(
+                limits=LIMITS, timeout=TIMEOUT,
+                event_hooks={"request": [_on_request_async], "response": [_on_response_async]},
+            )
+            client = _async_clients[loop] = AsyncGroq(api_key=os.getenv("GroqAPIKey"), http_client=http, max_retries=0)
+        return client
+
+
+def warm_up(background: bool = True):
+    """Open the pooled TLS connection to Groq before the first real request."""
+    def _warm():
+        try:
+            get_client()
+            _http.head(BASE_URL, timeout=5.0)
+        except Exception as e:
+            print(f"[groq] warm-up failed: {e}")
+
+    if background:
+        threading.Thread(target=_warm, daemon=True, name="groq-warm-up").start()
+    else:
+        _warm()
+
+
+# --- async backends from blocking code ---
+def event_loop() -> asyncio.AbstractEventLoop:
+    """The shared background loop the blocking wrappers run on (its pool stays warm)."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True, name="groq-async").start()
+        return _loop
+
+
+async def call(fn, *args):
+    """Call a plain or async callback (None is skipped)."""
+    if fn is None:
+        return None
+    result = fn(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def run_sync(start, on_token=None, before_save=None):
+    """Block on start(on_token, before_save) -- a coroutine -- run on event_loop().
+
+    on_token and before_save are called in this thread, in order, exactly as the old
+    blocking backends called them, so they may block (speculation commit) or raise
+    RequestCancelled; either cancels the coroutine.
+    """
+    events = queue.Queue()
+    trace = current_trace()
+
+    def _token(text):
+        events.put(("token", text))
+
+    async def _before_save():
+        done = concurrent.futures.Future()
+        events.put(("before_save", done))
+        await asyncio.wrap_future(done)
+
+    async def _run():
+        with activate(trace):
+            return await start(_token if on_token else None, _before_save if before_save else None)
+
+    future = asyncio.run_coroutine_threadsafe(_run(), event_loop())
+    future.add_done_callback(lambda _: events.put(("done", None)))
+    try:
+        while True:
+            kind, value = events.get()
+            if kind == "token":
+                on_token(value)
+            elif kind == "before_save":
+                try:
+                    before_save()
+                except BaseException:
+                    value.cancel()
+                    raise
+                value.set_result(None)
+            else:
+                return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+async def stream_tokens(start):
+    """Async iterator over the tokens start(on_token) -- a coroutine -- produces."""
+    tokens = asyncio.Queue()
+    finished = object()
+    task = asyncio.ensure_future(start(tokens.put_nowait))
+    task.add_done_callback(lambda _: tokens.put_nowait(finished))
+    try:
+        while (token := await tokens.get()) is not finished:
+            yield token
+        await task                          # re-raise a failure of the producer
+    finally:
+        if not task.done():
+            task.cancel()
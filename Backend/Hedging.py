@@ -0,0 +1,134 @@
+# Backend/Hedging.py
+# Hedged, latency-aware calls across interchangeable backends (e.g. the Cohere models
+# FirstLayerDMM can use). Each candidate keeps an EWMA of its time to first result and
+# of its error rate; candidates are tried best-first. If the running attempt has not
+# produced its first result after a hedge delay, the next candidate is fired as well
+# and whichever answers first wins. The loser's stream is closed.
+import queue
+import threading
+import time
+
+from . import Metrics
+
+ALPHA = 0.3                 # EWMA weight of the newest sample
+INITIAL_LATENCY = 1.0       # seconds assumed for a candidate with no history
+ERROR_PENALTY = 4.0         # score = latency * (1 + ERROR_PENALTY * error_rate)
+HEDGE_FACTOR = 1.5          # hedge after HEDGE_FACTOR x the primary's EWMA latency ...
+MIN_HEDGE_DELAY = 0.25      # ... but never sooner than this
+MAX_HEDGE_DELAY = 2.0       # ... or later than this
+_END = object()
+
+
+class LatencyStats:
+    """EWMA latency and error rate per candidate name."""
+
+    def __init__(self, name: str):
+        self.name = name              # metrics prefix, e.g. "cohere"
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._errors = {}
+
+    def record(self, key: str, seconds: float, ok: bool):
+        with self._lock:
+            if ok:
+                old = self._latency.get(key)
+                self._latency[key] = seconds if old is None else ALPHA * seconds + (1 - ALPHA) * old
+            err = self._errors.get(key, 0.0)
+            self._errors[key] = ALPHA * (0.0 if ok else 1.0) + (1 - ALPHA) * err
+            latency, error_rate = self._latency.get(key), self._errors[key]
+        if latency is not None:
+            Metrics.set_gauge(f"{self.name}.{key}.ewma_ms", round(latency * 1000.0, 1))
+        Metrics.set_gauge(f"{self.name}.{key}.error_rate", round(error_rate, 3))
+
+    def latency(self, key: str) -> float:
+        with self._lock:
+            return self._latency.get(key, INITIAL_LATENCY)
+
+    def score(self, key: str) -> float:
+        with self._lock:
+            latency = self._latency.get(key, INITIAL_LATENCY)
+            return latency * (1.0 + ERROR_PENALTY * self._errors.get(key, 0.0))
+
+    def rank(self, candidates: list[str]) -> list[str]:
+        """Candidates best-first (stable: ties keep the configured order)."""
+        return sorted(candidates, key=self.score)
+
+    def hedge_delay(self, key: str) -> float:
+        return min(MAX_HEDGE_DELAY, max(MIN_HEDGE_DELAY, HEDGE_FACTOR * self.latency(key)))
+
+
+def _close(stream):
+    close = getattr(stream, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception:
+            pass
+
+
+def hedged_stream(candidates: list[str], start, stats: LatencyStats, hedge: bool = True):
+    """Run start(candidate) -> iterable on the best candidate, hedging with the next ones.
+
+    Returns (candidate, iterator) where iterator yields the winner's whole stream
+    (including the first item that decided the race), or (None, None) if every
+    candidate failed before producing anything.
+    """
+    order = stats.rank(candidates)
+    results = queue.Queue()
+    lock = threading.Lock()
+    state = {"winner": None}
+
+    def attempt(key):
+        started = time.perf_counter()
+        stream = None
+        try:
+            stream = iter(start(key))
+            first = next(stream, _END)
+        except Exception as e:
+            stats.record(key, time.perf_counter() - started, ok=False)
+            results.put((key, None, None, e))
+            return
+        stats.record(key, time.perf_counter() - started, ok=True)
+        with lock:
+            lost = state["winner"] is not None
+        if lost:
+            _close(stream)          # someone else answered first
+            return
+        results.put((key, stream, first, None))
+
+    launched, running = 0, 0
+    while True:
+        if running == 0:
+            if launched == len(order):
+                return None, None
+            threading.Thread(target=attempt, args=(order[launched],), daemon=True, name=f"hedge-{order[launched]}").start()
+            launched, running = launched + 1, running + 1
+        can_hedge = hedge and launched < len(order)
+        try:
+            key, stream, first, error = results.get(timeout=stats.hedge_delay(order[launched - 1]) if can_hedge else None)
+        except queue.Empty:
+            # the running attempt is slow: fire the next candidate alongside it
+            Metrics.incr(f"{stats.name}.hedge.fired")
+            threading.Thread(target=attempt, args=(order[launched],), daemon=True, name=f"hedge-{order[launched]}").start()
+            launched, running = launched + 1, running + 1
+            continue
+        running -= 1
+        if error is not None:
+            print(f"[hedge] {key} failed: {error}")
+            continue
+        with lock:
+            state["winner"] = key
+        while True:                 # results that arrived in the same instant lose too
+            try:
+                _close(results.get_nowait()[1])
+            except queue.Empty:
+                break
+        if key != order[0]:
+            Metrics.incr(f"{stats.name}.hedge.won_by_fallback")
+        return key, _chain(first, stream)
+
+
+def _chain(first, stream):
+    if first is not _END:
+        yield first
+    yield from stream
@@ -7,8 +7,8 @@ import numpy as np
 from dotenv import load_dotenv
 from pathlib import Path
 
-# Your existing GUI imports
-from Frontend.GUI import SetMicrophoneStatus, GetMicrophoneStatus, SetAssistantStatus
+# Shared in-memory state (no Qt / file polling needed here)
+from Backend.EventBus import bus, SetMicrophoneStatus, GetMicrophoneStatus, SetAssistantStatus
 
 # Load environment variables
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -98,14 +98,14 @@ class PorcupineWakeWordDetector:
                         SetAssistantStatus("Voice activation...")
                         SetMicrophoneStatus("True")
                         
-                        # Wait for conversation to end
-                        while GetMicrophoneStatus() == "True":
-                            time.sleep(0.5)
+                        # Wait for conversation to end (woken on the mic state change)
+                        while self.is_listening and not bus.wait_until(lambda: GetMicrophoneStatus() != "True", timeout=1.0):
+                            pass
                         
                         print("🔄 Ready for next 'Jarvis' activation...")
                         
                 else:
-                    time.sleep(0.1)
+                    bus.wait_until(lambda: GetMicrophoneStatus() == "False", timeout=1.0)
                     
             except Exception as e:
                 print(f"Audio processing error: {e}")
@@ -4,11 +4,18 @@ from PIL import Image
 import os
 from time import sleep
 import requests
+import sys
 from pathlib import Path
 
 
 # ✅ FIX FILE PATHS - ONLY ADDITION TO YOUR CODE
 PROJECT_ROOT = Path(__file__).parent.parent
+
+# Run as a script by Main.py: make the Backend package importable for the shared Brave limiter.
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from Backend import RateLimit
+
 DATA_DIR = PROJECT_ROOT / "Data"
 FRONTEND_FILES_DIR = PROJECT_ROOT / "Frontend" / "Files"
 
@@ -51,7 +58,10 @@ def _spec_hint_if_model(p: str) -> str:
     try:
         headers = {"X-Subscription-Token": BRAVE_KEY}
         params  = {"q": p, "count": 5, "country": "in", "search_lang": "en"}
+        limiter = RateLimit.brave()          # same bucket as BraveSearch; the hint never waits long
+        limiter.acquire(max_wait=0.5)
         r = requests.get("https://api.search.brave.com/res/v1/web/search", headers=headers, params=params, timeout=6)
+        limiter.update(r.headers, r.status_code)
         if not r.ok:
             return ""
         data = r.json()
@@ -0,0 +1,321 @@
+# Backend/IntentClassifier.py
+# Local fast path in front of FirstLayerDMM. Obvious commands ("open chrome", "play let
+# her go", "system volume up", "what's the time") are classified in well under a
+# millisecond by a compiled word trie; general/realtime questions can be classified by a
+# small NumPy linear model trained on the decisions Cohere made before (logged to
+# Data/decisions.jsonl). Only when every part of the utterance is classified confidently
+# is the result returned; anything ambiguous returns None and goes to Cohere as before.
+#
+#   python -m Backend.IntentClassifier --train     # refit Data/intent_model.npz from the log
+#
+# Metrics: intent.fast_path.hit / .miss (hit rate), intent.rule / intent.model, and the
+# gauge intent.threshold.
+import json
+import re
+import threading
+import zlib
+from pathlib import Path
+
+from . import Metrics
+
+try:
+    import numpy as np
+    _NUMPY_AVAILABLE = True
+except Exception:
+    _NUMPY_AVAILABLE = False
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "Data"
+DATA_DIR.mkdir(exist_ok=True)
+DECISION_LOG_PATH = DATA_DIR / "decisions.jsonl"
+MODEL_PATH = DATA_DIR / "intent_model.npz"
+
+THRESHOLD = 0.9          # minimum model probability for a general/realtime fast-path answer
+MIN_EXAMPLES = 40        # logged single-branch decisions needed before the model is trusted
+FEATURE_DIM = 1 << 12    # hashed unigram + bigram features
+ENABLED = True
+
+Metrics.set_gauge("intent.threshold", THRESHOLD)
+
+# --- Rules ---------------------------------------------------------------------------
+# phrase -> (task prefix, kind)
+#   arg    the rest of the utterance is the argument:        "play let her go" -> "play let her go"
+#   list   like arg, but "a, b and c" becomes one task each:  "open chrome and firefox"
+#   fixed  the whole utterance must be the phrase:            "what's the time" -> "general what's the time"
+#   system maps to a System() command:                        "mute" -> "system mute"
+#          (only "now"/"please" may follow: "volume up by 10" goes to Cohere)
+# An argument must look like one: "search on google for cats" drops the "for", and
+# "close enough" / "play with me" (particle or pronoun first) are left to the model.
+RULES = {
+    "open": ("open", "list"),
+    "close": ("close", "list"),
+    "play": ("play", "arg"),
+    "system": ("system", "arg"),
+    "mute": ("system", "system"),
+    "unmute": ("system", "system"),
+    "volume up": ("system", "system"),
+    "volume down": ("system", "system"),
+    "increase volume": ("system", "system"),
+    "decrease volume": ("system", "system"),
+    "lock screen": ("system", "system"),
+    "google search": ("google search", "arg"),
+    "search google for": ("google search", "arg"),
+    "search on google": ("google search", "arg"),
+    "youtube search": ("youtube search", "arg"),
+    "search youtube for": ("youtube search", "arg"),
+    "search on youtube": ("youtube search", "arg"),
+    "generate image": ("generate image", "arg"),
+    "generate an image of": ("generate image", "arg"),
+    "create an image of": ("generate image", "arg"),
+    "create image of": ("generate image", "arg"),
+    "what's the time": ("general", "fixed"),
+    "what is the time": ("general", "fixed"),
+    "what time is it": ("general", "fixed"),
+    "what's the date": ("general", "fixed"),
+    "what is the date": ("general", "fixed"),
+    "what's today's date": ("general", "fixed"),
+    "what is today's date": ("general", "fixed"),
+    "what day is it": ("general", "fixed"),
+    "what day is it today": ("general", "fixed"),
+    "bye": ("exit", "fixed"),
+    "goodbye": ("exit", "fixed"),
+    "good bye": ("exit", "fixed"),
+    "exit": ("exit", "fixed"),
+}
+
+_MAX_LIST_ITEM_WORDS = 3           # "open chrome and tell me about x" is not a list of apps
+_NOT_AN_ITEM = {"what", "what's", "who", "who's", "how", "why", "when", "where", "which", "tell", "is", "are",
+                "can", "could", "would", "do", "does", "please", "set", "write", "search", "remind"}
+_NOT_AN_ARG = {"enough", "with", "to", "up", "down", "out", "in", "on", "off", "by", "along", "around",
+               "it", "me", "you", "him", "her", "us", "them", "this", "that", "again", "now", "here",
+               "there", "together", "fair", "for", "about"}
+_ARG_FILLER = ("for ", "about ")    # "search on google for cats" -> "cats"
+_POLITE = {"now", "please"}
+_SPLIT = re.compile(r"\s*(,|\band\b|\bthen\b)\s*")
+_TOKEN = re.compile(r"[\w']+")
+
+
+def _compile(rules: dict) -> dict:
+    """Word trie: {word: {..., "$": (task, kind)}}."""
+    root = {}
+    for phrase, target in rules.items():
+        node = root
+        for word in phrase.split():
+            node = node.setdefault(word, {})
+        node["$"] = target
+    return root
+
+
+_TRIE = _compile(RULES)
+
+
+def _match(words: list[str]):
+    """Longest rule prefix of words: (task, kind, words consumed) or None."""
+    node, best = _TRIE, None
+    for i, word in enumerate(words):
+        node = node.get(word)
+        if node is None:
+            break
+        if "$" in node:
+            best = (*node["$"], i + 1)
+    return best
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.lower().strip().rstrip(".!?").split())
+
+
+def _rule_tasks(segment: str):
+    """Tasks for one segment from the trie, [] for no rule, None for a rule that cannot apply."""
+    words = segment.split()
+    m = _match(words)
+    if m is None:
+        return []
+    task, kind, used = m
+    rest = " ".join(words[used:])
+    if kind == "fixed":
+        if used != len(words):
+            return None
+        return ["exit"] if task == "exit" else [f"{task} {segment}"]
+    if kind == "system":
+        if any(w not in _POLITE for w in words[used:]):
+            return None
+        return [f"system {' '.join(words[:used])}"]
+    if task in ("google search", "youtube search") and rest.startswith(_ARG_FILLER):
+        rest = rest.split(" ", 1)[1]
+    if not rest:
+        return None
+    if kind == "list":
+        items = [i for i in _SPLIT.split(rest)[::2] if i]
+        if any(len(i.split()) > _MAX_LIST_ITEM_WORDS or i.split()[0] in _NOT_AN_ITEM | _NOT_AN_ARG for i in items):
+            return None
+        return [f"{task} {i}" for i in items]
+    if rest.split()[0] in _NOT_AN_ARG:
+        return None
+    return [f"{task} {rest}"]
+
+
+def _segments(text: str) -> list[str]:
+    """Split on ',', 'and', 'then' only where the next piece starts a known command."""
+    pieces = _SPLIT.split(text)
+    segments = [pieces[0]]
+    for joiner, piece in zip(pieces[1::2], pieces[2::2]):
+        if piece and _match(piece.split()) is not None:
+            segments.append(piece)
+        else:
+            segments[-1] = f"{segments[-1]}{joiner if joiner == ',' else ' ' + joiner} {piece}".strip()
+    return [s.strip() for s in segments if s.strip()]
+
+
+# --- Linear model --------------------------------------------------------------------
+def _features(text: str) -> list[int]:
+    words = _TOKEN.findall(text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    # crc32 instead of hash(): stable across processes, so saved weights stay valid
+    return sorted({zlib.crc32(g.encode("utf-8")) % FEATURE_DIM for g in grams})
+
+
+class LinearIntentModel:
+    """Multinomial logistic regression over hashed word features."""
+
+    def __init__(self, labels: list[str], weights=None, bias=None):
+        self.labels = list(labels)
+        self.W = weights if weights is not None else np.zeros((len(labels), FEATURE_DIM), dtype=np.float32)
+        self.b = bias if bias is not None else np.zeros(len(labels), dtype=np.float32)
+
+    def predict(self, text: str):
+        """(label, probability) for text."""
+        idx = _features(text)
+        scores = self.W[:, idx].sum(axis=1) + self.b
+        scores = np.exp(scores - scores.max())
+        probs = scores / scores.sum()
+        best = int(probs.argmax())
+        return self.labels[best], float(probs[best])
+
+    @classmethod
+    def train(cls, examples: list[tuple[str, str]], epochs: int = 200, lr: float = 1.0, l2: float = 1e-4):
+        labels = sorted({label for _, label in examples})
+        X = np.zeros((len(examples), FEATURE_DIM), dtype=np.float32)
+        Y = np.zeros((len(examples), len(labels)), dtype=np.float32)
+        for row, (text, label) in enumerate(examples):
+            X[row, _features(text)] = 1.0
+            Y[row, labels.index(label)] = 1.0
+        model = cls(labels)
+        for _ in range(epochs):      # full-batch gradient descent; the log is small
+            scores = X @ model.W.T + model.b
+            scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+            probs = scores / scores.sum(axis=1, keepdims=True)
+            grad = (probs - Y) / len(examples)
+            model.W -= lr * (grad.T @ X + l2 * model.W)
+            model.b -= lr * grad.sum(axis=0)
+        return model
+
+    def save(self, path: Path):
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, W=self.W, b=self.b, labels=np.array(self.labels))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path):
+        with np.load(path) as data:
+            return cls([str(l) for l in data["labels"]], data["W"].astype(np.float32), data["b"].astype(np.float32))
+
+
+_model = None
+_model_loaded = False
+_log_lock = threading.Lock()
+
+
+def get_model():
+    """The trained model, or None without NumPy / before enough decisions were logged."""
+    global _model, _model_loaded
+    if not _model_loaded:
+        _model_loaded = True
+        if _NUMPY_AVAILABLE and MODEL_PATH.exists():
+            try:
+                _model = LinearIntentModel.load(MODEL_PATH)
+            except Exception as e:
+                print(f"[intent] could not load {MODEL_PATH.name}: {e}")
+    return _model
+
+
+def record(prompt: str, decision: list[str]):
+    """Log a Cohere decision as training data for the model."""
+    try:
+        with _log_lock, open(DECISION_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"prompt": prompt, "decision": decision}, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"[intent] could not log decision: {e}")
+
+
+def training_examples(path: Path | None = None) -> list[tuple[str, str]]:
+    """(text, 'general'|'realtime') from logged single-branch decisions."""
+    examples = []
+    try:
+        lines = (path or DECISION_LOG_PATH).read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return examples
+    for line in lines:
+        try:
+            row = json.loads(line)
+        except ValueError:
+            continue
+        decision = row.get("decision") or []
+        if len(decision) == 1 and decision[0].split(" ", 1)[0] in ("general", "realtime"):
+            examples.append((_clean(row.get("prompt", "")), decision[0].split(" ", 1)[0]))
+    return examples
+
+
+def train(path: Path | None = None):
+    """Refit the model from the decision log and save it. Returns the model or None."""
+    global _model, _model_loaded
+    examples = training_examples(path)
+    if not _NUMPY_AVAILABLE:
+        print("[intent] NumPy is not installed; only the rule fast path is available")
+        return None
+    if len(examples) < MIN_EXAMPLES or len({label for _, label in examples}) < 2:
+        print(f"[intent] {len(examples)} logged decisions, need {MIN_EXAMPLES} covering general and realtime")
+        return None
+    model = LinearIntentModel.train(examples)
+    model.save(MODEL_PATH)
+    _model, _model_loaded = model, True
+    return model
+
+
+# --- Entry point ----------------------------------------------------------------------
+def classify(prompt: str) -> list[str] | None:
+    """FirstLayerDMM-style task list if every part is confidently classified, else None."""
+    if not ENABLED:
+        return None
+    text = _clean(prompt)
+    segments = _segments(text) if text else []
+    tasks, used_model = [], False
+    for segment in segments:
+        found = _rule_tasks(segment)
+        if found is None or ("exit" in found and len(segments) > 1):
+            tasks = None
+            break
+        if not found:
+            model = get_model()
+            label, p = model.predict(segment) if model is not None else (None, 0.0)
+            if p < THRESHOLD:
+                tasks = None
+                break
+            found, used_model = [f"{label} {segment}"], True
+        tasks.extend(found)
+    if not tasks:
+        Metrics.incr("intent.fast_path.miss")
+        return None
+    Metrics.incr("intent.fast_path.hit")
+    Metrics.incr("intent.model" if used_model else "intent.rule")
+    return tasks
+
+
+if __name__ == "__main__":
+    import sys
+    if "--train" in sys.argv:
+        model = train()
+        if model is not None:
+            print(f"Trained on {len(training_examples())} decisions -> {MODEL_PATH}")
+    else:
+        while True:
+            print(classify(input(">>> ")))
@@ -0,0 +1,49 @@
+# Backend/Metrics.py
+# Process-wide counters and gauges (cache hits/misses, classifier hit rate, breaker
+# state, ...). Written to Data/counters.json next to latency.csv whenever the tracing
+# layer exports (see Backend/Tracing.export).
+import json
+import os
+import threading
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "Data"
+DATA_DIR.mkdir(exist_ok=True)
+COUNTERS_PATH = DATA_DIR / "counters.json"
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+
+
+def incr(name: str, n: float = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def set_gauge(name: str, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def get(name: str, default=0):
+    with _lock:
+        return _counters.get(name, _gauges.get(name, default))
+
+
+def hit_rate(prefix: str) -> float:
+    """hits / (hits + misses) for counters named '<prefix>.hit' and '<prefix>.miss'."""
+    hits, misses = get(f"{prefix}.hit"), get(f"{prefix}.miss")
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {"counters": dict(_counters), "gauges": dict(_gauges)}
+
+
+def write(path: Path | None = None):
+    path = path or COUNTERS_PATH
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(snapshot(), indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
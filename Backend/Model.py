@@ -3,7 +3,21 @@ from rich import print                    # Import the Rich library to enhance t
 from dotenv import load_dotenv            # ✅ CHANGED: Import load_dotenv instead of dotenv_values
 from pathlib import Path                  # Path handling for robust file operations
 import os                                 # ✅ ADDED: Import os for environment variable access
+import hashlib
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from .Config import Username, Assistantname
+from .Tracing import traced, FIRST_LAYER_DMM
+from . import IntentClassifier            # local fast path (rule trie + optional linear model)
+from . import Metrics
+from .Cache import PersistentLRU
+from .Hedging import LatencyStats, hedged_stream
+from .TaskStream import TaskParser
+from .Tokens import count_tokens, count_message_tokens
+from .Resilience import breaker, retry_call, ProviderUnavailable
+from .Speculation import guess_branch
 
 # ✅ FIXED: Load environment variables from absolute path
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -62,72 +76,229 @@ ChatHistory = [
     {"role": "Chatbot", "message": "general chat with me"}
 ]
 
+# --- ADDED: prompt variants and token budget ---
+# The full preamble and ChatHistory above are re-sent with every classification. The
+# compact variant states the same rules once each with a single example and keeps only
+# the few-shot turns that teach multi-task output, for a fraction of the prefill tokens.
+# Pick it with PROMPT_VARIANT / the DecisionPromptVariant env var and compare accuracy
+# with `python -m Backend.DecisionEval --prompt compact`.
+preamble_compact = """
+Classify the query; never answer it. Reply only with comma-separated tasks:
+general (query): an LLM can answer without fresh data, incl. incomplete queries ("who is he?") and time/date questions.
+realtime (query): needs up-to-date information (news, current events) or is about a named person/thing ("who is akshay kumar").
+open (app or website) / close (app): one task per app.
+play (song name): one task per song.
+generate image (prompt): one task per image.
+reminder (datetime message): e.g. "reminder 9:00pm 25th june business meeting".
+system (task): mute, unmute, volume up, volume down, etc.
+content (topic): write an application, code, email or other content.
+google search (topic) / youtube search (topic).
+exit: the user says goodbye ("bye jarvis.").
+Several tasks: "open facebook, open telegram, close whatsapp". If unsure or unsupported: general (query).
+"""
+
+ChatHistory_compact = [
+    {"role": "User", "message": "how are you?"},
+    {"role": "Chatbot", "message": "general how are you?"},
+    {"role": "User", "message": "open chrome and tell me about mahatma gandhi."},
+    {"role": "Chatbot", "message": "open chrome, general tell me about mahatma gandhi."},
+    {"role": "User", "message": "what is today's date and remind me of my dancing performance at 11pm on 5th aug"},
+    {"role": "Chatbot", "message": "general what is today's date, reminder 11:00pm 5th aug dancing performance"}
+]
+
+PROMPT_VARIANTS = {
+    "full": lambda: (preamble, ChatHistory),
+    "compact": lambda: (preamble_compact, ChatHistory_compact),
+}
+PROMPT_VARIANT = os.getenv("DecisionPromptVariant", "full")
+
+_compiled_prompts = {}
+
+def decision_prompt(variant: str | None = None):
+    """(preamble, chat_history, prompt_tokens) for the chosen variant, whitespace-canonicalized.
+    Compiled once per variant and recompiled if its source text changes."""
+    variant = variant or PROMPT_VARIANT
+    pre, history = PROMPT_VARIANTS[variant]()
+    source = (pre, json.dumps(history, ensure_ascii=False))
+    compiled = _compiled_prompts.get(variant)
+    if compiled is None or compiled[0] != source:
+        pre = "\n".join(" ".join(line.split()) for line in pre.strip().splitlines() if line.strip())
+        history = [{"role": m["role"], "message": " ".join(m["message"].split())} for m in history]
+        tokens = count_tokens(pre) + count_message_tokens(history, key="message")
+        compiled = _compiled_prompts[variant] = (source, (pre, history, tokens))
+    return compiled[1]
+# --- END prompt variants ---
+
+# --- ADDED: hedged model selection ---
+# Supported ids; if one ever 404s again it simply loses to the next one.
+MODEL_CANDIDATES = [
+    "command-a-03-2025",
+    "command-r-plus-08-2024",
+    "command-r-08-2024"
+]
+HEDGED_REQUESTS = True                    # False = strict fallback order, one request at a time
+MODEL_STATS = LatencyStats("cohere")      # EWMA time-to-first-event and error rate per model
+# --- END hedged model selection ---
+
+# --- ADDED: persistent decision cache ---
+# Filtered task lists keyed on the normalized prompt (Data/decision_cache.json). The
+# cache is tagged with a hash of the active preamble, ChatHistory and funcs, so editing
+# any of them (or switching variant) starts a fresh cache instead of replaying decisions
+# made under the old prompt.
+DECISION_CACHE_PATH = PROJECT_ROOT / "Data" / "decision_cache.json"
+DECISION_CACHE_SIZE = 1024
+DECISION_CACHE_ENABLED = True             # the offline evaluation turns it off
+_decision_cache = None
+
+def prompt_fingerprint() -> str:
+    pre, history, _ = decision_prompt()
+    blob = json.dumps([pre, history, funcs], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+def decision_cache() -> PersistentLRU:
+    global _decision_cache
+    version = prompt_fingerprint()
+    if _decision_cache is None or _decision_cache.version != version:
+        _decision_cache = PersistentLRU(DECISION_CACHE_PATH, maxsize=DECISION_CACHE_SIZE, version=version)
+    return _decision_cache
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(re.sub(r"[^\w\s',]", " ", prompt.lower()).split()).strip(" ,")
+# --- END decision cache ---
+
+def local_decision(prompt: str) -> list[str]:
+    """Routing without Cohere (breaker open / all candidates failed): general or realtime."""
+    Metrics.incr("fallback.first_layer_dmm")
+    return [f"{guess_branch(prompt) or 'general'} {prompt}"]
+
 # Define the main function for decision-making on queries.
-def FirstLayerDMM(prompt: str = "test"):
+@traced(FIRST_LAYER_DMM)
+def FirstLayerDMM(prompt: str = "test", on_task=None, _depth: int = 0):
+    """Classify prompt into a list of tasks ("open chrome", "general ..."). on_task(task), if
+    given, is called for every task parsed from the Cohere stream while it is still
+    streaming (fast-path and cached decisions are simply returned). While Cohere is
+    unavailable the decision falls back to local_decision()."""
     # Add the user's query to the messages list.  (BUGFIX: store the actual prompt)
     messages.append({"role": "user", "content": f"{prompt}"})
 
-    # Create a streaming chat session with the Cohere model.
-    # Only change: use a supported id; if it ever 404s again, swap to the next one.
-    MODEL_CANDIDATES = [
-        "command-a-03-2025",
-        "command-r-plus-08-2024",
-        "command-r-08-2024"
-    ]
-    stream = None
-    for _model in MODEL_CANDIDATES:
-        try:
-            stream = co.chat_stream(
-                model=_model,                 # ← was 'command-r-plus' (now removed)
-                message=prompt,               # Pass the user's query.
-                temperature=0.7,              # Set the creativity level of the model.
-                chat_history=ChatHistory,     # Provide the predefined chat history for context.
-                prompt_truncation='OFF',      # Ensure the prompt is not truncated.
-                connectors=[],                # No additional connectors are used.
-                preamble=preamble             # Pass the detailed instruction preamble.
-            )
-            break
-        except Exception as e:
-            stream = None
-            continue
+    # Obvious commands are classified locally; only ambiguous input goes to Cohere.
+    fast = IntentClassifier.classify(prompt)
+    if fast is not None:
+        return fast
 
-    # Initialize an empty string to store the generated response.
-    response = ""
+    # Repeat utterances route instantly (and consistently, despite temperature=0.7).
+    key = normalize_prompt(prompt)
+    cached = decision_cache().get(key) if DECISION_CACHE_ENABLED else None
+    if cached is not None:
+        Metrics.incr("decision_cache.hit")
+        return list(cached)
+    Metrics.incr("decision_cache.miss")
 
-    # Iterate over events in the stream and capture text generation events.
-    if stream is not None:
-        for event in stream:
-            if event.event_type == "text-generation":
-                response += event.text       # Append generated text to the response.
+    cohere_breaker = breaker("cohere")
+
+    # Create a streaming chat session with the Cohere model. The candidates are ranked by
+    # their observed latency/error score; a slow one is hedged with the next (see Hedging).
+    _preamble, _history, _tokens = decision_prompt()
+    Metrics.incr("first_layer_dmm.cohere_calls")
+    Metrics.incr("first_layer_dmm.prompt_tokens", _tokens + count_tokens(prompt))
+    Metrics.set_gauge("first_layer_dmm.prompt_tokens_last", _tokens + count_tokens(prompt))
 
-    # Remove newline characters and split responses into individual tasks.
-    response = response.replace("\n", "")
-    response = response.split(".")
+    def _start(_model):
+        return co.chat_stream(
+            model=_model,                 # ← was 'command-r-plus' (now removed)
+            message=prompt,               # Pass the user's query.
+            temperature=0.7,              # Set the creativity level of the model.
+            chat_history=_history,        # Few-shot turns of the active prompt variant.
+            prompt_truncation='OFF',      # Ensure the prompt is not truncated.
+            connectors=[],                # No additional connectors are used.
+            preamble=_preamble            # Instruction preamble of the active variant.
+        )
 
-    # Strip leading and trailing whitespaces from each task.
-    response = [i.strip() for i in response]
+    def _open():
+        _model, stream = hedged_stream(MODEL_CANDIDATES, _start, MODEL_STATS, hedge=HEDGED_REQUESTS)
+        if stream is None:
+            raise ConnectionError("no Cohere model answered")
+        return stream
 
-    # Initialize an empty list to filter valid tasks.
-    temp = []
+    try:
+        # Bounded, jittered retries behind the Cohere breaker; an outage fails fast.
+        stream = retry_call(_open, "cohere")
+    except ProviderUnavailable as e:
+        print(f"[cohere] {e}")
+        return local_decision(prompt)
 
-    # Filter the tasks based on recognized function keywords.
-    for task in response: 
-        for func in funcs:
-            if task.startswith(func):
-                temp.append(task)            # Add valid tasks to the filtered list.
+    # Parse the stream incrementally: each task is handed to on_task as soon as its
+    # delimiter arrives (early Automation dispatch), and collected for the return value.
+    parser = TaskParser(funcs)
+    response = []
 
-    # Update the response with the filtered list of tasks.
-    response = temp
+    def _emit(tasks):
+        for task in tasks:
+            response.append(task)
+            if on_task:
+                on_task(task)
 
-    # If '(query)' is in the response, recursively call the function for further clarification.
+    # Iterate over events in the stream and capture text generation events.
+    try:
+        for event in stream:
+            if event.event_type == "text-generation":
+                _emit(parser.feed(event.text))
+    except Exception as e:
+        cohere_breaker.record_failure()
+        print(f"[cohere] stream failed: {e}")
+        if not response:
+            return local_decision(prompt)
+    except BaseException:
+        cohere_breaker.release()
+        raise
+    else:
+        cohere_breaker.record_success()
+    _emit(parser.finish())
+
+    # If '(query)' is in the response, ask once more for clarification (not unboundedly).
     if "(query)" in response:
-        newresponse = FirstLayerDMM(prompt=prompt)
+        if _depth >= 1:
+            return local_decision(prompt)
+        # on_task already saw this pass's tasks: hand it only the ones the re-ask adds
+        newresponse = FirstLayerDMM(prompt=prompt, on_task=None, _depth=_depth + 1)
+        if on_task:
+            sent = list(response)
+            for task in newresponse:
+                if task in sent:
+                    sent.remove(task)
+                else:
+                    on_task(task)
         return newresponse                   # Return the clarified response.
     else:
+        if response:
+            IntentClassifier.record(prompt, response)   # training data for the local model
+            if DECISION_CACHE_ENABLED:
+                decision_cache().set(key, response)
         return response                      # Return the filtered response.
 
+# Classify many utterances at once (offline evaluation, bulk relabelling).
+def FirstLayerDMM_batch(prompts: list[str], concurrency: int = 4, timings: list | None = None) -> list[list[str]]:
+    """FirstLayerDMM for every prompt, at most `concurrency` Cohere streams at a time.
+    Results keep the order of prompts; a prompt whose classification failed gets [].
+    If timings is a list it receives each prompt's latency in seconds (same order)."""
+    def _one(prompt):
+        started = time.perf_counter()
+        try:
+            return FirstLayerDMM(prompt), time.perf_counter() - started
+        except Exception as e:
+            print(f"[batch] {prompt!r} failed: {e}")
+            return [], time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="classify") as pool:
+        results = list(pool.map(_one, prompts))
+    if timings is not None:
+        timings.extend(seconds for _, seconds in results)
+    return [decision for decision, _ in results]
+
 # Entry point for the script.
 if __name__ =="__main__":
+    for _variant in PROMPT_VARIANTS:
+        print(f"{_variant} prompt: ~{decision_prompt(_variant)[2]} tokens")
     # Continuously prompt the user for input and process it.
     while True:
         print(FirstLayerDMM(input(">>> ")))  # Print the categorized response.
@@ -0,0 +1,211 @@
+# Backend/RateLimit.py
+# Token-bucket rate limiting for the Brave Search API, shared by BraveSearch and the
+# image-generation spec hint. A request only waits when the bucket is empty (the plan's
+# per-second rate) or the server told us to back off; there is no fixed sleep. The
+# server is the source of truth: every response's headers are fed back with update().
+#
+#   Retry-After             seconds (or an HTTP date) to wait after a 429
+#   X-RateLimit-Limit       "1, 2000"     per-second and per-month limits
+#   X-RateLimit-Remaining   "0, 1543"     requests left in each window
+#   X-RateLimit-Reset       "1, 1419704"  seconds until each window resets
+#
+# Plan limits come from .env (BraveQPS, BraveMonthlyQuota; defaults match the free plan).
+# ImageGeneration runs as its own process, so the bucket's state (last request, back-off,
+# monthly remaining) is mirrored in Data/ratelimit_brave.json and re-read when it changes.
+# Metrics: ratelimit.<name>.waits / .wait_ms / .rejected, gauge ratelimit.<name>.remaining_month.
+import datetime
+import email.utils
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from . import Metrics
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(PROJECT_ROOT / ".env")
+STATE_PATH = PROJECT_ROOT / "Data" / "ratelimit_brave.json"
+
+BRAVE_QPS = float(os.getenv("BraveQPS", "1"))
+BRAVE_MONTHLY_QUOTA = int(os.getenv("BraveMonthlyQuota", "2000"))
+MAX_WAIT = 5.0             # longest a realtime search queues behind the limit before giving up
+
+
+class RateLimited(Exception):
+    """The request would have to wait longer than the caller allows (or the quota is spent)."""
+
+    def __init__(self, name: str, wait: float):
+        super().__init__(f"{name} rate limited for {wait:.1f}s")
+        self.name = name
+        self.wait = wait
+
+
+class TokenBucket:
+    def __init__(self, name: str, rate: float, burst: float | None = None, monthly_quota: int | None = None,
+                 state_path: Path | None = None):
+        self.name = name
+        self.state_path = Path(state_path) if state_path else None
+        self._state_mtime = None
+        self.rate = rate                          # tokens per second
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.monthly_remaining = monthly_quota    # None = unknown / unlimited
+        self._month_resets_at = None
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0                 # from Retry-After / exhausted windows
+        self._last_request = None
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self, now) -> tuple[float, bool]:
+        """(seconds until a request may go out, whether a token was taken for it)."""
+        self._refill(now)
+        wait = max(0.0, self._blocked_until - now)
+        if self.monthly_remaining is not None and self.monthly_remaining <= 0:
+            if self._month_resets_at is None:
+                # Brave never said when the month resets: assume the next calendar month
+                self._month_resets_at = now + _seconds_to_next_month()
+            if now < self._month_resets_at:
+                return self._month_resets_at - now, False
+            self.monthly_remaining = None         # new month: the next response tells us the quota
+        self._tokens -= 1.0                       # may go negative: a token reserved in the future
+        if self._tokens < 0:
+            wait = max(wait, -self._tokens / self.rate)
+        return wait, True
+
+    def acquire(self, max_wait: float = 10.0) -> float:
+        """Block until a request may be sent; returns the seconds waited.
+        Raises RateLimited (without using a token) if that would take longer than max_wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._load(now)
+            wait, reserved = self._reserve(now)
+            if wait > max_wait:
+                if reserved:
+                    self._tokens += 1.0           # give the reservation back
+                Metrics.incr(f"ratelimit.{self.name}.rejected")
+                raise RateLimited(self.name, wait)
+            self._last_request = now + wait
+            self._save(now)
+        if wait > 0:
+            Metrics.incr(f"ratelimit.{self.name}.waits")
+            Metrics.incr(f"ratelimit.{self.name}.wait_ms", int(wait * 1000))
+            time.sleep(wait)
+        return wait
+
+    def update(self, headers, status_code: int | None = None):
+        """Adopt the server's view from a response's rate-limit headers.
+        Only answered requests count against the monthly quota (failed and 429 ones do not)."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        now = time.monotonic()
+        with self._lock:
+            retry_after = _retry_after(headers.get("retry-after"))
+            if retry_after is None and status_code == 429:
+                retry_after = 1.0 / self.rate
+            if retry_after is not None:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            remaining = _numbers(headers.get("x-ratelimit-remaining"))
+            reset = _numbers(headers.get("x-ratelimit-reset"))
+            if remaining:
+                # per-second window spent: the next token is only valid after its reset
+                if remaining[0] <= 0 and reset:
+                    self._blocked_until = max(self._blocked_until, now + reset[0])
+                if len(remaining) > 1:
+                    self.monthly_remaining = int(remaining[1])
+                    if len(reset) > 1:
+                        self._month_resets_at = now + reset[1]
+            if (len(remaining) < 2 and self.monthly_remaining is not None
+                    and status_code is not None and 200 <= status_code < 300):
+                self.monthly_remaining -= 1          # no header: count the answered request ourselves
+            if self.monthly_remaining is not None:
+                Metrics.set_gauge(f"ratelimit.{self.name}.remaining_month", self.monthly_remaining)
+            self._save(now)
+
+    # --- state shared with other processes (monotonic times stored as wall-clock) ---
+    def _load(self, now):
+        if self.state_path is None:
+            return
+        try:
+            mtime = self.state_path.stat().st_mtime_ns
+            if mtime == self._state_mtime:
+                return
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self._state_mtime = mtime
+        to_mono = now - time.time()
+        if state.get("blocked_until"):
+            self._blocked_until = max(self._blocked_until, state["blocked_until"] + to_mono)
+        if state.get("month_resets_at"):
+            self._month_resets_at = state["month_resets_at"] + to_mono
+        if state.get("monthly_remaining") is not None:
+            self.monthly_remaining = state["monthly_remaining"]
+        last = state.get("last_request")
+        if last and (self._last_request is None or last + to_mono > self._last_request):
+            # another process sent a request: it used a token at that time
+            self._refill(now)
+            self._tokens = min(self._tokens, self.burst - 1.0 + (now - (last + to_mono)) * self.rate)
+            self._last_request = last + to_mono
+
+    def _save(self, now):
+        if self.state_path is None:
+            return
+        to_wall = time.time() - now
+        state = {
+            "blocked_until": self._blocked_until + to_wall if self._blocked_until > now else None,
+            "month_resets_at": self._month_resets_at + to_wall if self._month_resets_at else None,
+            "monthly_remaining": self.monthly_remaining,
+            "last_request": self._last_request + to_wall if self._last_request else None,
+        }
+        try:
+            tmp = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp, self.state_path)
+            self._state_mtime = self.state_path.stat().st_mtime_ns
+        except OSError as e:
+            print(f"[ratelimit] could not save {self.state_path}: {e}")
+
+
+def _numbers(value) -> list[float]:
+    try:
+        return [float(part) for part in str(value).split(",") if part.strip()] if value else []
+    except ValueError:
+        return []
+
+
+def _seconds_to_next_month() -> float:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    first = datetime.datetime(now.year + now.month // 12, now.month % 12 + 1, 1, tzinfo=datetime.timezone.utc)
+    return (first - now).total_seconds()
+
+
+def _retry_after(value) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def brave() -> TokenBucket:
+    """The bucket every Brave Search request goes through."""
+    with _buckets_lock:
+        if "brave" not in _buckets:
+            _buckets["brave"] = TokenBucket("brave", BRAVE_QPS, monthly_quota=BRAVE_MONTHLY_QUOTA,
+                                            state_path=STATE_PATH)
+        return _buckets["brave"]
@@ -1,12 +1,20 @@
-from groq import Groq                                # Importing the Groq library to use its API.
 import os                                            # Added missing import
-from json import load, dump                          # Importing functions to read and write JSON files.
+import asyncio
 import datetime                                      # Importing the datetime module for real-time date and time information.
 from dotenv import load_dotenv                       # ✅ CHANGED: Import load_dotenv instead of dotenv_values
-import time                                          # Added for search delays
 import requests
 from pathlib import Path                              # Added for robust file path handling
 from .Config import Username, Assistantname
+from .Tracing import traced, span, StreamStats, BRAVE_SEARCH, GROQ_COMPLETION, FAN_OUT
+from .ConversationStore import get_store  # append-only chat log (Data/ChatLog.jsonl)
+from .GroqClient import get_async_client, call, run_sync, stream_tokens  # shared pooled Groq clients (keep-alive)
+from .Resilience import retry_call_async, is_retryable, ProviderUnavailable
+from . import Metrics
+from . import VectorMemory                # relevant past turns for ChatBot
+from . import RateLimit                   # shared Brave token bucket
+from .RateLimit import RateLimited
+from . import SearchCache                 # parsed Brave results (Data/search_cache.json)
+from . import SearchRank                  # dedup, BM25 ranking and snippet trimming
 
 # ✅ FIX FILE PATHS - ONLY ADDITION TO YOUR CODE
 BASE_DIR = Path(__file__).parent.parent
@@ -16,8 +24,6 @@ DATA_DIR.mkdir(exist_ok=True)
 def get_data_file(filename):
     return DATA_DIR / filename
 
-CHAT_LOG_FILE = get_data_file("ChatLog.json")
-
 # ✅ FIXED: Load environment variables from absolute path
 load_dotenv(BASE_DIR / ".env")
 
@@ -27,9 +33,6 @@ Assistantname = os.getenv("Assistantname")         # ✅ CHANGED: Use os.getenv
 GroqAPIKey = os.getenv("GroqAPIKey")                # ✅ CHANGED: Use os.getenv instead of env_vars.get
 BraveAPIKey = os.getenv("BraveAPIKey")              # ✅ CHANGED: Use os.getenv instead of env_vars.get
 
-# Initialize the Groq client with the provided API key.
-client = Groq(api_key=GroqAPIKey)
-
 # --- RL knob (safe default matching current behavior) ---
 TOP_K = 5
 def set_top_k(k: int):
@@ -53,70 +56,88 @@ IMPORTANT INSTRUCTIONS:
 *** Provide Answers In a Professional Way, make sure to add full stops, commas, question marks, and use proper grammar.***
 *** Answer questions helpfully using both search results and your knowledge when appropriate. ***"""
 
-# Try to load the chat log from a JSON file, or create an empty one if it doesn't exist.
-try:
-    with open(CHAT_LOG_FILE, "r") as f:  # ✅ FIXED PATH
-        messages = load(f)
-except:
-    with open(CHAT_LOG_FILE, "w") as f:  # ✅ FIXED PATH
-        dump([], f)
-        messages = []                     # Fixed initialization
+# Brave request parameters that change the results (part of the search cache key).
+FRESHNESS = "pd"   # Past day for current events
+COUNTRY = "IN"
+
+# Fetch one Brave Search result page as a list of {"kind", "title", "description", "url"}.
+def FetchBraveResults(query):
+    url = "https://api.search.brave.com/res/v1/web/search"
+    headers = {
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip",
+        "X-Subscription-Token": BraveAPIKey
+    }
+    params = {
+        "q": query,
+        "count": TOP_K,  # ← RL-controlled web results count (default 5)
+        "search_lang": "en",
+        "country": COUNTRY,
+        "safesearch": "moderate",
+        "freshness": FRESHNESS
+    }
+
+    # Wait only if the shared Brave bucket is empty; a 429 is retried once after Retry-After.
+    limiter = RateLimit.brave()
+    for attempt in range(2):
+        limiter.acquire(max_wait=RateLimit.MAX_WAIT)
+        response = requests.get(url, headers=headers, params=params, timeout=10)
+        limiter.update(response.headers, response.status_code)
+        if response.status_code != 429:
+            break
+    response.raise_for_status()
+    search_results = response.json()
+
+    results = []
+
+    # Extract web results (slice by TOP_K to mirror count)
+    if 'web' in search_results and 'results' in search_results['web']:
+        for result in search_results['web']['results'][:TOP_K]:
+            results.append({
+                "kind": "web",
+                "title": result.get('title', 'No Title'),
+                "description": result.get('description', 'No description').replace('\n', ' ').strip(),  # Clean up description
+                "url": result.get('url', ''),
+            })
+
+    # Add news results if available (keep original 2 to preserve behavior)
+    if 'news' in search_results and 'results' in search_results['news']:
+        for result in search_results['news']['results'][:2]:
+            results.append({
+                "kind": "news",
+                "title": result.get('title', 'No Title'),
+                "description": result.get('description', 'No description'),
+                "url": result.get('url', ''),
+            })
+    return results
+
+# Format a result list as the [start] ... [end] block the prompt expects.
+def FormatSearchResults(query, results):
+    if not results:
+        return f"[start]\nNo current results found for '{query}'. Please try a different search term.\n[end]"
+    lines = [f"• {'[NEWS] ' if r['kind'] == 'news' else ''}{r['title']}: {r['description']}" for r in results]
+    Answer = f"BRAVE SEARCH RESULTS for '{query}' (Current as of August 31, 2025):\n[start]\n"
+    Answer += "\n".join(lines)
+    Answer += "\n[end]"
+    return Answer
 
 # Function to perform a Brave Search and format the results.
+@traced(BRAVE_SEARCH)
 def BraveSearch(query):
-    time.sleep(2)
-    try:
-        url = "https://api.search.brave.com/res/v1/web/search"
-        headers = {
-            "Accept": "application/json",
-            "Accept-Encoding": "gzip",
-            "X-Subscription-Token": BraveAPIKey
-        }
-        params = {
-            "q": query,
-            "count": TOP_K,  # ← RL-controlled web results count (default 5)
-            "search_lang": "en",
-            "country": "IN",
-            "safesearch": "moderate",
-            "freshness": "pd"  # Past day for current events
-        }
-        
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        search_results = response.json()
-        
-        results = []
-        
-        # Extract web results (slice by TOP_K to mirror count)
-        if 'web' in search_results and 'results' in search_results['web']:
-            for result in search_results['web']['results'][:TOP_K]:
-                title = result.get('title', 'No Title')
-                description = result.get('description', 'No description')
-                url = result.get('url', '')
-                
-                # Clean up description
-                description = description.replace('\n', ' ').strip()
-                results.append(f"• {title}: {description}")
-        
-        # Add news results if available (keep original 2 to preserve behavior)
-        if 'news' in search_results and 'results' in search_results['news']:
-            for result in search_results['news']['results'][:2]:
-                title = result.get('title', 'No Title')
-                description = result.get('description', 'No description')
-                results.append(f"• [NEWS] {title}: {description}")
-        
-        if results:
-            Answer = f"BRAVE SEARCH RESULTS for '{query}' (Current as of August 31, 2025):\n[start]\n"
-            Answer += "\n".join(results)
-            Answer += "\n[end]"
-            return Answer
-        else:
-            return f"[start]\nNo current results found for '{query}'. Please try a different search term.\n[end]"
-            
-    except requests.exceptions.RequestException as e:
-        return f"[start]\nSearch request failed: {str(e)}\n[end]"
-    except Exception as e:
-        return f"[start]\nBrave search error: {str(e)}\n[end]"
+    # Repeat searches are served from the freshness-aware cache without a network call.
+    results = SearchCache.lookup(query, TOP_K, FRESHNESS, COUNTRY)
+    if results is None:
+        try:
+            results = FetchBraveResults(query)
+        except RateLimited as e:
+            return f"[start]\nSearch is rate limited right now ({e}).\n[end]"
+        except requests.exceptions.RequestException as e:
+            return f"[start]\nSearch request failed: {str(e)}\n[end]"
+        except Exception as e:
+            return f"[start]\nBrave search error: {str(e)}\n[end]"
+        SearchCache.store(query, TOP_K, FRESHNESS, COUNTRY, results)
+    # The cache keeps Brave's full list; only the prompt gets the deduplicated, ranked, trimmed one.
+    return FormatSearchResults(query, SearchRank.process(query, results))
 
 # Function to clean up the answer by removing empty lines.
 def AnswerModifier(Answer):
@@ -125,6 +146,13 @@ def AnswerModifier(Answer):
     modified_answer = '\n'.join(non_empty_lines)
     return modified_answer
 
+# Answer used when Groq is unavailable: the first search result, read out as-is.
+def SearchFallback(search_results):
+    for line in search_results.splitlines():
+        if line.startswith("• "):
+            return f"I can't reach my language service right now, but here is the top search result: {line[2:].strip()}"
+    return "Sorry, I can't reach my language service right now. Please try again in a moment."
+
 # Predefined chatbot conversation system message and an initial user message.
 SystemChatBot = [
     {"role": "system", "content": System},
@@ -152,21 +180,15 @@ def Information():
     return data
 
 # Function to handle real-time search and response generation.
-def RealtimeSearchEngine(prompt):
-    global SystemChatBot, messages
-    
-    # Load the chat log from the JSON file.
-    try:
-        with open(CHAT_LOG_FILE, "r") as f:  # ✅ FIXED PATH
-            messages = load(f)
-    except:
-        messages = []
+async def RealtimeSearchEngineAsync(prompt, on_token=None, before_save=None):
+    """Answer prompt from fresh search results on the pooled AsyncGroq client; on_token
+    (plain or async) receives streamed chunks as they arrive. before_save() runs just
+    before the turn is written to the chat log. Time to first token and tokens/s are
+    recorded as realtime.ttft_ms_last / realtime.tokens_per_s_last."""
+    global SystemChatBot
     
-    # Keep only last 5 messages to prevent token limit
-    if len(messages) > 10:
-        messages = messages[-10:]
-    
-    messages.append({"role": "user", "content": f"{prompt}"})
+    # Only this turn is written; the store keeps the rest of the history.
+    messages = [{"role": "user", "content": f"{prompt}"}]
     
     # Pattern-based detection without hardcoded lists
     def is_casual_conversation(text):
@@ -215,14 +237,15 @@ def RealtimeSearchEngine(prompt):
         
         messages.append({"role": "assistant", "content": Answer})
         
-        # Save the updated chat log back to the JSON file.
-        with open(CHAT_LOG_FILE, "w") as f:  # ✅ FIXED PATH
-            dump(messages, f, indent=4)
+        # Append the turn to the chat log.
+        await call(before_save)
+        get_store().extend(messages)
         
+        await call(on_token, Answer)
         return Answer
     else:
         # Perform search for informational queries
-        search_results = BraveSearch(prompt)
+        search_results = await asyncio.to_thread(BraveSearch, prompt)
         search_instruction = f"""
 TASK: Provide a concise and informative answer to the user's question using the search results in 2-3 clear sentences.
 
@@ -239,44 +262,146 @@ INSTRUCTIONS:
 
 ANSWER FORMAT: Well-structured, concise answer only.
 """
-    
-        # Create conversation with explicit search context
-        conversation = [
-            {"role": "system", "content": System},
-            {"role": "user", "content": search_instruction}
-        ]
-    
-        # Generate a response using the Groq client.
-        try:
-            completion = client.chat.completions.create(
+        return await _grounded_answer(prompt, search_instruction, search_results, on_token, before_save)
+
+async def _grounded_answer(prompt, search_instruction, search_results, on_token=None, before_save=None,
+                           max_tokens=150, caller="RealtimeSearchEngine"):
+    """Stream the answer to search_instruction and save the turn under prompt."""
+    messages = [{"role": "user", "content": f"{prompt}"}]
+
+    # Create conversation with explicit search context
+    conversation = [
+        {"role": "system", "content": System},
+        {"role": "user", "content": search_instruction}
+    ]
+
+    # Generate a response using the Groq client.
+    streamed = []
+
+    async def _complete():
+        with span(GROQ_COMPLETION, caller=caller) as timing:
+            stats = StreamStats("realtime")
+            completion = await get_async_client().chat.completions.create(
                 model="llama-3.1-8b-instant",
                 messages=conversation,
-                temperature=0.3,  # Balanced temperature for accuracy and clarity
-                max_tokens=150,   # Perfect for 2-3 sentences
+                temperature=0.3,        # Balanced temperature for accuracy and clarity
+                max_tokens=max_tokens,  # 150 is perfect for 2-3 sentences
                 top_p=1,
                 stream=True,
                 stop=None
             )
-        
-            Answer = ""
-        
+
             # Concatenate response chunks from the streaming output.
-            for chunk in completion:
+            async for chunk in completion:
                 if chunk.choices[0].delta.content:
-                    Answer += chunk.choices[0].delta.content
-        
-            # Clean up the response.
-            Answer = Answer.strip().replace("</S>", "").replace("<|eot_id|>", "")
-            messages.append({"role": "assistant", "content": Answer})
-        
-            # Save the updated chat log back to the JSON file.
-            with open(CHAT_LOG_FILE, "w") as f:  # ✅ FIXED PATH
-                dump(messages, f, indent=4)
-        
-            return AnswerModifier(Answer=Answer)
-        
-        except Exception as e:
-            return f"Error generating response: {str(e)}"
+                    streamed.append(chunk.choices[0].delta.content)
+                    stats.token(chunk.choices[0].delta.content)
+                    await call(on_token, chunk.choices[0].delta.content)
+            timing.args.update(stats.finish())
+        return "".join(streamed)
+
+    try:
+        # Bounded, jittered retries behind the Groq breaker; never restart a stream that already spoke.
+        Answer = await retry_call_async(_complete, "groq", retryable=lambda e: not streamed and is_retryable(e))
+    except ProviderUnavailable as e:
+        print(f"Error: {e}")
+        if not streamed:
+            # Fail fast: read out the top search result instead of an error string.
+            Metrics.incr("fallback.realtime")
+            Answer = SearchFallback(search_results)
+            await call(on_token, Answer)
+            return Answer
+        Answer = "".join(streamed)
+
+    # Clean up the response.
+    Answer = Answer.strip().replace("</S>", "").replace("<|eot_id|>", "")
+    messages.append({"role": "assistant", "content": Answer})
+
+    # Append the turn to the chat log.
+    await call(before_save)
+    get_store().extend(messages)
+    VectorMemory.remember(prompt, Answer)
+
+    return AnswerModifier(Answer=Answer)
+
+# --- Fan-out: several general/realtime sub-questions answered as one turn ---
+# One Brave search per realtime part and one short background answer per general part
+# run concurrently; their results are merged into a single grounded prompt, so a
+# multi-part question costs one search round trip instead of a combined, worse query.
+DRAFT_TOKENS = 120
+MULTI_MAX_TOKENS = 400
+
+async def _draft(question):
+    """Short background answer for a general sub-question ("" if Groq is unavailable)."""
+    async def _complete():
+        with span(GROQ_COMPLETION, caller="MultiSearchEngine.draft"):
+            completion = await get_async_client().chat.completions.create(
+                model="llama-3.1-8b-instant",
+                messages=[{"role": "system", "content": System},
+                          {"role": "user", "content": f"Answer in 1-2 sentences: {question}"}],
+                temperature=0.3,
+                max_tokens=DRAFT_TOKENS,
+                stream=False
+            )
+        return completion.choices[0].message.content or ""
+
+    try:
+        return (await retry_call_async(_complete, "groq")).strip()
+    except ProviderUnavailable as e:
+        print(f"Error: {e}")
+        return ""
+
+async def MultiSearchEngineAsync(parts, on_token=None, before_save=None):
+    """Answer several decision parts ("realtime ...", "general ...") in one streamed reply.
+    Searches and background answers run concurrently (the fan_out stage); callbacks as in
+    RealtimeSearchEngineAsync."""
+    questions = [(p.split(" ", 1)[0], p.split(" ", 1)[1] if " " in p else "") for p in parts]
+    prompt = " and ".join(q for _, q in questions)
+    jobs = [asyncio.to_thread(BraveSearch, q) if kind == "realtime" else _draft(q) for kind, q in questions]
+    with span(FAN_OUT, parts=len(parts)):
+        gathered = await asyncio.gather(*jobs)
+    Metrics.incr("fan_out.requests")
+    Metrics.incr("fan_out.parts", len(parts))
+
+    sections = []
+    for number, ((kind, question), result) in enumerate(zip(questions, gathered), 1):
+        source = "SEARCH RESULTS" if kind == "realtime" else "BACKGROUND ANSWER"
+        sections.append(f"PART {number}: {question}\n{source}:\n{result or 'None available.'}")
+    sections = "\n\n".join(sections)
+    search_instruction = f"""
+TASK: The user asked {len(questions)} things at once. Answer every part, in order, in one reply of 1-3 clear sentences per part.
+
+{sections}
+
+USER QUESTION: {prompt}
+
+INSTRUCTIONS:
+1. Use the search results as the primary source for their part; use the background answer for the others.
+2. Include important facts, numbers, or dates if relevant.
+3. Do not label the parts or repeat the questions; keep it natural and concise.
+4. If a part has no relevant answer, say so briefly for that part.
+
+ANSWER FORMAT: Well-structured, concise answer only.
+"""
+    search_results = "\n".join(r for (kind, _), r in zip(questions, gathered) if kind == "realtime")
+    return await _grounded_answer(prompt, search_instruction, search_results, on_token, before_save,
+                                  max_tokens=min(MULTI_MAX_TOKENS, 150 * len(questions)), caller="MultiSearchEngine")
+
+def MultiSearchEngine(parts, on_token=None, before_save=None):
+    """Blocking wrapper around MultiSearchEngineAsync (callbacks run in the calling thread)."""
+    return run_sync(lambda on_token, before_save: MultiSearchEngineAsync(parts, on_token, before_save),
+                    on_token, before_save)
+
+def RealtimeSearchStream(prompt, before_save=None):
+    """RealtimeSearchEngineAsync as an async iterator of response chunks."""
+    return stream_tokens(lambda on_token: RealtimeSearchEngineAsync(prompt, on_token, before_save))
+
+def RealtimeSearchEngine(prompt, on_token=None, before_save=None):
+    """Answer prompt from fresh search results; on_token receives streamed chunks as they arrive.
+    before_save() runs just before the turn is written to the chat log. Blocking wrapper
+    around RealtimeSearchEngineAsync; both callbacks run in the calling thread."""
+    return run_sync(lambda on_token, before_save: RealtimeSearchEngineAsync(prompt, on_token, before_save),
+                    on_token, before_save)
 
 # Main entry point of the program for interactive querying.
 if __name__ == "__main__":
@@ -0,0 +1,184 @@
+# Backend/Resilience.py
+# Bounded retries with jittered exponential backoff and per-provider circuit breakers
+# for every LLM call (Groq, Cohere). A provider that keeps failing trips its breaker:
+# calls then fail fast with ProviderUnavailable for RESET_TIMEOUT seconds instead of
+# hammering the API, and the caller answers from a cache or a local fallback. After the
+# timeout one trial call is let through (half-open); success closes the breaker.
+#
+# Metrics: breaker.<provider>.state (closed/open/half_open), breaker.<provider>.opened,
+# retry.<provider>.retries, retry.<provider>.failures.
+import asyncio
+import random
+import threading
+import time
+
+from . import Metrics
+
+ATTEMPTS = 3               # calls per retry_call (first try + retries)
+BASE_DELAY = 0.5           # seconds; attempt n waits up to BASE_DELAY * 2**n (full jitter)
+MAX_DELAY = 8.0
+FAILURE_THRESHOLD = 5      # consecutive failures that open a breaker
+RESET_TIMEOUT = 30.0       # seconds a breaker stays open before a trial call
+
+# HTTP statuses that will not get better by retrying (bad request, auth, not found)
+_PERMANENT_STATUS = {400, 401, 403, 404, 422}
+
+
+class ProviderUnavailable(Exception):
+    """The provider's breaker is open or every attempt failed."""
+
+    def __init__(self, provider: str, cause: BaseException | None = None):
+        super().__init__(f"{provider} unavailable" + (f": {cause}" if cause else ""))
+        self.provider = provider
+        self.cause = cause
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        Metrics.set_gauge(f"breaker.{name}.state", self._state)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """May a call go out now? In half-open state only one trial call is let through."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial:
+                return False
+            self._set(self.HALF_OPEN)
+            self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial = False
+            if self._state != self.CLOSED:
+                self._set(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    Metrics.incr(f"breaker.{self.name}.opened")
+                self._opened_at = time.monotonic()
+                self._set(self.OPEN)
+
+    def release(self):
+        """End a call that neither succeeded nor failed (cancelled, or a caller error):
+        frees the half-open trial slot without counting anything."""
+        with self._lock:
+            self._trial = False
+
+    def _set(self, state):
+        self._state = state
+        Metrics.set_gauge(f"breaker.{self.name}.state", state)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(provider: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+def is_retryable(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status not in _PERMANENT_STATUS
+
+
+def backoff_delay(attempt: int, base: float = None, cap: float = None) -> float:
+    """Full-jitter exponential backoff for retry number `attempt` (0-based)."""
+    base = BASE_DELAY if base is None else base
+    cap = MAX_DELAY if cap is None else cap
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_call(fn, provider: str, attempts: int = None, retryable=is_retryable, sleep=time.sleep):
+    """fn() with bounded retries behind the provider's breaker.
+
+    Raises ProviderUnavailable when the breaker is open or all attempts failed. Only
+    Exceptions are retried; BaseExceptions (request/speculation cancellation) pass
+    straight through. retryable(error) can veto a retry (e.g. after tokens were streamed).
+    """
+    attempts = ATTEMPTS if attempts is None else attempts
+    cb = breaker(provider)
+    last = None
+    for attempt in range(attempts):
+        if not cb.allow():
+            raise ProviderUnavailable(provider, last)
+        try:
+            result = fn()
+        except Exception as e:
+            last = e
+            if not _should_retry(cb, provider, attempt, attempts, e, retryable):
+                break
+            sleep(backoff_delay(attempt))
+            continue
+        except BaseException:
+            cb.release()                 # cancelled: not the provider's fault
+            raise
+        cb.record_success()
+        return result
+    raise ProviderUnavailable(provider, last)
+
+
+async def retry_call_async(fn, provider: str, attempts: int = None, retryable=is_retryable, sleep=asyncio.sleep):
+    """retry_call for a coroutine function: await fn() with the same breaker and backoff."""
+    attempts = ATTEMPTS if attempts is None else attempts
+    cb = breaker(provider)
+    last = None
+    for attempt in range(attempts):
+        if not cb.allow():
+            raise ProviderUnavailable(provider, last)
+        try:
+            result = await fn()
+        except Exception as e:
+            last = e
+            if not _should_retry(cb, provider, attempt, attempts, e, retryable):
+                break
+            await sleep(backoff_delay(attempt))
+            continue
+        except BaseException:
+            cb.release()                 # cancelled: not the provider's fault
+            raise
+        cb.record_success()
+        return result
+    raise ProviderUnavailable(provider, last)
+
+
+def _should_retry(cb, provider, attempt, attempts, error, retryable) -> bool:
+    if is_retryable(error):
+        cb.record_failure()
+    else:
+        cb.release()                     # 400/401/403/404/422: the request was wrong, not the provider
+    Metrics.incr(f"retry.{provider}.failures")
+    print(f"[{provider}] attempt {attempt + 1}/{attempts} failed: {error}")
+    if attempt + 1 >= attempts or not retryable(error):
+        return False
+    Metrics.incr(f"retry.{provider}.retries")
+    return True
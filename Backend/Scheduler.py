@@ -0,0 +1,213 @@
+# Backend/Scheduler.py
+# One request scheduler for voice and typed input. An asyncio loop on its own thread
+# owns a bounded priority queue (voice before typed, FIFO within a source) and hands
+# requests to a small worker pool. Workers run the blocking dispatch function in
+# threads, so request B can already be classified while request A is still speaking;
+# output stays in order because every request waits for its turn before it writes to
+# the screen or the speakers.
+import asyncio
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Lower value = served first
+PRIORITIES = {"voice": 0, "typed": 1}
+
+
+class RequestCancelled(BaseException):
+    """Raised inside a cancelled request. BaseException so the backends' broad
+    `except Exception` retry handlers let it through (see SpeculationCancelled)."""
+
+
+class Request:
+    """One user input travelling through the pipeline."""
+    _ids = itertools.count(1)
+
+    def __init__(self, source: str, text: str, meta: dict | None = None):
+        self.id = next(self._ids)
+        self.source = source
+        self.text = text
+        self.meta = meta or {}          # caller data carried to dispatch (e.g. the latency trace)
+        self.priority = PRIORITIES.get(source, len(PRIORITIES))
+        self.turn_no = None             # output order, assigned when a worker picks it up
+        self.done = threading.Event()
+        self._cancelled = threading.Event()
+        self._on_cancel = []
+        self._scheduler = None
+
+    def __repr__(self):
+        return f"Request(#{self.id} {self.source}: {self.text!r})"
+
+    # --- cancellation ---
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Cancel the request: queued ones are skipped, running ones stop at the next check."""
+        if self._cancelled.is_set():
+            return
+        self._cancelled.set()
+        for callback in list(self._on_cancel):
+            try:
+                callback()
+            except Exception as e:
+                print(f"[scheduler] cancel callback error: {e}")
+        if self._scheduler is not None:
+            self._scheduler._wake()
+
+    def on_cancel(self, callback):
+        """Run callback() if the request is cancelled (immediately if it already was)."""
+        self._on_cancel.append(callback)
+        if self.cancelled:
+            callback()
+
+    def check(self):
+        if self.cancelled:
+            raise RequestCancelled()
+
+    # --- output ordering ---
+    def is_next(self) -> bool:
+        """True if no earlier request still has output pending."""
+        return self._scheduler is None or self._scheduler._is_next(self)
+
+    def turn(self):
+        """Context manager: wait until every earlier request finished its output."""
+        return _Turn(self)
+
+
+class _Turn:
+    def __init__(self, request):
+        self.request = request
+
+    def __enter__(self):
+        scheduler = self.request._scheduler
+        if scheduler is not None:
+            scheduler._wait_turn(self.request)
+        self.request.check()
+        return self.request
+
+    def __exit__(self, *exc):
+        return False
+
+
+class RequestScheduler:
+    """Bounded, prioritised, cancellable request queue in front of a single dispatch(request)."""
+
+    def __init__(self, dispatch, maxsize: int = 16, workers: int = 2, on_idle=None):
+        self.dispatch = dispatch
+        self.maxsize = maxsize
+        self.workers = workers
+        self.on_idle = on_idle          # called when the last running request finishes
+        self._order = itertools.count() # FIFO tie-break within a priority
+        self._turns = itertools.count()
+        self._turn_cond = threading.Condition()
+        self._next_turn = 0
+        self._finished_turns = set()
+        self._active = {}
+        self._ready = threading.Event()
+        self._loop = None
+        self._queue = None
+        self._thread = None
+
+    # --- lifecycle ---
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), daemon=True, name="scheduler")
+            self._thread.start()
+            self._ready.wait()
+        return self
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.PriorityQueue(maxsize=self.maxsize)
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="request")
+        self._ready.set()
+        await asyncio.gather(*(self._worker(executor) for _ in range(self.workers)))
+
+    async def _worker(self, executor):
+        while True:
+            _, _, request = await self._queue.get()
+            try:
+                if request.cancelled:
+                    continue
+                request.turn_no = next(self._turns)
+                self._active[request.id] = request
+                try:
+                    await self._loop.run_in_executor(executor, self._run, request)
+                finally:
+                    self._active.pop(request.id, None)
+                    self._finish_turn(request)
+            finally:
+                request.done.set()
+                self._queue.task_done()
+                if not self._active and self._queue.empty() and self.on_idle:
+                    try:
+                        self.on_idle()
+                    except Exception as e:
+                        print(f"[scheduler] on_idle error: {e}")
+
+    def _run(self, request):
+        try:
+            self.dispatch(request)
+        except RequestCancelled:
+            print(f"[scheduler] cancelled {request!r}")
+        except BaseException as e:
+            print(f"[scheduler] error in {request!r}: {e}")
+
+    # --- producers (any thread) ---
+    def submit(self, source: str, text: str, block: bool = True, timeout: float | None = None,
+               meta: dict | None = None) -> Request | None:
+        """Queue a request. Blocks while the queue is full unless block=False.
+
+        Returns the Request, or None if it could not be queued (queue full).
+        """
+        self.start()
+        request = Request(source, text, meta)
+        request._scheduler = self
+        item = (request.priority, next(self._order), request)
+        if block:
+            future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(self._queue.put(item), timeout), self._loop)
+            try:
+                future.result()
+            except Exception:
+                return None
+            return request
+        future = asyncio.run_coroutine_threadsafe(self._put_nowait(item), self._loop)
+        return request if future.result() else None
+
+    async def _put_nowait(self, item) -> bool:
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def cancel_all(self):
+        """Cancel every running request (queued ones keep their place)."""
+        for request in list(self._active.values()):
+            request.cancel()
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    # --- output turns ---
+    def _is_next(self, request) -> bool:
+        with self._turn_cond:
+            return request.turn_no == self._next_turn
+
+    def _wait_turn(self, request):
+        with self._turn_cond:
+            self._turn_cond.wait_for(lambda: request.turn_no == self._next_turn or request.cancelled)
+
+    def _finish_turn(self, request):
+        with self._turn_cond:
+            self._finished_turns.add(request.turn_no)
+            while self._next_turn in self._finished_turns:
+                self._finished_turns.discard(self._next_turn)
+                self._next_turn += 1
+            self._turn_cond.notify_all()
+
+    def _wake(self):
+        with self._turn_cond:
+            self._turn_cond.notify_all()
@@ -0,0 +1,85 @@
+# Backend/SearchCache.py
+# Result cache for BraveSearch. Repeat realtime questions ("today's headlines", "who is
+# the indian prime minister") reuse the parsed result list from Data/search_cache.json
+# instead of calling the Brave API. The key is the normalized query (filler and stop
+# words dropped, word order kept: "did india beat pakistan" is not "did pakistan beat
+# india") plus the request parameters that change the results
+# (TOP_K, freshness, country). How long an entry stays fresh depends on what was asked:
+# news/scores/prices expire in minutes, facts about people, places and organisations
+# after days. The file is size-bounded (least recently used entries are dropped first).
+# Hits/misses are counted in Backend/Metrics as search_cache.*.
+import re
+import threading
+from pathlib import Path
+
+from . import Metrics
+from .AnswerCache import normalize
+from .Cache import PersistentLRU
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "Data"
+DATA_DIR.mkdir(exist_ok=True)
+CACHE_PATH = DATA_DIR / "search_cache.json"
+
+MAX_ENTRIES = 256
+MAX_BYTES = 2 * 1024 * 1024
+ENABLED = True
+
+# category -> TTL seconds; the first category whose pattern matches the query wins
+TTL = {
+    "news": 15 * 60,
+    "entity": 3 * 24 * 3600,
+    "default": 3 * 3600,
+}
+_CATEGORIES = [
+    ("news", re.compile(
+        r"\b(news|headlines?|breaking|live|today|tonight|now|latest|score|match|weather|temperature|"
+        r"forecast|price|stock|share|market|trending|election results?)\b")),
+    ("entity", re.compile(
+        r"^(who (is|was|are)|what is|where is|tell me about)\b|\b(prime minister|president|ceo|founder|"
+        r"capital|population|born|biography|net ?worth|headquarters)\b")),
+]
+_STOP = {"a", "an", "the", "of", "is", "are", "was", "in", "on", "for", "to", "about", "me", "please"}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def category(query: str) -> str:
+    text = " ".join(re.sub(r"[^\w\s']", " ", query.lower()).split())
+    for name, pattern in _CATEGORIES:
+        if pattern.search(text):
+            return name
+    return "default"
+
+
+def cache_key(query: str, top_k: int, freshness: str, country: str) -> str:
+    words = [w for w in normalize(query).replace("'s", "").split() if w not in _STOP]
+    return f"{' '.join(words)}|k={top_k}|f={freshness}|c={country.lower()}"
+
+
+def get_cache() -> PersistentLRU:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PersistentLRU(CACHE_PATH, maxsize=MAX_ENTRIES, ttl=TTL["default"], max_bytes=MAX_BYTES)
+        return _cache
+
+
+def lookup(query: str, top_k: int, freshness: str, country: str) -> list[dict] | None:
+    """Cached result list for this search, or None."""
+    if not ENABLED:
+        return None
+    results = get_cache().get(cache_key(query, top_k, freshness, country))
+    Metrics.incr("search_cache.hit" if results is not None else "search_cache.miss")
+    return results
+
+
+def store(query: str, top_k: int, freshness: str, country: str, results: list[dict]):
+    """Cache a parsed result list with the TTL of the query's category (empty lists are not kept)."""
+    if not ENABLED or not results:
+        return
+    get_cache().set(cache_key(query, top_k, freshness, country), results, ttl=TTL[category(query)])
+
+
+def clear():
+    get_cache().clear()
@@ -0,0 +1,147 @@
+# Backend/SearchRank.py
+# Post-processing of Brave results before they are pasted into the realtime prompt.
+# Web and news results often repeat the same story (syndicated news, mirrors, the same
+# page under two URLs), and descriptions carry boilerplate the 150-token answer never
+# uses. Three steps, all local and sub-millisecond for a handful of results:
+#
+#   rank    BM25 of title + description against the query, over this result set
+#   trim    each description keeps its most query-relevant sentences, in their original
+#           order, within SNIPPET_TOKENS; the whole block stays within RESULTS_TOKENS
+#   dedup   trimmed results sharing DUP_OVERLAP of their hashed word 3-shingles (measured
+#           against the smaller set, so a snippet copied into a longer one counts) or
+#           sharing a URL are near-duplicates; only the better-ranked one is kept
+#
+# Metrics: search_rank.results_in / .results_out / .duplicates, search_rank.tokens_in /
+# .tokens_out / .tokens_saved, gauge search_rank.tokens_saved_last.
+import math
+import os
+import re
+import zlib
+
+from . import Metrics
+from .Tokens import count_tokens
+
+SHINGLE = 3                # words per shingle
+DUP_OVERLAP = 0.7          # shared fraction of the smaller shingle set that counts as the same result
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_TOKENS = 40        # per description
+RESULTS_TOKENS = 600       # all kept results together (lowest ranked dropped first)
+ENABLED = os.getenv("SearchRanking", "1").strip().lower() not in ("0", "false", "no")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_STOP = {"a", "an", "the", "is", "are", "was", "were", "be", "to", "of", "and", "or", "in", "on", "at",
+         "for", "it", "this", "that", "with", "by", "from", "as", "what", "who", "how", "me", "tell", "about"}
+
+
+def _terms(text: str) -> list[str]:
+    return [w for w in _TOKEN.findall(text.lower()) if w not in _STOP]
+
+
+def shingles(text: str, k: int = SHINGLE) -> set[int]:
+    """crc32 hashes of the word k-grams of text (the words themselves for short text)."""
+    words = _TOKEN.findall(text.lower())
+    grams = [" ".join(words[i:i + k]) for i in range(len(words) - k + 1)] or [" ".join(words)]
+    return {zlib.crc32(g.encode("utf-8")) for g in grams if g}
+
+
+def overlap(a: set, b: set) -> float:
+    """Overlap coefficient |a & b| / min(|a|, |b|)."""
+    return len(a & b) / min(len(a), len(b)) if a and b else 0.0
+
+
+def bm25(query: str, documents: list[str]) -> list[float]:
+    """BM25 score of each document for query, with document frequencies from documents."""
+    docs = [_terms(d) for d in documents]
+    if not docs:
+        return []
+    avg_len = sum(len(d) for d in docs) / len(docs) or 1.0
+    df = {}
+    for d in docs:
+        for term in set(d):
+            df[term] = df.get(term, 0) + 1
+    query_terms = set(_terms(query))
+    scores = []
+    for d in docs:
+        tf = {}
+        for term in d:
+            tf[term] = tf.get(term, 0) + 1
+        score = 0.0
+        for term in query_terms:
+            if term in tf:
+                idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+                norm = tf[term] + BM25_K1 * (1 - BM25_B + BM25_B * len(d) / avg_len)
+                score += idf * tf[term] * (BM25_K1 + 1) / norm
+        scores.append(score)
+    return scores
+
+
+def trim(text: str, query: str, budget: int = SNIPPET_TOKENS) -> str:
+    """The sentences of text that best match query, in original order, within budget tokens."""
+    if count_tokens(text) <= budget:
+        return text
+    sentences = [s for s in _SENTENCE.split(text.strip()) if s]
+    wanted = set(_terms(query))
+    order = sorted(range(len(sentences)), key=lambda i: (-len(wanted & set(_terms(sentences[i]))), i))
+    keep, used = set(), 0
+    for i in order:
+        cost = count_tokens(sentences[i])
+        if used + cost <= budget:
+            keep.add(i)
+            used += cost
+    if keep:
+        return " ".join(sentences[i] for i in sorted(keep))
+    # a single sentence longer than the budget: cut it at a word boundary
+    words, cut = sentences[order[0]].split(), []
+    for word in words:
+        if count_tokens(" ".join(cut + [word])) > budget - 1:
+            break
+        cut.append(word)
+    return " ".join(cut) + " …"
+
+
+def _cost(result: dict) -> int:
+    return count_tokens(f"{result['title']}: {result['description']}")
+
+
+def process(query: str, results: list[dict]) -> list[dict]:
+    """Deduplicated, BM25-ranked copies of results with trimmed descriptions."""
+    if not ENABLED or not results:
+        return results
+    scores = bm25(query, [f"{r['title']} {r['description']}" for r in results])
+    ranked = sorted(range(len(results)), key=lambda i: -scores[i])     # stable: ties keep Brave's order
+
+    # compared after trimming, and without the query's own shingles (titles and snippets
+    # echo the query, which says nothing about two results being the same)
+    echo = shingles(query)
+    kept, seen_shingles, seen_urls = [], [], set()
+    for i in ranked:
+        result = dict(results[i], description=trim(results[i]["description"], query))
+        sh = shingles(f"{result['title']} {result['description']}") - echo
+        url = result.get("url", "").rstrip("/")
+        if (url and url in seen_urls) or any(overlap(sh, other) >= DUP_OVERLAP for other in seen_shingles):
+            continue
+        seen_shingles.append(sh)
+        if url:
+            seen_urls.add(url)
+        kept.append(result)
+
+    out, used = [], 0
+    for result in kept:
+        cost = _cost(result)
+        if out and used + cost > RESULTS_TOKENS:
+            break
+        out.append(result)
+        used += cost
+
+    tokens_in = sum(_cost(r) for r in results)
+    saved = tokens_in - used
+    Metrics.incr("search_rank.results_in", len(results))
+    Metrics.incr("search_rank.results_out", len(out))
+    Metrics.incr("search_rank.duplicates", len(results) - len(kept))
+    Metrics.incr("search_rank.tokens_in", tokens_in)
+    Metrics.incr("search_rank.tokens_out", used)
+    Metrics.incr("search_rank.tokens_saved", saved)
+    Metrics.set_gauge("search_rank.tokens_saved_last", saved)
+    return out
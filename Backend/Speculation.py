@@ -0,0 +1,123 @@
+# Backend/Speculation.py
+# Speculative execution: while FirstLayerDMM waits on Cohere, start the branch a cheap
+# local guess says is most likely (ChatBot or RealtimeSearchEngine). When the decision
+# arrives the run is either committed (its buffered tokens are replayed into the real
+# sink) or cancelled before it can write anything to the chat log.
+import re
+import threading
+
+from Backend.Tracing import current_trace, activate
+
+# Task-style utterances are never speculated on (they go to Automation / image / exit)
+_TASK_PREFIXES = (
+    "open ", "close ", "play ", "system ", "content ", "write ", "google search", "youtube search",
+    "search google", "search youtube", "generate image", "create image", "remind", "set a reminder",
+    "set an alarm", "mute", "unmute", "volume", "bye", "exit", "lock ", "sleep",
+)
+_REALTIME_WORDS = re.compile(
+    r"\b(news|headlines?|latest|recent|recently|current|currently|today|tonight|yesterday|"
+    r"this (week|month|year)|trending|live|score|weather|forecast|price|stock|update|released?|"
+    r"upcoming|election|president|prime minister|ceo|net ?worth)\b"
+)
+# only the fixed clock/calendar phrasings; "this year's budget" etc. fall through to _REALTIME_WORDS
+_TIME_QUESTION = re.compile(
+    r"^(what|what's|whats|tell me)( is)? (the )?(current |today's |todays )?(time|date|day|month|year)"
+    r"( is it| it is)?( now| today| right now)?( please)?$"
+    r"|^what (time|date|day|month|year) is (it|this)( now| today)?$"
+)
+_PRONOUNS = {"he", "she", "it", "they", "him", "her", "them", "this", "that", "you", "i", "we"}
+_WHO_IS = re.compile(r"^who (is|are) (?P<subject>[\w'.-]+)")
+
+
+def guess_branch(query: str) -> str | None:
+    """Cheap local guess of the FirstLayerDMM branch: 'realtime', 'general' or None (don't speculate)."""
+    raw = (query or "").strip()
+    q = raw.lower().rstrip(".?!")
+    if not q or q.startswith(_TASK_PREFIXES) or " and open " in q or " and play " in q:
+        return None
+    # "what's the time / today's date" is answered by the chatbot from RealtimeInformation()
+    if _TIME_QUESTION.match(q):
+        return "general"
+    if _REALTIME_WORDS.search(q):
+        return "realtime"
+    # a question about a named person/thing ("who is akshay kumar", "tell me about Tesla")
+    m = _WHO_IS.match(q)
+    if m and m.group("subject") not in _PRONOUNS:
+        return "realtime"
+    if any(w[:1].isupper() for w in raw.split()[1:]):
+        return "realtime"
+    return "general"
+
+
+class SpeculationCancelled(BaseException):
+    """Raised inside a cancelled speculative run. BaseException (like asyncio.CancelledError)
+    so the broad `except Exception` retry handlers in the backends do not swallow it."""
+
+
+class Speculation:
+    """A speculative generate(query, on_token=..., before_save=...) call running on its own thread."""
+
+    def __init__(self, branch: str | None, generate=None, query: str = "", choice: dict | None = None):
+        self.branch = branch
+        self.choice = choice or {}
+        self._lock = threading.Lock()
+        self._decided = threading.Event()
+        self._cancelled = False
+        self._sink = None
+        self._buffer = []
+        self._result = None
+        self._error = None
+        self._thread = None
+        self._trace = current_trace()
+        if branch and generate:
+            self._thread = threading.Thread(target=self._run, args=(generate, query), daemon=True)
+            self._thread.start()
+
+    def _run(self, generate, query):
+        try:
+            with activate(self._trace):
+                self._result = generate(query, on_token=self._on_token, before_save=self._before_save)
+        except SpeculationCancelled:
+            pass
+        except BaseException as e:
+            self._error = e
+
+    def _on_token(self, token):
+        with self._lock:
+            if self._cancelled:
+                raise SpeculationCancelled()
+            if self._sink is None:
+                self._buffer.append(token)
+            else:
+                self._sink(token)
+
+    def _before_save(self):
+        # nothing reaches the chat log until the classifier agreed with the guess
+        self._decided.wait()
+        if self._cancelled:
+            raise SpeculationCancelled()
+
+    def matches(self, branch: str) -> bool:
+        return self._thread is not None and not self._cancelled and self.branch == branch
+
+    def commit(self, on_token=None):
+        """Adopt the run: replay buffered tokens into on_token, stream the rest, return its answer."""
+        with self._lock:
+            for token in self._buffer:
+                if on_token:
+                    on_token(token)
+            self._buffer.clear()
+            self._sink = on_token or (lambda token: None)
+        self._decided.set()
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def cancel(self):
+        with self._lock:
+            if self._sink is not None:
+                return              # already committed
+            self._cancelled = True
+            self._buffer.clear()
+        self._decided.set()
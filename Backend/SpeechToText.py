@@ -15,6 +15,8 @@ from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager 
 from dotenv import load_dotenv                   # ✅ CHANGED: Import load_dotenv instead of dotenv_values
 import mtranslate as mt
+from Backend.EventBus import SetAssistantStatus   # status is published on the in-memory event bus
+from Backend.Tracing import traced, SPEECH_RECOGNITION
 
 
 # ✅ FIX FILE PATHS - ONLY ADDITION TO YOUR CODE
@@ -127,12 +129,6 @@ driver = webdriver.Chrome(service=service, options=chrome_options)
 TempDirPath = str(BASE_DIR / "Frontend" / "Files")
 
 
-# Function to set the assistant's status by writing it to a file.
-def SetAssistantStatus(Status):
-    with open(rf'{TempDirPath}/Status.data', "w", encoding='utf-8') as file:
-        file.write(Status)
-
-
 # Function to modify a query to ensure proper punctuation and formatting.
 def QueryModifier(Query):
     new_query = Query.lower().strip()
@@ -164,6 +160,7 @@ def UniversalTranslator(Text):
 
 
 # Function to perform speech recognition using the WebDriver.
+@traced(SPEECH_RECOGNITION)
 def SpeechRecognition():
     # Open the HTML file in the browser.
     driver.get(Link)  # ✅ USES FIXED PATH
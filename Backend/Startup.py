@@ -0,0 +1,142 @@
+# Backend/Startup.py
+# Lazy loading of heavyweight backend modules and the --profile-startup report.
+import importlib
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def lazy_function(module: str, name: str):
+    """Return a stand-in for module.name that imports the module on first call."""
+    def _call(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+    _call.__name__ = name
+    _call.__qualname__ = name
+    _call.__doc__ = f"Lazily imported {module}.{name}"
+    return _call
+
+
+# --- Startup profiler ---------------------------------------------------------
+# Timings come from a child started with `-X importtime`, so they are the exact
+# numbers CPython reports. A second child wraps every loader's exec_module() with a
+# tracemalloc snapshot to attribute allocated memory to each module (kept separate
+# so tracemalloc overhead does not skew the timings).
+_CHILD = r"""
+import sys, json, tracemalloc, importlib.abc
+_mem = {}
+
+class _Loader(importlib.abc.Loader):
+    def __init__(self, loader):
+        self._loader = loader
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+    def exec_module(self, module):
+        before = tracemalloc.get_traced_memory()[0]
+        try:
+            self._loader.exec_module(module)
+        finally:
+            _mem[module.__name__] = tracemalloc.get_traced_memory()[0] - before
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+class _Finder(importlib.abc.MetaPathFinder):
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _Loader(spec.loader)
+                return spec
+        return None
+
+if sys.argv[2] == "memory":
+    tracemalloc.start()
+    sys.meta_path.insert(0, _Finder())
+sys.path.insert(0, sys.argv[1])
+sys.stderr.write("@@START@@\n")
+sys.stderr.flush()
+failed = {}
+for target in sys.argv[3:]:
+    try:
+        __import__(target)
+    except BaseException as e:
+        failed[target] = f"{type(e).__name__}: {e}"
+sys.stdout.write("\n@@MEM@@" + json.dumps({"mem": _mem, "failed": failed}) + "\n")
+"""
+
+# Modules imported before the window appears, and the ones deferred to first use.
+STARTUP_TARGETS = ["Main", "Frontend.GUI"]
+DEFERRED_TARGETS = [
+    "Backend.Model", "Backend.Chatbot", "Backend.RealtimeSearchEngine",
+    "Backend.TextToSpeech", "Backend.Automation", "Backend.SpeechToText",
+    "Backend.HotwordDetection",
+]
+
+
+def _parse_importtime(stderr: str) -> list[dict]:
+    rows = []
+    # only count what the targets import, not the profiling harness itself
+    stderr = stderr.split("@@START@@", 1)[-1]
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        raw_name = parts[2].rstrip()
+        rows.append({
+            "module": raw_name.strip(),
+            "depth": (len(raw_name) - len(raw_name.lstrip())) // 2,
+            "self_ms": int(parts[0]) / 1000.0,
+            "cumulative_ms": int(parts[1]) / 1000.0,
+        })
+    return rows
+
+
+def profile_imports(targets: list[str]) -> dict:
+    """Import targets in a fresh interpreter and return importtime rows plus memory."""
+    timed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, str(PROJECT_ROOT), "time", *targets],
+        capture_output=True, text=True, cwd=str(PROJECT_ROOT),
+    )
+    measured = subprocess.run(
+        [sys.executable, "-c", _CHILD, str(PROJECT_ROOT), "memory", *targets],
+        capture_output=True, text=True, cwd=str(PROJECT_ROOT),
+    )
+    mem, failed = {}, {}
+    if "@@MEM@@" in measured.stdout:
+        mem = json.loads(measured.stdout.rsplit("@@MEM@@", 1)[1])["mem"]
+    if "@@MEM@@" in timed.stdout:
+        failed = json.loads(timed.stdout.rsplit("@@MEM@@", 1)[1])["failed"]
+    rows = _parse_importtime(timed.stderr)
+    for row in rows:
+        row["memory_kb"] = mem.get(row["module"], 0) / 1024.0
+    return {"rows": rows, "failed": failed}
+
+
+def _print_report(title: str, result: dict, top: int):
+    rows = result["rows"]
+    roots = [r for r in rows if r["depth"] == 0]
+    total_ms = sum(r["cumulative_ms"] for r in roots)
+    print(f"\n=== {title}: {len(rows)} modules, {total_ms:.1f} ms total ===")
+    print(f"{'cumulative ms':>14} {'self ms':>9} {'memory KB':>10}  module")
+    for r in sorted(rows, key=lambda r: r["cumulative_ms"], reverse=True)[:top]:
+        print(f"{r['cumulative_ms']:>14.1f} {r['self_ms']:>9.1f} {r['memory_kb']:>10.1f}  {r['module']}")
+    for target, err in result["failed"].items():
+        print(f"  ! {target} failed to import: {err}")
+
+
+def profile_startup(top: int = 25):
+    """Report what the GUI path imports at startup and what first use will cost later."""
+    startup = profile_imports(STARTUP_TARGETS)
+    _print_report("Startup (before window)", startup, top)
+    loaded = {r["module"] for r in startup["rows"]}
+    deferred = profile_imports(DEFERRED_TARGETS)
+    deferred["rows"] = [r for r in deferred["rows"] if r["module"] not in loaded]
+    _print_report("Deferred (loaded on first use)", deferred, top)
+    return 0
@@ -0,0 +1,142 @@
+# Backend/TaskStream.py
+# Incremental parsing of FirstLayerDMM's streamed decision ("open chrome, open firefox,
+# general tell me about ...") and early dispatch of the tasks it contains. Each task is
+# emitted as soon as its delimiter arrives, so Automation can already be opening
+# Chrome while Cohere is still generating the rest of the answer.
+import asyncio
+import threading
+
+from .Tracing import current_trace, activate
+
+# Task kinds that are safe to start before the whole decision is known. System commands
+# wait for the full list (TranslateAndExecute orders mute/lock/sleep), as do answers,
+# image generation and exit.
+EARLY_TASKS = ("open ", "close ", "play ", "content ", "google search ", "youtube search ")
+
+
+class TaskParser:
+    """Split streamed classifier text into tasks.
+
+    '.' always ends a task (as the old split did). ',' and newlines end one only when the
+    text after them starts another known function, so a comma inside a query
+    ("general what is x, and why") stays part of it.
+    """
+
+    def __init__(self, funcs: list[str]):
+        self.funcs = tuple(funcs)
+        self._buffer = ""
+        self._scan = 0
+
+    def feed(self, text: str) -> list[str]:
+        """Add streamed text; returns the tasks completed by it."""
+        self._buffer += text
+        return self._drain(final=False)
+
+    def finish(self) -> list[str]:
+        """End of stream: whatever is left is the last task."""
+        tasks = self._drain(final=True)
+        tasks += self._accept(self._buffer)
+        self._buffer, self._scan = "", 0
+        return tasks
+
+    def _drain(self, final: bool) -> list[str]:
+        tasks = []
+        i = self._scan
+        while i < len(self._buffer):
+            ch = self._buffer[i]
+            if ch == ".":
+                split = True
+            elif ch in ",\n":
+                split = self._starts_task(self._buffer[i + 1:].lstrip(), final)
+                if split is None:            # not enough text yet to tell
+                    break
+            else:
+                i += 1
+                continue
+            if split:
+                tasks += self._accept(self._buffer[:i])
+                self._buffer = self._buffer[i + 1:]
+                i = 0
+            else:
+                i += 1
+        self._scan = i
+        return tasks
+
+    def _starts_task(self, rest: str, final: bool):
+        """True/False whether rest begins a new task, None while it could still go either way."""
+        if not rest:
+            return True if final else None
+        rest = rest.lower()
+        if rest.startswith(self.funcs):
+            return True
+        if not final and any(f.startswith(rest) for f in self.funcs):
+            return None
+        return False
+
+    def _accept(self, text: str) -> list[str]:
+        task = text.replace("\n", " ").strip()
+        return [task] if task.startswith(self.funcs) else []
+
+
+# --- Early dispatch ------------------------------------------------------------------
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _event_loop():
+    """One background asyncio loop shared by all dispatchers."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True, name="task-dispatch").start()
+        return _loop
+
+
+class EarlyDispatcher:
+    """Async consumer running execute([task]) for each early task as soon as it is fed."""
+
+    def __init__(self, execute, accept=lambda task: task.startswith(EARLY_TASKS)):
+        self.execute = execute
+        self.accept = accept
+        self.dispatched = []            # tasks handed to execute (known to the feeding thread)
+        self._closed = False
+        self._trace = current_trace()
+        self._loop = _event_loop()
+        self._queue = None
+        self._ready = threading.Event()
+        self._done = asyncio.run_coroutine_threadsafe(self._consume(), self._loop)
+        self._ready.wait()
+
+    def feed(self, task: str):
+        if self._closed or not self.accept(task):
+            return
+        self.dispatched.append(task)
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, task)
+
+    def close(self):
+        """No more tasks will be fed (idempotent)."""
+        if not self._closed:
+            self._closed = True
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+    def wait(self, timeout: float | None = None):
+        """Close and block until every dispatched task finished."""
+        self.close()
+        self._done.result(timeout)
+
+    async def _consume(self):
+        self._queue = asyncio.Queue()
+        self._ready.set()
+        running = []
+        while (task := await self._queue.get()) is not None:
+            running.append(asyncio.ensure_future(self._run(task)))
+        if running:
+            await asyncio.gather(*running)
+
+    async def _run(self, task):
+        try:
+            with activate(self._trace):
+                await self.execute([task])
+        except Exception as e:
+            print(f"[dispatch] {task!r} failed: {e}")
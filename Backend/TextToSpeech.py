@@ -1,8 +1,10 @@
 import pygame
 import random
-import pyttsx3
 import os
+import re
 import time
+import queue
+import threading
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -21,6 +23,8 @@ except Exception:
     def get_tone(): return None
     def set_tone(v): pass
 
+from Backend.Tracing import traced, current_trace, activate, TTS_SYNTHESIS, PLAYBACK
+
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "Data"
@@ -36,6 +40,7 @@ AssistantVoice = os.getenv("AssistantVoice")  # not used by edge-tts; pyttsx3 wi
 # -------- Local TTS (pyttsx3) with tone tweaks --------
 def create_tts_engine():
     try:
+        import pyttsx3   # local fallback only; skip its driver load unless edge-tts fails
         engine = pyttsx3.init()
         voices = engine.getProperty('voices')
         print("\n🎤 Available voices on your system:")
@@ -215,9 +220,10 @@ async def _edge_tts_to_file(text: str, out_mp3: str, tone: str | None):
     await communicate.save(out_mp3)
 
 # -------- Synthesis entry (Edge first, then local) --------
-async def TextToAudioFile(text) -> None:
+@traced(TTS_SYNTHESIS)
+async def _synthesize(text, mp3_file: str, wav_file: str, tone: str | None) -> str | None:
     # Clean previous outputs
-    for p in (SPEECH_MP3_FILE, SPEECH_WAV_FILE):
+    for p in (mp3_file, wav_file):
         try:
             if os.path.exists(p): os.remove(p)
         except Exception:
@@ -226,9 +232,9 @@ async def TextToAudioFile(text) -> None:
     used_edge = False
     try:
         if _EDGE_TTS_AVAILABLE and not os.getenv("EDGE_TTS_DISABLED", "").strip():
-            await _edge_tts_to_file(text, SPEECH_MP3_FILE, get_tone())
+            await _edge_tts_to_file(text, mp3_file, tone)
             time.sleep(0.2)
-            if os.path.exists(SPEECH_MP3_FILE) and os.path.getsize(SPEECH_MP3_FILE) > 0:
+            if os.path.exists(mp3_file) and os.path.getsize(mp3_file) > 0:
                 used_edge = True
         else:
             used_edge = False
@@ -240,100 +246,283 @@ async def TextToAudioFile(text) -> None:
         try:
             engine = create_tts_engine()
             if engine:
-                _apply_tone_local(engine, get_tone())
+                _apply_tone_local(engine, tone)
                 # IMPORTANT: save local synthesis to WAV, not MP3
-                engine.save_to_file(text, SPEECH_WAV_FILE)
+                engine.save_to_file(text, wav_file)
                 engine.runAndWait()
                 engine.stop()
                 time.sleep(0.5)
         except Exception as e:
             print(f"TTS Error: {e}")
 
+    return _pick_audio_path(mp3_file, wav_file)
+
+async def TextToAudioFile(text) -> None:
+    await _synthesize(text, SPEECH_MP3_FILE, SPEECH_WAV_FILE, get_tone())
+
     # reset tone for next call
     try: set_tone(None)
     except Exception: pass
 
 # -------- Playback (auto-pick Edge MP3 or local WAV) --------
-def _pick_audio_path() -> str | None:
-    if os.path.exists(SPEECH_MP3_FILE) and os.path.getsize(SPEECH_MP3_FILE) > 0:
-        return SPEECH_MP3_FILE
-    if os.path.exists(SPEECH_WAV_FILE) and os.path.getsize(SPEECH_WAV_FILE) > 0:
-        return SPEECH_WAV_FILE
+def _pick_audio_path(mp3_file: str = SPEECH_MP3_FILE, wav_file: str = SPEECH_WAV_FILE) -> str | None:
+    if os.path.exists(mp3_file) and os.path.getsize(mp3_file) > 0:
+        return mp3_file
+    if os.path.exists(wav_file) and os.path.getsize(wav_file) > 0:
+        return wav_file
     return None
 
-def TTS(Text, func=lambda r=None: True):
+# pygame.mixer is process-global: only one caller may drive it at a time
+PLAYBACK_LOCK = threading.RLock()
+
+def _init_mixer():
+    pygame.mixer.quit()
+    time.sleep(0.2)
+    pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=2048)
+    pygame.mixer.init()
+    time.sleep(0.2)
+
+@traced(PLAYBACK)
+def _play_file(path: str, func=lambda r=None: True) -> bool:
+    """Play one file on an initialised mixer; returns False if func() asked to stop."""
+    pygame.mixer.music.load(path)
+    pygame.mixer.music.set_volume(1.0)
+    pygame.mixer.music.play(fade_ms=0)
+    while pygame.mixer.music.get_busy():
+        if func() == False:
+            pygame.mixer.music.stop()
+            return False
+        pygame.time.wait(50)
     try:
-        import asyncio
-        asyncio.run(TextToAudioFile(Text))
+        pygame.mixer.music.unload()   # release the file so it can be rewritten
+    except Exception:
+        pass
+    return True
 
+def _release_mixer():
+    if pygame.mixer.get_init():
+        pygame.mixer.music.stop()
         pygame.mixer.quit()
-        time.sleep(0.2)
-        pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=2048)
-        pygame.mixer.init()
-        time.sleep(0.2)
-
-        path = _pick_audio_path()
-        if not path:
-            print("❌ Audio file not found!")
-            return False
+    time.sleep(0.2)
 
-        pygame.mixer.music.load(path)
-        pygame.mixer.music.set_volume(1.0)
-        pygame.mixer.music.play(fade_ms=0)
-        print("🔊 Playing audio...")
+def TTS(Text, func=lambda r=None: True):
+    with PLAYBACK_LOCK:
+        try:
+            import asyncio
+            asyncio.run(TextToAudioFile(Text))
 
-        while pygame.mixer.music.get_busy():
-            if func() == False:
-                pygame.mixer.music.stop()
-                break
-            pygame.time.wait(50)
+            _init_mixer()
 
-        print("✅ Audio playback completed!")
-        return True
+            path = _pick_audio_path()
+            if not path:
+                print("❌ Audio file not found!")
+                return False
 
-    except Exception as e:
-        print(f"❌ Error in TTS: {e}")
-        return False
+            print("🔊 Playing audio...")
+            _play_file(path, func)
+
+            print("✅ Audio playback completed!")
+            return True
 
-    finally:
-        try:
-            func(False)
-            if pygame.mixer.get_init():
-                pygame.mixer.music.stop()
-                pygame.mixer.quit()
-            time.sleep(0.2)
         except Exception as e:
-            print(f"Cleanup error: {e}")
+            print(f"❌ Error in TTS: {e}")
+            return False
+
+        finally:
+            try:
+                func(False)
+                _release_mixer()
+            except Exception as e:
+                print(f"Cleanup error: {e}")
+
+CHAT_SCREEN_RESPONSES = [
+    "The rest of the result has been printed to the chat screen, kindly check it out sir.",
+    "The rest of the text is now on the chat screen, sir, please check it.",
+    "You can see the rest of the text on the chat screen, sir.",
+    "The remaining part of the text is now on the chat screen, sir.",
+    "Sir, you'll find more text on the chat screen for you to see.",
+    "The rest of the answer is now on the chat screen, sir.",
+    "Sir, please look at the chat screen, the rest of the answer is there.",
+    "You'll find the complete answer on the chat screen, sir.",
+    "The next part of the text is on the chat screen, sir.",
+    "Sir, please check the chat screen for more information.",
+    "There's more text on the chat screen for you, sir.",
+    "Sir, take a look at the chat screen for additional text.",
+    "You'll find more to read on the chat screen, sir.",
+    "Sir, check the chat screen for the rest of the text.",
+    "The chat screen has the rest of the text, sir.",
+    "There's more to see on the chat screen, sir, please look.",
+    "Sir, the chat screen holds the continuation of the text.",
+    "You'll find the complete answer on the chat screen, kindly check it out sir.",
+    "Please review the chat screen for the rest of the text, sir.",
+    "Sir, look at the chat screen for the complete answer."
+]
+
+def _is_long_answer(Text) -> bool:
+    # Long answers are only partly spoken; the rest is read from the chat screen
+    return len(str(Text).split(".")) > 4 and len(str(Text)) >= 250
 
 def TextToSpeech(Text, func=lambda r=None: True):
-    Data = str(Text).split(".")
-    responses = [
-        "The rest of the result has been printed to the chat screen, kindly check it out sir.",
-        "The rest of the text is now on the chat screen, sir, please check it.",
-        "You can see the rest of the text on the chat screen, sir.",
-        "The remaining part of the text is now on the chat screen, sir.",
-        "Sir, you'll find more text on the chat screen for you to see.",
-        "The rest of the answer is now on the chat screen, sir.",
-        "Sir, please look at the chat screen, the rest of the answer is there.",
-        "You'll find the complete answer on the chat screen, sir.",
-        "The next part of the text is on the chat screen, sir.",
-        "Sir, please check the chat screen for more information.",
-        "There's more text on the chat screen for you, sir.",
-        "Sir, take a look at the chat screen for additional text.",
-        "You'll find more to read on the chat screen, sir.",
-        "Sir, check the chat screen for the rest of the text.",
-        "The chat screen has the rest of the text, sir.",
-        "There's more to see on the chat screen, sir, please look.",
-        "Sir, the chat screen holds the continuation of the text.",
-        "You'll find the complete answer on the chat screen, kindly check it out sir.",
-        "Please review the chat screen for the rest of the text, sir.",
-        "Sir, look at the chat screen for the complete answer."
-    ]
-    if len(Data) > 4 and len(Text) >= 250:
-        TTS(" ".join(Text.split(".")[0:2]) + ". " + random.choice(responses), func)
+    if _is_long_answer(Text):
+        TTS(" ".join(Text.split(".")[0:2]) + ". " + random.choice(CHAT_SCREEN_RESPONSES), func)
     else:
         TTS(Text, func)
 
+# -------- Streaming: speak an LLM answer sentence by sentence while it is generated --------
+_STOP_TOKENS = ("</s>", "</S>", "<|eot_id|>")
+
+class SentenceSplitter:
+    """Accumulates streamed tokens and returns each sentence once its boundary is certain."""
+    # A boundary is end punctuation followed by whitespace (so "3.14" or "e.g." mid-token
+    # is never split early), or a line break.
+    _BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, token: str) -> list[str]:
+        for marker in _STOP_TOKENS:
+            token = token.replace(marker, "")
+        self._buffer += token
+        parts = self._BOUNDARY.split(self._buffer)
+        self._buffer = parts.pop()          # last part may still be growing
+        return [p.strip() for p in parts if p.strip()]
+
+    def flush(self) -> list[str]:
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+class StreamingTextToSpeech:
+    """Pipeline stage: tokens in, audio out. Sentence n+1 is synthesised while sentence n plays.
+
+    Mirrors TextToSpeech(): at most the first two sentences of a long answer are spoken,
+    followed by a pointer to the chat screen.
+    """
+    SPOKEN_SENTENCES = 2
+    _SLOTS = 4   # rotating files; the play queue is bounded so a slot is never overwritten while queued
+
+    def __init__(self, on_text=None, func=lambda r=None: True):
+        self.on_text = on_text          # called with all text streamed so far, once per sentence
+        self.func = func
+        self.tone = get_tone()          # captured now: synthesis happens on worker threads
+        self.trace = current_trace()    # same for the request's latency trace
+        try: set_tone(None)
+        except Exception: pass
+        self._splitter = SentenceSplitter()
+        self._text = ""
+        self._spoken = 0
+        self._held = []                 # sentences 3+ wait until we know the answer is short
+        self._truncated = False
+        self._stopped = False
+        self._sentences = queue.Queue()
+        self._audio = queue.Queue(maxsize=self._SLOTS - 2)
+        self._synth_thread = threading.Thread(target=self._synth_loop, daemon=True)
+        self._play_thread = threading.Thread(target=self._play_loop, daemon=True)
+        self._synth_thread.start()
+        self._play_thread.start()
+
+    # --- producer side ---
+    def feed(self, token: str):
+        for sentence in self._splitter.feed(token or ""):
+            self._accept(sentence)
+
+    def _accept(self, sentence: str):
+        self._text = f"{self._text} {sentence}".strip()
+        if self.on_text:
+            self.on_text(self._text)
+        if self._truncated:
+            return
+        if self._spoken < self.SPOKEN_SENTENCES:
+            self._spoken += 1
+            self._sentences.put(sentence)
+        elif _is_long_answer(self._text):
+            self._truncated = True
+            self._held.clear()
+            self._sentences.put(random.choice(CHAT_SCREEN_RESPONSES))
+        else:
+            self._held.append(sentence)
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def finish(self, fallback_text: str = "") -> bool:
+        """Flush the last sentence, speak anything held back and block until playback ends."""
+        for sentence in self._splitter.flush():
+            self._accept(sentence)
+        if not self._text and fallback_text:
+            # nothing was streamed (cached/canned/error answers): speak the whole text
+            self.feed(fallback_text)
+            for sentence in self._splitter.flush():
+                self._accept(sentence)
+        if not self._truncated:
+            for sentence in self._held:
+                self._sentences.put(sentence)
+        self._held.clear()
+        self._sentences.put(None)
+        self._synth_thread.join()
+        self._play_thread.join()
+        return not self._stopped
+
+    def stop(self):
+        self._stopped = True
+        self._sentences.put(None)
+
+    # --- workers ---
+    def _synth_loop(self):
+        with activate(self.trace):
+            self._synth_sentences()
+
+    def _synth_sentences(self):
+        import asyncio
+        slot = 0
+        while True:
+            sentence = self._sentences.get()
+            if sentence is None or self._stopped:
+                break
+            mp3 = str(DATA_DIR / f"speech_stream_{slot}.mp3")
+            wav = str(DATA_DIR / f"speech_stream_{slot}.wav")
+            slot = (slot + 1) % self._SLOTS
+            try:
+                path = asyncio.run(_synthesize(sentence, mp3, wav, self.tone))
+            except Exception as e:
+                print(f"[stream-tts] synthesis error: {e}")
+                path = None
+            if path:
+                self._audio.put(path)
+        self._audio.put(None)
+
+    def _play_loop(self):
+        with activate(self.trace), PLAYBACK_LOCK:
+            mixer_ready = False
+            try:
+                while True:
+                    path = self._audio.get()
+                    if path is None:
+                        break
+                    if self._stopped:
+                        continue
+                    if not mixer_ready:
+                        _init_mixer()
+                        mixer_ready = True
+                        print("🔊 Playing audio...")
+                    if not _play_file(path, lambda r=None: (not self._stopped) and self.func() != False):
+                        self._stopped = True
+            except Exception as e:
+                print(f"❌ Error in streaming TTS: {e}")
+                # keep draining: the synth thread would block forever on the bounded queue
+                self._stopped = True
+                while self._audio.get() is not None:
+                    pass
+            finally:
+                try:
+                    self.func(False)
+                    if mixer_ready:
+                        _release_mixer()
+                        print("✅ Audio playback completed!")
+                except Exception as e:
+                    print(f"Cleanup error: {e}")
+
 if __name__ == "__main__":
     print(" 🎤 TextToSpeech Ready!")
     while True:
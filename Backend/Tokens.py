@@ -0,0 +1,19 @@
+# Backend/Tokens.py
+# Approximate token counting for prompt budgets. The app ships no tokenizer (Cohere and
+# Groq count server-side), so words and punctuation are counted as pieces and long words
+# as one token per 4 characters, which tracks BPE counts for English text closely
+# enough to budget prompts and compare variants.
+import math
+import re
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+MESSAGE_OVERHEAD = 4        # role/formatting tokens added per chat message
+
+
+def count_tokens(text: str) -> int:
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _PIECE.findall(text or ""))
+
+
+def count_message_tokens(messages: list[dict], key: str = "content") -> int:
+    """Tokens of a chat message list (Groq {"role","content"} or Cohere {"role","message"})."""
+    return sum(count_tokens(str(m.get(key, ""))) + MESSAGE_OVERHEAD for m in messages)
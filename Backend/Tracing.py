@@ -0,0 +1,288 @@
+# Backend/Tracing.py
+# Per-stage latency tracing. Backends wrap their stages in span("stage"); every span is
+# kept in a ring buffer and in a per-stage latency window. Spans are grouped into a
+# Trace (one user request) through a "current trace" context variable: every thread starts
+# without one and worker threads re-activate it explicitly (TTS synth/playback,
+# speculative runs); asyncio tasks get their own copy, so concurrent coroutines on one
+# loop keep their traces and open stages apart.
+#
+#   Data/latency.csv  p50/p95/p99 per stage, rewritten when a trace finishes
+#   Data/trace.json   Chrome trace (chrome://tracing, ui.perfetto.dev), only with --trace
+#   Data/counters.json  Backend/Metrics counters (cache hit rates, ...), refreshed alongside
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+from . import Metrics
+from .Tokens import count_tokens
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "Data"
+DATA_DIR.mkdir(exist_ok=True)
+LATENCY_PATH = DATA_DIR / "latency.csv"     # next to metrics.csv (RL policy rewards)
+CHROME_TRACE_PATH = DATA_DIR / "trace.json"
+
+RECENT_TRACES = 100        # finished traces kept in memory
+RECENT_SPANS = 5000        # spans kept for the Chrome trace export
+STAGE_WINDOW = 1000        # durations per stage used for the percentiles
+
+# Stage names used across the backends
+SPEECH_RECOGNITION = "speech_recognition"
+FIRST_LAYER_DMM = "first_layer_dmm"
+BRAVE_SEARCH = "brave_search"
+FAN_OUT = "fan_out"                        # concurrent searches/drafts of a multi-part question
+GROQ_COMPLETION = "groq_completion"
+GROQ_TTFT = "groq_ttft"                    # request sent -> first streamed token
+TTS_SYNTHESIS = "tts_synthesis"
+PLAYBACK = "playback"
+AUTOMATION = "automation"
+IMAGE_GENERATION = "image_generation"
+
+_lock = threading.Lock()
+_current = contextvars.ContextVar("trace", default=None)
+_open_stages = contextvars.ContextVar("stages", default=())
+_ids = itertools.count(1)
+_t0 = time.perf_counter()
+_spans = deque(maxlen=RECENT_SPANS)
+_traces = deque(maxlen=RECENT_TRACES)
+_stages = defaultdict(lambda: deque(maxlen=STAGE_WINDOW))
+chrome_trace_enabled = False
+
+
+class Trace:
+    """All spans recorded for one request, possibly on several threads."""
+
+    def __init__(self, name: str):
+        self.id = next(_ids)
+        self.name = name
+        self.start = time.perf_counter()
+        self.end = None
+        self.spans = []
+
+    def activate(self):
+        """Context manager making this the current trace of the calling thread."""
+        return _Activate(self)
+
+    def finish(self):
+        self.end = time.perf_counter()
+        with _lock:
+            _traces.append(self)
+        export()
+
+    def stage_totals(self) -> dict:
+        totals = defaultdict(float)
+        for s in list(self.spans):
+            totals[s["stage"]] += s["dur"]
+        return dict(totals)
+
+
+class _Activate:
+    def __init__(self, trace):
+        self.trace = trace
+
+    def __enter__(self):
+        self.token = _current.set(self.trace)
+        return self.trace
+
+    def __exit__(self, *exc):
+        _current.reset(self.token)
+        return False
+
+
+def current_trace() -> Trace | None:
+    return _current.get()
+
+
+def activate(trace: Trace | None):
+    """Activate trace in this thread (no-op context for None)."""
+    return _Activate(trace)
+
+
+class span:
+    """Time one stage: `with span(BRAVE_SEARCH, query=q): ...`
+
+    A stage that is already open on this thread (recursive retries) is not counted twice.
+    """
+
+    def __init__(self, stage: str, **args):
+        self.stage = stage
+        self.args = args
+
+    def __enter__(self):
+        stack = _open_stages.get()
+        self.nested = self.stage in stack
+        self.token = _open_stages.set(stack + (self.stage,))
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _open_stages.reset(self.token)
+        if not self.nested:
+            if exc_type is not None:
+                self.args["error"] = exc_type.__name__
+            _record(self.stage, self.start, end, self.args)
+        return False
+
+
+def traced(stage: str):
+    """Decorator form of span() for plain and async functions."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class StreamStats:
+    """Time to first token and generation rate of one streamed completion.
+
+    stats.token(text) for every chunk, then stats.finish() records the GROQ_TTFT stage,
+    sets the gauges <name>.ttft_ms_last / <name>.tokens_per_s_last and returns the
+    numbers (ttft_ms, tokens, tokens_per_s) for the caller's span.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.first = None
+        self.parts = []
+
+    def token(self, text: str):
+        if self.first is None:
+            self.first = time.perf_counter()
+        self.parts.append(text)
+
+    def finish(self) -> dict:
+        end = time.perf_counter()
+        if self.first is None:
+            return {"ttft_ms": None, "tokens": 0, "tokens_per_s": 0.0}
+        tokens = count_tokens("".join(self.parts))
+        generating = end - self.first
+        report = {
+            "ttft_ms": round((self.first - self.start) * 1000.0, 1),
+            "tokens": tokens,
+            "tokens_per_s": round(tokens / generating, 1) if generating > 0 else 0.0,
+        }
+        _record(GROQ_TTFT, self.start, self.first, {"caller": self.name})
+        Metrics.set_gauge(f"{self.name}.ttft_ms_last", report["ttft_ms"])
+        Metrics.set_gauge(f"{self.name}.tokens_per_s_last", report["tokens_per_s"])
+        Metrics.incr(f"{self.name}.completion_tokens", tokens)
+        return report
+
+
+def _record(stage, start, end, args):
+    trace = current_trace()
+    record = {
+        "stage": stage,
+        "start": start,
+        "dur": end - start,
+        "tid": threading.get_ident(),
+        "thread": threading.current_thread().name,
+        "trace": trace.id if trace else None,
+        "args": args,
+    }
+    with _lock:
+        _spans.append(record)
+        _stages[stage].append(record["dur"])
+    if trace is not None:
+        trace.spans.append(record)
+
+
+# --- Reports -----------------------------------------------------------------
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    # nearest-rank percentile
+    index = min(len(sorted_values), max(1, math.ceil(q / 100.0 * len(sorted_values)))) - 1
+    return sorted_values[index]
+
+
+def stage_percentiles() -> dict:
+    """{stage: {count, p50, p95, p99, max}} in milliseconds over the recent window."""
+    with _lock:
+        windows = {stage: sorted(d) for stage, d in _stages.items()}
+    return {
+        stage: {
+            "count": len(values),
+            "p50": _percentile(values, 50) * 1000.0,
+            "p95": _percentile(values, 95) * 1000.0,
+            "p99": _percentile(values, 99) * 1000.0,
+            "max": values[-1] * 1000.0 if values else 0.0,
+        }
+        for stage, values in windows.items()
+    }
+
+
+def recent_traces() -> list[Trace]:
+    with _lock:
+        return list(_traces)
+
+
+def write_latency_report(path: Path | None = None):
+    path = path or LATENCY_PATH
+    rows = ["stage,count,p50_ms,p95_ms,p99_ms,max_ms"]
+    for stage, p in sorted(stage_percentiles().items()):
+        rows.append(f"{stage},{p['count']},{p['p50']:.1f},{p['p95']:.1f},{p['p99']:.1f},{p['max']:.1f}")
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def chrome_trace() -> dict:
+    """Recent spans as Chrome trace-event JSON ("X" complete events, microseconds)."""
+    with _lock:
+        spans = list(_spans)
+    pid = os.getpid()
+    events, threads = [], {}
+    for s in spans:
+        threads[s["tid"]] = s["thread"]
+        args = {k: str(v) for k, v in s["args"].items()}
+        if s["trace"] is not None:
+            args["trace"] = s["trace"]
+        events.append({
+            "name": s["stage"], "cat": "stage", "ph": "X", "pid": pid, "tid": s["tid"],
+            "ts": (s["start"] - _t0) * 1e6, "dur": s["dur"] * 1e6, "args": args,
+        })
+    for tid, name in threads.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(path: Path | None = None):
+    path = path or CHROME_TRACE_PATH
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(chrome_trace()), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def enable_chrome_trace():
+    global chrome_trace_enabled
+    chrome_trace_enabled = True
+
+
+def export():
+    """Refresh Data/latency.csv and Data/counters.json (and Data/trace.json in --trace mode)."""
+    try:
+        write_latency_report()
+        Metrics.write()
+        if chrome_trace_enabled:
+            write_chrome_trace()
+    except Exception as e:
+        print(f"[trace] export failed: {e}")
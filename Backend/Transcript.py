@@ -0,0 +1,41 @@
+# Backend/Transcript.py
+# Chat-screen transcript rendered message by message from the conversation store.
+# Startup shows the newest page; older history is loaded one page at a time when the
+# GUI scrolls to the top. Live turns are shown by the pipeline as they happen, so the
+# transcript only ever pages through what existed when the app started.
+import threading
+
+PAGE_SIZE = 40        # messages per page (the first page is shown at startup)
+
+
+class Transcript:
+    def __init__(self, store, username: str, assistantname: str, page_size: int = PAGE_SIZE):
+        self.store = store
+        self.names = {"user": username, "assistant": assistantname}
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._unshown = store.recent()        # startup tail, newest last
+        self._cursor = store.window_offset    # file position of anything older than that
+
+    def format(self, message: dict) -> str | None:
+        name = self.names.get(message.get("role"))
+        if name is None:
+            return None
+        content = "\n".join(line for line in str(message.get("content", "")).split("\n") if line.strip())
+        return f"{name} : {content}"
+
+    def _render(self, messages) -> str:
+        return "\n".join(line for line in (self.format(m) for m in messages) if line)
+
+    @property
+    def exhausted(self) -> bool:
+        with self._lock:
+            return not self._unshown and self._cursor <= 0
+
+    def next_page(self) -> str:
+        """Render the next (older) page; "" once the whole history is shown."""
+        with self._lock:
+            if not self._unshown and self._cursor > 0:
+                self._unshown, self._cursor = self.store.older(self._cursor, self.page_size)
+            page, self._unshown = self._unshown[-self.page_size:], self._unshown[:-self.page_size]
+        return self._render(page)
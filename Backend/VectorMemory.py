@@ -0,0 +1,293 @@
+# Backend/VectorMemory.py
+# Long-term chat memory for ChatBot. Every finished turn (question + answer) is embedded
+# with a hashing vectorizer (signed crc32 buckets over words and word bigrams, L2
+# normalized) into one row of a float32 matrix memory-mapped from Data/memory_vectors.f32;
+# the turn text is appended to Data/memory_turns.jsonl. A question retrieves the top-k
+# past turns by cosine similarity (one matrix-vector product + argpartition), so only the
+# relevant old turns are sent to Groq instead of a long history. Adding a turn writes one
+# row; the file grows by doubling. 100k turns x 128 dims is ~51 MB and searches in a few ms.
+#
+#   python -m Backend.VectorMemory --bench 100000     # search latency on synthetic turns
+#   python -m Backend.VectorMemory --rebuild          # re-index Data/ChatLog.jsonl
+#
+# Metrics: memory.turns (gauge), memory.searches, memory.recalled, memory.search_ms_last.
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+
+from . import Metrics
+from .Tokens import count_tokens
+
+try:
+    import numpy as np
+    _NUMPY_AVAILABLE = True
+except Exception:
+    _NUMPY_AVAILABLE = False
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "Data"
+DATA_DIR.mkdir(exist_ok=True)
+VECTORS_PATH = DATA_DIR / "memory_vectors.f32"
+TURNS_PATH = DATA_DIR / "memory_turns.jsonl"
+
+DIM = 128                  # hashed feature buckets (row size 512 bytes)
+TOP_K = 4                  # turns recalled per question
+MIN_SCORE = 0.15           # cosine below this is not "relevant"
+RECALL_TOKENS = 600        # cap on the recalled-turns system message
+RECENT_BUDGET = int(os.getenv("ChatRecentTokens", "800"))   # newest turns still sent verbatim
+INITIAL_CAPACITY = 1024    # rows preallocated in the vector file
+ENABLED = _NUMPY_AVAILABLE and os.getenv("ChatVectorMemory", "1").strip().lower() not in ("0", "false", "no")
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_STOP = {"a", "an", "the", "is", "are", "was", "were", "be", "to", "of", "and", "or", "in", "on", "at",
+         "for", "it", "this", "that", "i", "you", "me", "my", "your", "what", "do", "does", "can", "please"}
+
+
+def _words(text: str) -> list[str]:
+    words = []
+    for w in _TOKEN.findall(text.lower()):
+        w = w[:-2] if w.endswith("'s") else w
+        w = w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w   # dogs -> dog
+        if w not in _STOP:
+            words.append(w)
+    return words
+
+
+def embed(text: str):
+    """Unit-length float32 vector of hashed unigrams and (half-weight) bigrams."""
+    words = _words(text)
+    vec = np.zeros(DIM, dtype=np.float32)
+    grams = [(w, 1.0) for w in words] + [(f"{a} {b}", 0.5) for a, b in zip(words, words[1:])]
+    for gram, weight in grams:
+        h = zlib.crc32(gram.encode("utf-8"))
+        vec[h % DIM] += weight if h & 0x80000000 else -weight    # signed hashing: collisions cancel out
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+class VectorMemory:
+    """Append-only turn memory: float32 memmap of embeddings + JSONL of turn texts."""
+
+    def __init__(self, vectors_path: Path = VECTORS_PATH, turns_path: Path = TURNS_PATH):
+        self.vectors_path = Path(vectors_path)
+        self.turns_path = Path(turns_path)
+        self._lock = threading.Lock()
+        self._turns = []
+        try:
+            with open(self.turns_path, "rb") as f:
+                for line in f:
+                    try:
+                        self._turns.append(json.loads(line))
+                    except ValueError:
+                        break            # torn last line after a crash: drop it and what follows
+        except OSError:
+            pass
+        rows = self.vectors_path.stat().st_size // (DIM * 4) if self.vectors_path.exists() else 0
+        del self._turns[rows:]           # a turn whose vector never reached the file
+        self._open(max(rows, INITIAL_CAPACITY))
+        self._log = open(self.turns_path, "a", encoding="utf-8")
+        self._scores = None
+        Metrics.set_gauge("memory.turns", len(self._turns))
+
+    def _open(self, capacity: int):
+        self._close_map()                # Windows cannot extend a file while it is mapped
+        size = capacity * DIM * 4
+        with open(self.vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, DIM))
+
+    def _close_map(self):
+        matrix = getattr(self, "_matrix", None)
+        if matrix is not None:
+            matrix.flush()
+            matrix._mmap.close()
+            self._matrix = None
+
+    def __len__(self):
+        return len(self._turns)
+
+    def add(self, user: str, assistant: str):
+        """Index one finished turn (one matrix row + one JSONL line)."""
+        vec = embed(f"{user} {assistant}")
+        with self._lock:
+            n = len(self._turns)
+            if n == self._matrix.shape[0]:
+                self._open(self._matrix.shape[0] * 2)
+            self._matrix[n] = vec
+            self._log.write(json.dumps({"user": user, "assistant": assistant}, ensure_ascii=False) + "\n")
+            self._log.flush()
+            self._turns.append({"user": user, "assistant": assistant})
+        Metrics.set_gauge("memory.turns", n + 1)
+
+    def search(self, query: str, k: int = TOP_K, min_score: float = MIN_SCORE) -> list[tuple[float, dict]]:
+        """(score, turn) for the k most similar past turns, best first."""
+        q = embed(query)
+        started = time.perf_counter()
+        with self._lock:
+            n = len(self._turns)
+            if n == 0 or not q.any():
+                return []
+            if self._scores is None or self._scores.shape[0] < n:
+                self._scores = np.empty(self._matrix.shape[0], dtype=np.float32)
+            scores = self._scores[:n]
+            np.dot(self._matrix[:n], q, out=scores)
+            k = min(k, n)
+            top = np.argpartition(scores, n - k)[n - k:]
+            top = top[np.argsort(-scores[top])]
+            hits = [(float(scores[i]), self._turns[i]) for i in top if scores[i] >= min_score]
+        Metrics.incr("memory.searches")
+        Metrics.incr("memory.recalled", len(hits))
+        Metrics.set_gauge("memory.search_ms_last", round((time.perf_counter() - started) * 1000, 3))
+        return hits
+
+    def flush(self):
+        with self._lock:
+            self._matrix.flush()
+
+    def clear(self):
+        with self._lock:
+            self._turns = []
+            self._close_map()
+            self._log.close()
+            for path in (self.vectors_path, self.turns_path):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._open(INITIAL_CAPACITY)
+            self._log = open(self.turns_path, "a", encoding="utf-8")
+        Metrics.set_gauge("memory.turns", 0)
+
+
+def turns_from_messages(messages):
+    """(user, assistant) pairs from a role/content message stream."""
+    question = None
+    for m in messages:
+        if m["role"] == "user":
+            question = m["content"]
+        elif m["role"] == "assistant" and question is not None:
+            yield question, m["content"]
+            question = None
+
+
+def recall_message(hits: list[tuple[float, dict]], exclude: list[dict] = (), budget: int = RECALL_TOKENS) -> list[dict]:
+    """Recalled turns as one system message, skipping turns already in the recent window."""
+    recent = {m["content"] for m in exclude}
+    lines, used = [], 0
+    for _, t in hits:
+        if t["user"] in recent or t["assistant"] in recent:
+            continue
+        line = f"user: {t['user']}\nassistant: {t['assistant']}"
+        used += count_tokens(line)
+        if lines and used > budget:
+            break
+        lines.append(line)
+    if not lines:
+        return []
+    return [{"role": "system", "content": "Relevant earlier conversation:\n" + "\n\n".join(lines)}]
+
+
+# Process-wide memory, created on first use. An empty memory is filled from the chat log
+# in the background the first time (existing users keep their history). Turns finished
+# meanwhile are held and added afterwards unless the backfill already read them from the
+# log (every caller writes the turn to the store before remember()).
+_memory = None
+_memory_lock = threading.Lock()
+_held = None               # live turns waiting for the running backfill
+
+
+def get_memory() -> VectorMemory | None:
+    global _memory, _held
+    if not ENABLED:
+        return None
+    with _memory_lock:
+        if _memory is None:
+            _memory = VectorMemory(VECTORS_PATH, TURNS_PATH)
+            if len(_memory) == 0:
+                _held = []
+                threading.Thread(target=_backfill, args=(_memory,), daemon=True, name="memory-backfill").start()
+        return _memory
+
+
+def _backfill(memory: VectorMemory):
+    global _held
+    from .ConversationStore import get_store
+    indexed = Counter()
+    try:
+        for user, assistant in turns_from_messages(get_store().iter_all()):
+            memory.add(user, assistant)
+            indexed[(user, assistant)] += 1
+    except Exception as e:
+        print(f"[memory] backfill failed: {e}")
+    finally:
+        with _memory_lock:
+            held, _held = _held or [], None
+        for turn in held:
+            if indexed[turn]:
+                indexed[turn] -= 1           # already read from the chat log
+            else:
+                memory.add(*turn)
+        memory.flush()
+
+
+def remember(user: str, assistant: str):
+    """Index a finished turn (no-op when the memory is disabled)."""
+    memory = get_memory()
+    if memory is None or not assistant:
+        return
+    with _memory_lock:
+        if _held is not None:
+            _held.append((user, assistant))
+            return
+    memory.add(user, assistant)
+
+
+def recall(query: str, exclude: list[dict] = ()) -> list[dict]:
+    """System message with the past turns relevant to query ([] when nothing matches)."""
+    memory = get_memory()
+    if memory is None:
+        return []
+    return recall_message(memory.search(query), exclude)
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import tempfile
+
+    parser = argparse.ArgumentParser(prog="python -m Backend.VectorMemory")
+    parser.add_argument("--bench", type=int, default=0, help="time search over N synthetic turns")
+    parser.add_argument("--rebuild", action="store_true", help="re-index Data/ChatLog.jsonl")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        memory = VectorMemory(VECTORS_PATH, TURNS_PATH)
+        memory.clear()
+        _backfill(memory)
+        print(f"indexed {len(memory)} turns into {VECTORS_PATH}")
+    if args.bench:
+        vocab = [f"w{i}" for i in range(5000)]
+        with tempfile.TemporaryDirectory() as tmp:
+            memory = VectorMemory(Path(tmp) / "v.f32", Path(tmp) / "t.jsonl")
+            started = time.perf_counter()
+            for _ in range(args.bench):
+                memory.add(" ".join(random.choices(vocab, k=8)), " ".join(random.choices(vocab, k=20)))
+            print(f"added {args.bench} turns in {time.perf_counter() - started:.1f} s")
+            memory.flush()
+            for _ in range(20):          # fault the mapped pages in once
+                memory.search(" ".join(random.choices(vocab, k=6)))
+            timings = []
+            for _ in range(200):
+                query = " ".join(random.choices(vocab, k=6))
+                started = time.perf_counter()
+                memory.search(query)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            print(f"search p50 {timings[len(timings) // 2]:.2f} ms   p95 {timings[int(len(timings) * 0.95)]:.2f} ms")
+            memory._log.close()
+            del memory
@@ -1,18 +1,21 @@
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTextEdit, QStackedWidget, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFrame, QLabel, QSizePolicy, QSpacerItem, QLineEdit, QGraphicsDropShadowEffect
-from PyQt5.QtGui import QIcon, QPainter, QMovie, QColor, QTextCharFormat, QFont, QPixmap, QTextBlockFormat, QPainterPath, QLinearGradient
-from PyQt5.QtCore import Qt, QSize, QTimer, QPointF
+from PyQt5.QtWidgets import QApplication, QMainWindow, QTextEdit, QStackedWidget, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFrame, QLabel, QSizePolicy, QSpacerItem, QLineEdit, QGraphicsDropShadowEffect, QShortcut
+from PyQt5.QtGui import QIcon, QPainter, QMovie, QColor, QTextCharFormat, QFont, QPixmap, QTextBlockFormat, QTextCursor, QPainterPath, QLinearGradient, QKeySequence
+from PyQt5.QtCore import Qt, QSize, QTimer, QPointF, QObject, pyqtSignal
 from dotenv import dotenv_values
 from pathlib import Path
 import sys
 import os
 
-
-# Paths (kept)
-PROJECT_ROOT = Path(__file__).parent.parent
-TempDirPath = PROJECT_ROOT / "Frontend" / "Files"
-GraphicsDirPath = PROJECT_ROOT / "Frontend" / "Graphics"
-TempDirPath.mkdir(parents=True, exist_ok=True)
-GraphicsDirPath.mkdir(parents=True, exist_ok=True)
+# In-memory state channel (replaces the Mic/Status/Responses .data polling)
+from Backend.EventBus import (
+    bus, STATUS, RESPONSES, RESPONSE_PARTIAL, HISTORY, RequestOlderHistory,
+    SetMicrophoneStatus, GetMicrophoneStatus,
+    SetAssistantStatus, GetAssistantStatus,
+    ShowTextToScreen, SubmitTypedInput, CancelRequests )
+# Qt-free helpers (re-exported here for existing imports)
+from Frontend.Helpers import (
+    PROJECT_ROOT, TempDirPath, GraphicsDirPath,
+    AnswerModifier, QueryModifier, GraphicsDirectoryPath, TempDirectoryPath )
 
 
 # Read ONLY from .env file (no os.getenv) to avoid Windows USERNAME collision
@@ -21,48 +24,6 @@ Assistantname = _env.get("Assistantname", "Ash")
 Username = _env.get("Username", "Admin")
 
 
-old_chat_message = ""
-
-
-def AnswerModifier(Answer):
-    lines = Answer.split('\n')
-    non_empty_lines = [line for line in lines if line.strip()]
-    return '\n'.join(non_empty_lines)
-
-
-def QueryModifier(Query):
-    new_query = Query.lower().strip()
-    query_words = new_query.split()
-    question_words = ["how", "what", "who", "where", "when", "why", "which", "whose", "whom", "can you", "what's", "where's", "how's"]
-    if any(word + " " in new_query for word in question_words):
-        if query_words[-1][-1] in ['.', ' ?', '!']:
-            new_query = new_query[:-1] + "?"
-        else:
-            new_query += "?"
-    else:
-        if query_words[-1][-1] in ['.', '?', '!']:
-            new_query = new_query[:-1] + "."
-        else:
-            new_query += "."
-    return new_query.capitalize()
-
-
-def SetMicrophoneStatus(Command):
-    (TempDirPath / "Mic.data").write_text(Command, encoding="utf-8")
-
-
-def GetMicrophoneStatus():
-    return (TempDirPath / "Mic.data").read_text(encoding="utf-8")
-
-
-def SetAssistantStatus(Status):
-    (TempDirPath / "Status.data").write_text(Status, encoding="utf-8")
-
-
-def GetAssistantStatus():
-    return (TempDirPath / "Status.data").read_text(encoding="utf-8")
-
-
 def MicButtonInitialed():
     SetMicrophoneStatus("False")
 
@@ -71,16 +32,29 @@ def MicButtonClosed():
     SetMicrophoneStatus("True")
 
 
-def GraphicsDirectoryPath(Filename):
-    return str(GraphicsDirPath / Filename)
+# Re-emits bus events as Qt signals so widgets are always updated on the GUI thread
+class BusBridge(QObject):
+    status_changed = pyqtSignal(str)
+    response_received = pyqtSignal(str)
+    partial_received = pyqtSignal(str)
+    history_received = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        bus.subscribe(STATUS, lambda v: self.status_changed.emit(str(v)))
+        bus.subscribe(RESPONSES, lambda v: self.response_received.emit(str(v)))
+        bus.subscribe(RESPONSE_PARTIAL, lambda v: self.partial_received.emit(str(v)))
+        bus.subscribe(HISTORY, lambda v: self.history_received.emit(str(v)))
 
 
-def TempDirectoryPath(Filename):
-    return str(TempDirPath / Filename)
+_bridge = None
 
 
-def ShowTextToScreen(Text):
-    (TempDirPath / "Responses.data").write_text(Text, encoding="utf-8")
+def GetBusBridge():
+    global _bridge
+    if _bridge is None:
+        _bridge = BusBridge()
+    return _bridge
 
 
 # ---------- Subtle, non‑flicker animated label ----------
@@ -218,6 +192,8 @@ class ChatSection(QWidget):
         self.send_btn.setFixedHeight(46)
         self.send_btn.clicked.connect(self._send_text)
         self.input_edit.returnPressed.connect(self._send_text)
+        # Esc stops the answer that is currently being generated/spoken
+        QShortcut(QKeySequence(Qt.Key_Escape), self, activated=CancelRequests)
 
         center_box.addWidget(self.input_edit, 0)
         center_box.addWidget(self.send_btn, 0)
@@ -258,10 +234,19 @@ class ChatSection(QWidget):
         font.setPointSize(13)
         self.chat_text_edit.setFont(font)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadMessages)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(100)
+        bridge = GetBusBridge()
+        self._stream_start = None   # document range [start, end) of the answer that is still streaming
+        self._stream_end = None
+        bridge.response_received.connect(self.loadMessages)
+        bridge.partial_received.connect(self.loadPartialMessage)
+        bridge.status_changed.connect(self.SpeechRecogText)
+        # Older history is paged in when the transcript is scrolled to the top
+        self._history_loading = False
+        self._history_done = False
+        bridge.history_received.connect(self.prependHistory)
+        self.chat_text_edit.verticalScrollBar().valueChanged.connect(self._onScroll)
+        self.SpeechRecogText(GetAssistantStatus())
+        self.loadMessages(bus.latest(RESPONSES, ""))
 
         self.chat_text_edit.viewport().installEventFilter(self)
 
@@ -278,8 +263,7 @@ class ChatSection(QWidget):
         text = self.input_edit.text().strip()
         if not text:
             return
-        (TempDirPath / "TypedInput.data").write_text(text, encoding="utf-8")
-        (TempDirPath / "TypedTrigger.flag").write_text("1", encoding="utf-8")
+        SubmitTypedInput(text)
         self.addMessage(message=f"Admin : {text}", color='White')
         self.input_edit.clear()
 
@@ -306,19 +290,79 @@ class ChatSection(QWidget):
         pixmap = QPixmap(path)
         self.chat_mic_button.setPixmap(pixmap.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation))
 
-    def loadMessages(self):
-        global old_chat_message
-        messages = (TempDirPath / 'Responses.data').read_text(encoding='utf-8')
-        if messages and len(messages) > 1 and str(old_chat_message) != str(messages):
-            self.addMessage(message=messages, color='White')
-            old_chat_message = messages
-
-    def SpeechRecogText(self):
-        messages = (TempDirPath / 'Status.data').read_text(encoding='utf-8')
+    def loadMessages(self, messages):
+        # every answer event is a new message, even if it repeats the previous one
+        text = messages if messages and str(messages).strip() else None
+        if self._stream_start is not None:
+            # final text of a streamed answer replaces its partial rendering, in place
+            self._replaceStreamedMessage(text)
+            self._stream_start = self._stream_end = None
+        elif text is not None:
+            self.addMessage(message=text, color='White')
+
+    def loadPartialMessage(self, message):
+        if self._stream_start is None:
+            self._stream_start = self._stream_end = self.chat_text_edit.document().characterCount() - 1
+        self._replaceStreamedMessage(message)
+
+    def _replaceStreamedMessage(self, message=None):
+        """Swap only the streamed block's range, so messages typed meanwhile (appended
+        below it) stay in the transcript."""
+        document = self.chat_text_edit.document()
+        at_end = self._stream_end >= document.characterCount() - 1
+        cursor = QTextCursor(document)
+        cursor.setPosition(self._stream_start)
+        cursor.setPosition(self._stream_end, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        if message is not None:
+            fmt = QTextCharFormat()
+            fmt.setForeground(QColor('White'))
+            blk = QTextBlockFormat()
+            blk.setTopMargin(10)
+            blk.setLeftMargin(10)
+            cursor.setCharFormat(fmt)
+            cursor.setBlockFormat(blk)
+            cursor.insertText(message + "\n")
+        self._stream_end = cursor.position()
+        if at_end:
+            self.chat_text_edit.setTextCursor(cursor)   # keep following the answer
+
+    def SpeechRecogText(self, messages):
         self.label.setText(messages)
 
+    def _onScroll(self, value):
+        bar = self.chat_text_edit.verticalScrollBar()
+        if value == bar.minimum() and bar.maximum() > 0 and not (self._history_loading or self._history_done):
+            self._history_loading = True
+            RequestOlderHistory()
+
+    def prependHistory(self, messages):
+        self._history_loading = False
+        if not messages:
+            self._history_done = True
+            return
+        bar = self.chat_text_edit.verticalScrollBar()
+        from_bottom = bar.maximum() - bar.value()
+        document = self.chat_text_edit.document()
+        before = document.characterCount()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.Start)
+        fmt = QTextCharFormat()
+        fmt.setForeground(QColor('White'))
+        blk = QTextBlockFormat()
+        blk.setTopMargin(10)
+        blk.setLeftMargin(10)
+        cursor.setCharFormat(fmt)
+        cursor.setBlockFormat(blk)
+        cursor.insertText(messages + "\n")
+        if self._stream_start is not None:
+            self._stream_start += document.characterCount() - before
+            self._stream_end += document.characterCount() - before
+        bar.setValue(bar.maximum() - from_bottom)   # keep the visible text where it was
+
     def addMessage(self, message, color):
         cursor = self.chat_text_edit.textCursor()
+        cursor.movePosition(QTextCursor.End)        # always append (a streamed answer may sit above)
         fmt = QTextCharFormat()
         blk = QTextBlockFormat()
         blk.setTopMargin(10)
@@ -400,12 +444,11 @@ class InitialScreen(QWidget):
 
         self.movie.start()
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(100)
+        bridge = GetBusBridge()
+        bridge.status_changed.connect(self.SpeechRecogText)
+        self.SpeechRecogText(GetAssistantStatus())
 
-    def SpeechRecogText(self):
-        messages = (TempDirPath / 'Status.data').read_text(encoding='utf-8')
+    def SpeechRecogText(self, messages):
         self.label.setText(messages)
 
     def load_icon(self, path, width=80, height=80):
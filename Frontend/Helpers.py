@@ -0,0 +1,41 @@
+# Frontend/Helpers.py
+# Qt-free text and path helpers shared by the GUI and Main (so Main can be imported headless).
+from pathlib import Path
+
+# Paths (kept)
+PROJECT_ROOT = Path(__file__).parent.parent
+TempDirPath = PROJECT_ROOT / "Frontend" / "Files"
+GraphicsDirPath = PROJECT_ROOT / "Frontend" / "Graphics"
+TempDirPath.mkdir(parents=True, exist_ok=True)
+GraphicsDirPath.mkdir(parents=True, exist_ok=True)
+
+
+def AnswerModifier(Answer):
+    lines = Answer.split('\n')
+    non_empty_lines = [line for line in lines if line.strip()]
+    return '\n'.join(non_empty_lines)
+
+
+def QueryModifier(Query):
+    new_query = Query.lower().strip()
+    query_words = new_query.split()
+    question_words = ["how", "what", "who", "where", "when", "why", "which", "whose", "whom", "can you", "what's", "where's", "how's"]
+    if any(word + " " in new_query for word in question_words):
+        if query_words[-1][-1] in ['.', ' ?', '!']:
+            new_query = new_query[:-1] + "?"
+        else:
+            new_query += "?"
+    else:
+        if query_words[-1][-1] in ['.', '?', '!']:
+            new_query = new_query[:-1] + "."
+        else:
+            new_query += "."
+    return new_query.capitalize()
+
+
+def GraphicsDirectoryPath(Filename):
+    return str(GraphicsDirPath / Filename)
+
+
+def TempDirectoryPath(Filename):
+    return str(TempDirPath / Filename)
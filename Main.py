@@ -1,15 +1,11 @@
 import os
 import warnings
-import pygame
 import logging
 from pathlib import Path
 import json
 
 logging.getLogger().setLevel(logging.ERROR)
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
-os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
-os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
-os.environ['TF_DISABLE_SEGMENT_REDUCTION'] = '1'
 warnings.filterwarnings('ignore')
 os.environ['PYTHONWARNINGS'] = 'ignore'
 import sys
@@ -17,52 +13,67 @@ if hasattr(sys.stdout, 'buffer'):
     os.environ['CHROME_LOG_FILE'] = 'NUL'
 import subprocess
 import threading
-import tensorflow as tf
 
-# --- ADDED: concurrency primitive (no changes to existing logic) ---
-from threading import Lock
-PIPELINE_LOCK = Lock()
-# --- END ADD ---
+# Report per-module import time/memory in child interpreters and exit before loading anything
+if __name__ == "__main__" and "--profile-startup" in sys.argv:
+    from Backend.Startup import profile_startup
+    sys.exit(profile_startup())
+
+# Offline benchmark: replay a query corpus through HandleRequest with faked services (no GUI)
+if __name__ == "__main__" and "--benchmark" in sys.argv:
+    from Backend.Benchmark import main as benchmark_main
+    sys.exit(benchmark_main())
+
+# --trace: also dump every stage span as Chrome-trace JSON to Data/trace.json
+from Backend import Tracing
+if __name__ == "__main__" and "--trace" in sys.argv:
+    Tracing.enable_chrome_trace()
 
 # ✅ FIX FILE PATHS - ONLY ADDITION TO YOUR CODE
 PROJECT_ROOT = Path(__file__).parent
 DATA_DIR = PROJECT_ROOT / "Data"
 DATA_DIR.mkdir(exist_ok=True)
-CHAT_LOG_FILE = DATA_DIR / "ChatLog.json"
+# Conversation history lives in the append-only store (Data/ChatLog.jsonl); an existing
+# Data/ChatLog.json is imported into it on first start.
+from Backend.ConversationStore import get_store
+from Backend.Transcript import Transcript
 
 # ✅ FIX IMAGE GENERATION SUBPROCESS PATH
 IMAGE_GENERATION_SCRIPT = PROJECT_ROOT / "Backend" / "ImageGeneration.py"
 
-# Suppress TensorFlow warnings and delegate errors
+# Suppress gRPC/Chrome log noise
 os.environ['GRPC_VERBOSITY'] = 'ERROR'
 os.environ['GLOG_minloglevel'] = '2'
 
-# Force CPU-only inference globally
-tf.config.set_visible_devices([], 'GPU')
-print("🔧 TensorFlow configured for CPU-only inference")
-
-from Frontend.GUI import ( 
-GraphicalUserInterface,
+# Qt-free imports only: the GUI itself is loaded in SecondThread, so Main can be
+# imported headless (offline benchmark)
+from Frontend.Helpers import TempDirectoryPath, AnswerModifier, QueryModifier
+from Backend.EventBus import (
 SetAssistantStatus,
 ShowTextToScreen,
-TempDirectoryPath,
 SetMicrophoneStatus,
-AnswerModifier,
-QueryModifier,
 GetMicrophoneStatus,
 GetAssistantStatus )
-from Backend.Model import FirstLayerDMM
-from Backend.RealtimeSearchEngine import RealtimeSearchEngine
-from  Backend.Automation import Automation
-from Backend.SpeechToText import SpeechRecognition
-from Backend.Chatbot import ChatBot
-from Backend.TextToSpeech import TextToSpeech
+# Heavy backends (cohere, groq, selenium/Chrome, pygame, AppOpener, pywhatkit, porcupine)
+# are imported on first use so the window appears without waiting for them.
+from Backend.Startup import lazy_function
+FirstLayerDMM = lazy_function("Backend.Model", "FirstLayerDMM")
+RealtimeSearchEngine = lazy_function("Backend.RealtimeSearchEngine", "RealtimeSearchEngine")
+MultiSearchEngine = lazy_function("Backend.RealtimeSearchEngine", "MultiSearchEngine")
+Automation = lazy_function("Backend.Automation", "Automation")
+SpeechRecognition = lazy_function("Backend.SpeechToText", "SpeechRecognition")
+ChatBot = lazy_function("Backend.Chatbot", "ChatBot")
+TextToSpeech = lazy_function("Backend.TextToSpeech", "TextToSpeech")
+start_hotword_detection = lazy_function("Backend.HotwordDetection", "start_hotword_detection")
+stop_hotword_detection = lazy_function("Backend.HotwordDetection", "stop_hotword_detection")
+StreamingTextToSpeech = lazy_function("Backend.TextToSpeech", "StreamingTextToSpeech")
+WarmUpGroq = lazy_function("Backend.GroqClient", "warm_up")
 # NEW: tone setter (only addition)
 from Backend.Tone import set_tone
-from dotenv import load_dotenv                  # ✅ CHANGED: Import load_dotenv instead of dotenv_values
+from Backend.Speculation import guess_branch, Speculation
+from Backend.TaskStream import EarlyDispatcher
 from asyncio import run 
 from time import sleep
-from Backend.HotwordDetection import start_hotword_detection, stop_hotword_detection
 
 # Import centralized config
 from Backend.Config import Username, Assistantname
@@ -72,17 +83,10 @@ from Backend.RLPolicy import RLPolicy
 policy = RLPolicy()
 # --- END ADD ---
 
-# --- ADDED: typed-input trigger files (reuse existing Frontend/Files handshake) ---
-TYPED_FLAG_PATH  = Path(TempDirectoryPath('TypedTrigger.flag'))
-TYPED_INPUT_PATH = Path(TempDirectoryPath('TypedInput.data'))
-try:
-    if not TYPED_FLAG_PATH.exists():
-        TYPED_FLAG_PATH.write_text("0", encoding="utf-8")
-    if not TYPED_INPUT_PATH.exists():
-        TYPED_INPUT_PATH.write_text("", encoding="utf-8")
-except Exception:
-    pass
-# --- END ADD ---
+# Typed input and cancel requests arrive over the in-memory event bus; both voice and
+# typed requests go through one scheduler (see SCHEDULER below)
+from Backend.EventBus import bus, TYPED_INPUT, CANCEL, HISTORY_REQUEST, ShowOlderHistory
+from Backend.Scheduler import RequestScheduler
 
 DefaultMessage = f'''{Username} : Hello {Assistantname}, How are you?
 {Assistantname} : Welcome {Username}. I am doing well. How may i help you?'''
@@ -94,58 +98,25 @@ session_started = False
 conversation_count = 0
 
 def ShowDefaultChatIfNoChats():
-    # ✅ FIXED PATH - Open ChatLog.json from absolute path
-    try:
-        File = open(CHAT_LOG_FILE, "r", encoding='utf-8')
-        content = File.read()
-        File.close()
-        
-        if len(content)<5:
-            with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
-                file.write("")
-
-            with open(TempDirectoryPath('Responses.data'), 'w', encoding='utf-8') as file:
-                file.write(DefaultMessage)
-    except FileNotFoundError:
-        # Create empty ChatLog if it doesn't exist
-        with open(CHAT_LOG_FILE, 'w', encoding='utf-8') as file:
-            file.write('[]')
-        
-        with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
-            file.write("")
-
-        with open(TempDirectoryPath('Responses.data'), 'w', encoding='utf-8') as file:
-            file.write(DefaultMessage)
-
-def ReadChatLogJson():
-    with open(CHAT_LOG_FILE, 'r', encoding='utf-8') as file:  # ✅ FIXED PATH
-        chatlog_data = json.load(file)
-    return chatlog_data
+    if get_store().is_empty():
+        ShowTextToScreen(DefaultMessage)
+
+# Transcript of earlier sessions, rendered per message and paged in lazily (no
+# Database.data rebuild): startup only touches the newest page
+TRANSCRIPT = None
 
 def ChatLogIntegration():
-    json_data = ReadChatLogJson()
-    formatted_chatlog = ""
-    for entry in json_data:
-        if entry["role"] == "user":
-            formatted_chatlog += f"User: {entry['content']}\n"
-        elif entry["role"] == "assistant":
-            formatted_chatlog += f"Assistant: {entry['content']}\n"
-    formatted_chatlog = formatted_chatlog.replace("User", Username + " ")
-    formatted_chatlog = formatted_chatlog.replace("Assistant", Assistantname + " ")
-
-    with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
-        file.write(AnswerModifier(formatted_chatlog))
+    global TRANSCRIPT
+    TRANSCRIPT = Transcript(get_store(), Username, Assistantname)
 
 def ShowChatsOnGUI():
-    File = open(TempDirectoryPath('Database.data'),"r", encoding='utf-8')
-    Data = File.read()
-    if len(str(Data))>0:
-        lines = Data.split('\n')
-        result = '\n' .join(lines)
-        File.close()
-        File = open(TempDirectoryPath( 'Responses.data'), "w", encoding='utf-8')
-        File.write(result)      
-        File.close()
+    page = TRANSCRIPT.next_page()
+    if page:
+        ShowTextToScreen(page)
+
+def ShowOlderChats(_=None):
+    # GUI scrolled to the top: prepend the next older page ("" tells it to stop asking)
+    ShowOlderHistory(TRANSCRIPT.next_page() if TRANSCRIPT else "")
 
 def InitialExecution():
     SetMicrophoneStatus("False")
@@ -154,7 +125,10 @@ def InitialExecution():
     ChatLogIntegration()
     ShowChatsOnGUI()
 
-InitialExecution()
+if __name__ == "__main__":
+    InitialExecution()
+    # open the shared Groq connection (import + TLS handshake) off the startup path
+    threading.Thread(target=WarmUpGroq, kwargs={"background": False}, daemon=True, name="groq-warm-up").start()
 
 def generate_greeting():
     """Generate personalized greeting for fresh conversation"""
@@ -212,220 +186,256 @@ def _quick_casual_reply(text: str) -> str | None:
     return canned.get(key)
 # --- END ADD ---
 
-def MainExecution():
-    global session_started, conversation_count  # ✨ Add this line
-    
-    # ✨ GREETING LOGIC - Add this block at the very beginning
-    if not session_started:
-        greeting = generate_greeting()
-        ShowTextToScreen(f"{Assistantname} : {greeting}")
-        SetAssistantStatus("Greeting...")
-        set_tone("cheerful")  # NEW
-        TextToSpeech(greeting)
-        SetMicrophoneStatus("False")  # ← ADDED LINE
-        session_started = True
-        conversation_count = 1
-        return True
-    
-    # ✨ Increment conversation count
-    conversation_count += 1
-    
-    # YOUR EXISTING CODE STARTS HERE (keep everything exactly the same)
-    TaskExecution = False
-    ImageExecution = False
-    ImageGenerationQuery = ""
-
-    SetAssistantStatus("Listening...")
-    Query = SpeechRecognition()
-    ShowTextToScreen(f"{Username} : {Query}")
-
-    # --- ADDED: Short-circuit canned replies for casual utterances (voice) ---
-    _ans = _quick_casual_reply(Query)
-    if _ans:
-        SetAssistantStatus("Answering ...")
-        set_tone("cheerful")  # NEW
-        ShowTextToScreen(f"{Assistantname} : {_ans}")
-        TextToSpeech(_ans)
-        SetMicrophoneStatus("False")
-        return True
-    # --- END ADD ---
-
-    SetAssistantStatus("Thinking ...")
-    Decision = FirstLayerDMM(Query)
-
-    print("")
-    print(f"Decision : {Decision}")
-    print("")
-
-    G = any([i for i in Decision if i.startswith("general")])
-    R = any([i for i in Decision if i.startswith("realtime")])
-
-    Mearged_query = " and ".join(
-        [" ".join(i.split()[1:]) for i in Decision if i.startswith("general") or i.startswith("realtime")]
-    )
+# --- Streaming answer stage: LLM tokens -> sentences -> screen + speech, while generation runs ---
+def StreamAnswer(generate, Query, tone, request=None):
+    set_tone(tone)
 
-    # STRICT: trigger only on "generate image" or "create image"
-    for queries in Decision:
-        ql = queries.lower().strip()
-        if ql.startswith("generate image") or ql.startswith("create image"):
-            ImageGenerationQuery = str(queries)
-            ImageExecution = True
-            break
+    def on_text(text):
+        if GetAssistantStatus() != "Answering ...":
+            SetAssistantStatus("Answering ...")
+        ShowTextToScreen(f"{Assistantname} : {text}", partial=True)
 
-    for queries in Decision:
-        if TaskExecution == False:
-            if any(queries.startswith(func) for func in Functions):
-                run(Automation(list(Decision)))
-                TaskExecution = True
-                # ✅ MICROPHONE FIX: Turn off mic after automation
-                SetMicrophoneStatus("False")
-                return True
+    speech = StreamingTextToSpeech(on_text=on_text)
 
-    if ImageExecution == True:
-        # ... keep all your existing image generation code ...
-        with open(str(PROJECT_ROOT / "Frontend" / "Files" / "ImageGeneration.data"), "w") as file:  # ✅ FIXED PATH
-            file.write(f"{ImageGenerationQuery},True")
+    def on_token(token):
+        if request is not None:
+            request.check()     # stops generation before anything is saved
+        speech.feed(token)
 
-        try:
-            print(" Starting image generation subprocess...")
-        
-            # ✅ FIXED SUBPROCESS PATH - Use absolute path
-            p1 = subprocess.Popen(
-                [sys.executable, str(IMAGE_GENERATION_SCRIPT)],  # ✅ FIXED PATH
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                stdin=subprocess.PIPE, 
-                shell=False
-            )
-        
-            subprocesses.append(p1)
-        
-            stdout, stderr = p1.communicate(timeout=120)
-        
-            if p1.returncode == 0:
-                print(" Image generation completed successfully")
-            
-                if os.path.exists(str(DATA_DIR)):  # ✅ FIXED PATH
-                    images = [f for f in os.listdir(str(DATA_DIR)) if f.endswith('.jpg') or f.endswith('.png')]
-                    print(f" Generated {len(images)} images")
-                else:
-                    print(" Data folder not found")
-            else:
-                print(f" Image generation failed:")
-                print(f"Return code: {p1.returncode}")
-                if stderr:
-                    print(f"Error: {stderr.decode()}")
-                if stdout:
-                    print(f"Output: {stdout.decode()}")
-            
-        except subprocess.TimeoutExpired:
-            p1.kill()
-            print(" Image generation timed out after 2 minutes")
-        except Exception as e:
-            print(f" Error starting ImageGeneration.py: {e}")
-        
-        # ✅ MICROPHONE FIX: Turn off mic after image generation
-        SetMicrophoneStatus("False")
-        return True
+    if request is not None:
+        request.on_cancel(speech.stop)
+    try:
+        Answer = generate(Query, on_token=on_token)
+    except BaseException:
+        speech.stop()
+        raise
+    ShowTextToScreen(f"{Assistantname} : {Answer}")
+    SetAssistantStatus("Answering ...")
+    speech.finish(fallback_text=Answer)
+    return Answer
+# --- END ADD ---
 
-    # --- RL: only adjusts internal k for realtime; routing logic unchanged ---
-    if G and R or R:
+# --- Branch answering shared by the voice and typed pipelines ---
+def _choose_settings(branch):
+    # --- RL: only adjusts temperature / internal k; routing logic unchanged ---
+    if branch == "realtime":
         try:
             from Backend.RealtimeSearchEngine import set_top_k
-            choice_search = policy.choose("search")
-            set_top_k(choice_search.get("retrieval_k", 5))
+            choice = policy.choose("search")
+            set_top_k(choice.get("retrieval_k", 5))
         except Exception:
-            choice_search = {"retrieval_k": 5}
-        SetAssistantStatus("Searching ... ")
-        Answer = RealtimeSearchEngine(QueryModifier(Mearged_query))
-        ShowTextToScreen(f"{Assistantname} : {Answer}")
-        SetAssistantStatus("Answering ... ")
-        set_tone("newscast")  # NEW
-        TextToSpeech(Answer)
+            choice = {"retrieval_k": 5}
+    else:
         try:
-            policy.reward("search", choice_search, success=bool(Answer and str(Answer).strip()))
+            from Backend.Chatbot import set_temperature
+            choice = policy.choose("chat")
+            set_temperature(choice.get("temperature", 0.7))
         except Exception:
-            pass
-        SetMicrophoneStatus("False")  # ← ADDED LINE
-        return True
-    
+            choice = {"temperature": 0.7}
+    return choice
+
+def StartSpeculation(Query, text=None):
+    """Start the branch a local guess expects while FirstLayerDMM is still classifying.
+
+    Query has been through QueryModifier; text is the raw utterance (its capitalization
+    helps the guess)."""
+    branch = guess_branch(text or Query)
+    if branch is None:
+        return Speculation(None)
+    choice = _choose_settings(branch)
+    generate = RealtimeSearchEngine if branch == "realtime" else ChatBot
+    return Speculation(branch, generate, Query, choice)
+
+def AnswerBranch(branch, Query, speculation=None, request=None, parts=None):
+    """Answer a 'general' or 'realtime' query, adopting the speculative run if it guessed right.
+
+    With several decision parts the sub-questions are searched/answered concurrently and
+    merged into one grounded reply (MultiSearchEngine); speculation never covers that."""
+    realtime = branch == "realtime"
+    if parts:
+        if speculation is not None:
+            speculation.cancel()
+        choice = _choose_settings(branch)
+        generate = lambda q, on_token=None: MultiSearchEngine(parts, on_token=on_token)
+    elif speculation is not None and speculation.matches(branch):
+        choice = speculation.choice
+        generate = lambda q, on_token=None: speculation.commit(on_token)
     else:
-        for Queries in Decision:
-            
-            if "general" in Queries:
-                # --- RL: only adjusts temperature; logic unchanged ---
-                try:
-                    from Backend.Chatbot import set_temperature
-                    choice_chat = policy.choose("chat")
-                    set_temperature(choice_chat.get("temperature", 0.7))
-                except Exception:
-                    choice_chat = {"temperature": 0.7}
-                SetAssistantStatus ("Thinking ... ")
-                QueryFinal = Queries.replace("general " ,"")
-                Answer = ChatBot(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ...")
-                set_tone("assistant")  # NEW
-                TextToSpeech(Answer)
-                try:
-                    policy.reward("chat", choice_chat, success=bool(Answer and str(Answer).strip()))
-                except Exception:
-                    pass
-                SetMicrophoneStatus("False")  # ← ADDED LINE
-                return True
-            
-            elif "realtime" in Queries:
-                # --- RL: only adjusts internal k; logic unchanged ---
-                try:
-                    from Backend.RealtimeSearchEngine import set_top_k
-                    choice_search = policy.choose("search")
-                    set_top_k(choice_search.get("retrieval_k", 5))
-                except Exception:
-                    choice_search = {"retrieval_k": 5}
-                SetAssistantStatus("Searching ... ")
-                QueryFinal = Queries.replace("realtime ", "")
-                Answer = RealtimeSearchEngine(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ...")
-                set_tone("newscast")  # NEW
-                TextToSpeech(Answer)
-                try:
-                    policy.reward("search", choice_search, success=bool(Answer and str(Answer).strip()))
-                except Exception:
-                    pass
-                SetMicrophoneStatus("False")  # ← ADDED LINE
-                return True
-            
-            elif "exit" in Queries:
-                QueryFinal = "Okay, Bye!"
-                Answer = ChatBot(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ...")
-                set_tone("calm")  # NEW
-                TextToSpeech(Answer)
-                SetMicrophoneStatus("False")  # ← ADDED LINE
-                
-                # ✨ Reset session for next fresh start
-                session_started = False
-                conversation_count = 0
-                
-                SetAssistantStatus("Answering ...")
-                import os  # ✅ FIXED: Add import os here to prevent "os referenced before assignment"
-                os._exit(1)
-    
-    # ✅ MICROPHONE FIX: Fallback - ensure mic is always turned off at the end
-    SetMicrophoneStatus("False")
-    return True
+        if speculation is not None:
+            speculation.cancel()
+        choice = _choose_settings(branch)
+        generate = RealtimeSearchEngine if realtime else ChatBot
+    SetAssistantStatus("Searching ... " if realtime else "Thinking ... ")
+    Answer = StreamAnswer(generate, QueryModifier(Query), "newscast" if realtime else "assistant", request)
+    try:
+        policy.reward("search" if realtime else "chat", choice, success=bool(Answer and str(Answer).strip()))
+    except Exception:
+        pass
+    return Answer
+# --- END ADD ---
+
+@Tracing.traced(Tracing.IMAGE_GENERATION)
+def GenerateImages(prompt, request):
+    """Run Backend/ImageGeneration.py for prompt ("generate image ...") and wait for it."""
+    with open(str(PROJECT_ROOT / "Frontend" / "Files" / "ImageGeneration.data"), "w") as file:  # ✅ FIXED PATH
+        file.write(f"{prompt},True")
 
-# --- ADDED: typed-input pipeline that reuses existing logic and output ---
-def RunPipelineFromText(raw_text: str) -> bool:
+    SetAssistantStatus("Generating images ...")
+    p1 = None
+    try:
+        print(" Starting image generation subprocess...")
+        p1 = subprocess.Popen(
+            [sys.executable, str(IMAGE_GENERATION_SCRIPT)],  # ✅ FIXED PATH
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            shell=False
+        )
+        subprocesses.append(p1)
+        request.on_cancel(p1.kill)
+
+        stdout, stderr = p1.communicate(timeout=120)
+
+        if p1.returncode == 0:
+            print(" Image generation completed successfully")
+            if os.path.exists(str(DATA_DIR)):  # ✅ FIXED PATH
+                images = [f for f in os.listdir(str(DATA_DIR)) if f.endswith('.jpg') or f.endswith('.png')]
+                print(f" Generated {len(images)} images")
+            else:
+                print(" Data folder not found")
+        else:
+            print(f" Image generation failed:")
+            print(f"Return code: {p1.returncode}")
+            if stderr:
+                print(f"Error: {stderr.decode()}")
+            if stdout:
+                print(f"Output: {stdout.decode()}")
+
+    except subprocess.TimeoutExpired:
+        p1.kill()
+        print(" Image generation timed out after 2 minutes")
+    except Exception as e:
+        print(f" Error starting ImageGeneration.py: {e}")
+
+def ExecuteDecision(Decision, request, speculation=None, early=None):
+    """Act on FirstLayerDMM's decision: automation, image generation, realtime/general answer or exit.
+
+    early is the EarlyDispatcher whose tasks already started during classification."""
     global session_started, conversation_count
-    with PIPELINE_LOCK:
-        try:
-            SetMicrophoneStatus("True")  # block wake-word path during handling
-            text_in = (raw_text or "").strip()
-            if not text_in:
-                return True
+
+    G = any(i.startswith("general") for i in Decision)
+    R = any(i.startswith("realtime") for i in Decision)
+    parts = [i for i in Decision if i.startswith(("general", "realtime"))]
+    Mearged_query = " and ".join(" ".join(i.split()[1:]) for i in parts)
+
+    # actions first (some may already be running, dispatched while Cohere was streaming)
+    if any(i.startswith(tuple(Functions)) for i in Decision):
+        rest = list(Decision)
+        for task in (early.dispatched if early else []):
+            if task in rest:
+                rest.remove(task)
+        if any(i.startswith(tuple(Functions)) for i in rest):
+            run(Automation(rest))
+        if early:
+            early.wait()
+        return
+
+    # STRICT: trigger only on "generate image" or "create image"
+    img_q = next(
+        (
+            q for q in Decision
+            if q.lower().strip().startswith("generate image")
+            or q.lower().strip().startswith("create image")
+        ),
+        None
+    )
+    if img_q:
+        GenerateImages(img_q, request)
+        return
+
+    # several general/realtime parts: fan out (one search or draft per part, concurrently)
+    if len(parts) > 1:
+        AnswerBranch("realtime", Mearged_query, speculation, request, parts=parts)
+        return
+
+    # realtime aggregate
+    if G and R or R:
+        AnswerBranch("realtime", Mearged_query, speculation, request)
+        return
+
+    # single branches
+    for q in Decision:
+        if q.startswith("general "):
+            AnswerBranch("general", q.replace("general ", ""), speculation, request)
+            return
+        if q.startswith("realtime "):
+            AnswerBranch("realtime", q.replace("realtime ", ""), speculation, request)
+            return
+        if q == "exit":
+            StreamAnswer(ChatBot, QueryModifier("Okay, Bye!"), "calm", request)
+            # ✨ Reset session for next fresh start
+            session_started = False
+            conversation_count = 0
+            get_store().flush()   # os._exit skips atexit: persist the goodbye turn first
+            os._exit(1)
+
+def HandleRequest(request):
+    """Single dispatch path for voice and typed requests (runs on a scheduler worker).
+
+    Classification overlaps with earlier requests; everything that touches the screen,
+    the speakers or the session happens inside request.turn(), in arrival order.
+    """
+    trace = request.meta.get("trace") or Tracing.Trace(request.source)
+    try:
+        with trace.activate():
+            _HandleRequest(request)
+    finally:
+        trace.finish()   # refreshes Data/latency.csv (and Data/trace.json with --trace)
+
+def _HandleRequest(request):
+    global session_started, conversation_count
+    text_in = (request.text or "").strip()
+    voice = request.source == "voice"
+
+    # voice activation before the session started: greet only, nothing was recorded
+    if not text_in:
+        with request.turn():
+            if not session_started:
+                greeting = generate_greeting()
+                ShowTextToScreen(f"{Assistantname} : {greeting}")
+                SetAssistantStatus("Greeting...")
+                set_tone("cheerful")  # NEW
+                TextToSpeech(greeting)
+                session_started = True
+                conversation_count = 1
+        return
+
+    # --- ADDED: Short-circuit canned replies for casual inputs ---
+    _ans = _quick_casual_reply(text_in)
+
+    speculation = Speculation(None)
+    early = None
+    Decision = []
+    try:
+        if _ans is None:
+            if request.is_next():
+                SetAssistantStatus("Thinking ...")
+            Query = QueryModifier(text_in)
+            # the speculative run reads the chat history, and early automation acts before
+            # this request's turn, so both only start once earlier turns are finished
+            if request.is_next():
+                speculation = StartSpeculation(Query, text_in)   # likely branch runs while Cohere classifies
+                early = EarlyDispatcher(Automation)     # "open chrome" starts while the rest streams
+            Decision = FirstLayerDMM(Query, on_task=early.feed if early else None)
+            if early:
+                early.close()
+            print("")
+            print(f"Decision : {Decision}")
+            print("")
+
+        with request.turn():
+            if voice:
+                ShowTextToScreen(f"{Username} : {text_in}")
 
             # same greeting as voice for fresh session
             if not session_started:
@@ -437,182 +447,87 @@ def RunPipelineFromText(raw_text: str) -> bool:
                 session_started = True
                 conversation_count = 1
 
-                # --- NEW LOGIC: if the first typed text is a casual greeting, stop after greeting ---
+                # if the first text is a casual greeting, stop after the greeting
                 tnorm = text_in.lower().strip().strip(".!?")
                 if tnorm in {
                     "hi","hello","hey","heyy","hii","yo","sup",
                     "good morning","good afternoon","good evening","good night"
                 }:
-                    # do NOT answer the greeting; just end after the spoken greeting
-                    return True
-                # -------------------------------------------------------------------------------
-
+                    return
             else:
+                # ✨ Increment conversation count
                 conversation_count += 1
 
-            # --- ADDED: Short-circuit canned replies for casual inputs (typed) ---
-            _ans = _quick_casual_reply(text_in)
             if _ans:
                 SetAssistantStatus("Answering ...")
                 set_tone("cheerful")  # NEW
                 ShowTextToScreen(f"{Assistantname} : {_ans}")
                 TextToSpeech(_ans)
-                return True
-            # --- END ADD ---
+                return
 
-            SetAssistantStatus("Thinking ...")
-            Query = QueryModifier(text_in)
-            Decision = FirstLayerDMM(Query)
-
-            G = any(i.startswith("general") for i in Decision)
-            R = any(i.startswith("realtime") for i in Decision)
-            Mearged_query = " and ".join(
-                " ".join(i.split()[1:]) for i in Decision if i.startswith(("general","realtime"))
-            )
-
-            # actions first
-            if any(i.startswith(tuple(Functions)) for i in Decision):
-                run(Automation(list(Decision)))
-                return True
-
-            # STRICT: typed image trigger only on "generate image"/"create image"
-            img_q = next(
-                (
-                    q for q in Decision
-                    if q.lower().strip().startswith("generate image")
-                    or q.lower().strip().startswith("create image")
-                ),
-                None
-            )
-            if img_q:
-                (PROJECT_ROOT / "Frontend" / "Files" / "ImageGeneration.data").write_text(f"{img_q},True", encoding="utf-8")
-                SetAssistantStatus("Generating images ...")
-                p = subprocess.Popen([sys.executable, str(IMAGE_GENERATION_SCRIPT)],
-                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=False)
-                p.communicate(timeout=120)
-                return True
-
-            # realtime aggregate
-            if R or (G and R):
-                try:
-                    from Backend.RealtimeSearchEngine import set_top_k
-                    choice_search = policy.choose("search")
-                    set_top_k(choice_search.get("retrieval_k", 5))
-                except Exception:
-                    choice_search = {"retrieval_k": 5}
-                SetAssistantStatus("Searching ... ")
-                Answer = RealtimeSearchEngine(QueryModifier(Mearged_query))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ... ")
-                set_tone("newscast")  # NEW
-                TextToSpeech(Answer)
-                try:
-                    policy.reward("search", choice_search, success=bool(Answer and str(Answer).strip()))
-                except Exception:
-                    pass
-                return True
-
-            # single branches
-            for q in Decision:
-                if q.startswith("general "):
-                    try:
-                        from Backend.Chatbot import set_temperature
-                        choice_chat = policy.choose("chat")
-                        set_temperature(choice_chat.get("temperature", 0.7))
-                    except Exception:
-                        choice_chat = {"temperature": 0.7}
-                    SetAssistantStatus("Thinking ... ")
-                    qf = q.replace("general ", "")
-                    Answer = ChatBot(QueryModifier(qf))
-                    ShowTextToScreen(f"{Assistantname} : {Answer}")
-                    SetAssistantStatus("Answering ...")
-                    set_tone("assistant")  # NEW
-                    TextToSpeech(Answer)
-                    try:
-                        policy.reward("chat", choice_chat, success=bool(Answer and str(Answer).strip()))
-                    except Exception:
-                        pass
-                    return True
-                if q.startswith("realtime "):
-                    try:
-                        from Backend.RealtimeSearchEngine import set_top_k
-                        choice_search = policy.choose("search")
-                        set_top_k(choice_search.get("retrieval_k", 5))
-                    except Exception:
-                        choice_search = {"retrieval_k": 5}
-                    SetAssistantStatus("Searching ... ")
-                    qf = q.replace("realtime ", "")
-                    Answer = RealtimeSearchEngine(QueryModifier(qf))
-                    ShowTextToScreen(f"{Assistantname} : {Answer}")
-                    SetAssistantStatus("Answering ...")
-                    set_tone("newscast")  # NEW
-                    TextToSpeech(Answer)
-                    try:
-                        policy.reward("search", choice_search, success=bool(Answer and str(Answer).strip()))
-                    except Exception:
-                        pass
-                    return True
-                if q == "exit":
-                    Answer = ChatBot(QueryModifier("Okay, Bye!"))
-                    ShowTextToScreen(f"{Assistantname} : {Answer}")
-                    SetAssistantStatus("Answering ...")
-                    set_tone("calm")  # NEW
-                    TextToSpeech(Answer)
-                    session_started = False
-                    conversation_count = 0
-                    os._exit(1)
-
-            return True
-        except Exception as e:
-            print(f"[typed] error: {e}")
-            return True
-        finally:
-            SetMicrophoneStatus("False")
-# --- END ADD ---
+            request.check()
+            ExecuteDecision(Decision, request, speculation, early)
+    finally:
+        speculation.cancel()   # no-op once committed
+        if early:
+            early.close()
+
+def OnSchedulerIdle():
+    if "Available" not in GetAssistantStatus():
+        SetAssistantStatus("Available ...")
+
+# Voice requests outrank typed ones; two workers let the next request classify while
+# the current one is still answering.
+SCHEDULER = RequestScheduler(HandleRequest, maxsize=16, workers=2, on_idle=OnSchedulerIdle)
+
+def SubmitTypedRequest(text):
+    text = (text or "").strip()
+    if text and SCHEDULER.submit("typed", text, block=False) is None:
+        # never dropped silently: tell the user the queue is full
+        ShowTextToScreen(f"{Assistantname} : I'm still working through earlier requests, please send that again in a moment.")
+
+bus.subscribe(TYPED_INPUT, SubmitTypedRequest)
+bus.subscribe(CANCEL, lambda _: SCHEDULER.cancel_all())
+bus.subscribe(HISTORY_REQUEST, ShowOlderChats)
 
 def FirstThread():
     # ✅ START HOTWORD DETECTION
     start_hotword_detection()
-    
-    # Your existing code stays exactly the same
+    SCHEDULER.start()
+    SetAssistantStatus("Available ...")
+
+    # Voice capture: wait for the wake word / mic button, record, queue the request,
+    # and keep the mic busy until its answer is done (so the assistant doesn't hear itself)
     while True:
         try:
-            # --- ADDED: typed input trigger handling (before mic branch) ---
-            if TYPED_FLAG_PATH.exists() and TYPED_FLAG_PATH.read_text(encoding="utf-8").strip() == "1":
-                try:
-                    text = TYPED_INPUT_PATH.read_text(encoding="utf-8").strip()
-                except Exception:
-                    text = ""
-                TYPED_FLAG_PATH.write_text("0", encoding="utf-8")  # reset immediately
-                if text:
-                    RunPipelineFromText(text)
+            if not bus.wait_until(lambda: GetMicrophoneStatus() == "True", timeout=1.0):
                 continue
-            # --- END ADD ---
-
-            CurrentStatus = GetMicrophoneStatus()
-
-            if CurrentStatus == "True":
-                MainExecution()  # Your greeting works perfectly!
+            trace = Tracing.Trace("voice")
+            if not session_started:
+                request = SCHEDULER.submit("voice", "", meta={"trace": trace})
             else:
-                AIStatus = GetAssistantStatus()
-                
-                if "Available..." in AIStatus:
-                    sleep(0.1)
-                else:
-                    SetAssistantStatus("Available ...")
-                    
+                SetAssistantStatus("Listening...")
+                with trace.activate():
+                    Query = SpeechRecognition()
+                request = SCHEDULER.submit("voice", Query, meta={"trace": trace})
+            if request is not None:
+                request.done.wait()
+            # ✅ MICROPHONE FIX: Turn off mic after every voice request
+            SetMicrophoneStatus("False")
+
         except Exception as e:
             print(f" Thread error: {e}")
             # ✅ MICROPHONE FIX: Turn off mic on errors too
             SetMicrophoneStatus("False")
             sleep(1)
-            
+
         except KeyboardInterrupt:
             print(" Thread stopped by user")
             stop_hotword_detection()  # ✅ CLEANUP
             break
 
 def SecondThread():
+    from Frontend.GUI import GraphicalUserInterface
     GraphicalUserInterface()
 
 if __name__ == "__main__":